@@ -14,6 +14,7 @@ from pathlib import Path
 import os
 from decouple import config
 from datetime import timedelta
+from importlib.util import find_spec
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
@@ -169,7 +170,7 @@ REST_FRAMEWORK = {
     'DEFAULT_PERMISSION_CLASSES': [
         'rest_framework.permissions.IsAuthenticated',
     ],
-    'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.PageNumberPagination',
+    'DEFAULT_PAGINATION_CLASS': 'core.pagination.StandardPagination',  # ?pagination=cursor ativa keyset
     'PAGE_SIZE': 20,
     'DEFAULT_THROTTLE_CLASSES': [
         'rest_framework.throttling.AnonRateThrottle',
@@ -179,16 +180,22 @@ REST_FRAMEWORK = {
         'anon': '100/min',  # 100 tentativas por minuto para não autenticados
         'user': '1000/min'  # 1000 requisições por minuto para usuários autenticados
     },
+    # JSON via orjson quando instalado, com o renderer do DRF como fallback (core.renderers)
     'DEFAULT_RENDERER_CLASSES': [
-        'rest_framework.renderers.JSONRenderer',
+        'core.renderers.JSONRenderer',
     ],
     'DEFAULT_PARSER_CLASSES': [
-        'rest_framework.parsers.JSONParser',
+        'core.parsers.JSONParser',
         'rest_framework.parsers.MultiPartParser',
         'rest_framework.parsers.FormParser',
     ],
 }
 
+# application/msgpack negociado pelo Accept/Content-Type se o pacote estiver instalado
+if find_spec('msgpack') is not None:
+    REST_FRAMEWORK['DEFAULT_RENDERER_CLASSES'].append('core.renderers.MessagePackRenderer')
+    REST_FRAMEWORK['DEFAULT_PARSER_CLASSES'].append('core.parsers.MessagePackParser')
+
 # JWT Configuration
 SIMPLE_JWT = {
     'ACCESS_TOKEN_LIFETIME': timedelta(minutes=config('JWT_ACCESS_TOKEN_LIFETIME', default=60, cast=int)),
@@ -243,8 +250,13 @@ CORS_ALLOW_HEADERS = [
     'user-agent',
     'x-csrftoken',
     'x-requested-with',
+    # Uploads retomáveis (core.uploads)
+    'upload-offset',
+    'upload-checksum',
 ]
 
+CORS_EXPOSE_HEADERS = ['upload-offset', 'upload-length', 'location']
+
 CORS_ALLOW_METHODS = [
     'DELETE',
     'GET',
@@ -365,3 +377,54 @@ if config('CACHE_BACKEND', default='') == 'redis':
     }
     SESSION_ENGINE = 'django.contrib.sessions.backends.cache'
     SESSION_CACHE_ALIAS = 'default'
+
+    # LRU por thread na frente do Redis (core.cache_backends); 0 desativa
+    CACHE_L1_MAX_ENTRIES = config('CACHE_L1_MAX_ENTRIES', default=1000, cast=int)
+    if CACHE_L1_MAX_ENTRIES:
+        CACHES['compartilhado'] = CACHES['default']
+        CACHES['default'] = {
+            'BACKEND': 'core.cache_backends.DuasCamadasCache',
+            'OPTIONS': {
+                'L2': 'compartilhado',
+                'L1_MAX_ENTRIES': CACHE_L1_MAX_ENTRIES,
+                'L1_TTL': config('CACHE_L1_TTL', default=5, cast=int),
+                'SYNC_INTERVAL': config('CACHE_L1_SYNC_INTERVAL', default=1, cast=float),
+            }
+        }
+        # Sessões direto no Redis: um logout vale na hora em todos os workers
+        SESSION_CACHE_ALIAS = 'compartilhado'
+
+# TTL (segundos) das métricas do dashboard em cache
+DASHBOARD_METRICS_TTL = config('DASHBOARD_METRICS_TTL', default=60, cast=int)
+
+# TTL (segundos) do cache de respostas do catálogo (core.response_cache); 0 desativa
+API_CACHE_TTL = config('API_CACHE_TTL', default=300, cast=int)
+
+# Listagens montadas a partir de .values() em vez do ModelSerializer (core.fast_read);
+# desligado por padrão: os leitores duplicam os serializers e precisam acompanhá-los
+API_LEITURA_RAPIDA = config('API_LEITURA_RAPIDA', default=False, cast=bool)
+
+# TTL máximo (segundos) dos IDs de recursos acessíveis por aluno (core.access);
+# a entrada expira antes se uma turma do aluno começar; 0 desativa
+ACESSO_CACHE_TTL = config('ACESSO_CACHE_TTL', default=3600, cast=int)
+# Acima deste número de IDs acessíveis, as listagens do aluno avaliam a regra
+# em SQL em vez de filtrar por `pk IN (...)`
+ACESSO_CACHE_MAX_IDS = config('ACESSO_CACHE_MAX_IDS', default=500, cast=int)
+
+# Aquecimento de cache antes do início das turmas (core.warmup / aquecer_cache):
+# janela em minutos (mantenha abaixo de ACESSO_CACHE_TTL) e intervalo em
+# segundos do laço do comando, rodado como processo dedicado; 0 roda uma vez
+WARMUP_MINUTOS = config('WARMUP_MINUTOS', default=30, cast=int)
+WARMUP_INTERVALO = config('WARMUP_INTERVALO', default=0, cast=int)
+
+# Prefixo da location `internal` do nginx para os downloads de recursos
+# (core.downloads); vazio entrega o arquivo pelo próprio Django
+MEDIA_ACCEL_REDIRECT = config('MEDIA_ACCEL_REDIRECT', default='')
+
+# Uploads retomáveis em partes (core.uploads): diretório dos arquivos parciais
+# (vazio = MEDIA_ROOT/parciais; precisa estar no mesmo sistema de arquivos de
+# MEDIA_ROOT para o arquivo ser movido, não copiado), tamanho máximo em bytes
+# (0 = sem limite) e horas sem partes novas até limpar_uploads descartar a sessão
+UPLOAD_RETOMAVEL_DIR = config('UPLOAD_RETOMAVEL_DIR', default='')
+UPLOAD_RETOMAVEL_MAX_TAMANHO = config('UPLOAD_RETOMAVEL_MAX_TAMANHO', default=20 * 1024 ** 3, cast=int)
+UPLOAD_RETOMAVEL_EXPIRACAO = config('UPLOAD_RETOMAVEL_EXPIRACAO', default=24, cast=int)
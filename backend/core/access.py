@@ -0,0 +1,213 @@
+"""
+Regra única de acesso de alunos a recursos.
+
+A mesma regra é exposta em duas formas equivalentes:
+
+* `pode_acessar_q` / `anotar_pode_acessar`: expressão SQL para filtrar ou
+  anotar querysets de `Recurso` (campo `pode_acessar`);
+* `pode_acessar`: predicado Python para um recurso isolado, usado quando o
+  objeto não veio de um queryset anotado.
+
+Regras:
+1. Recursos em draft nunca são acessíveis para alunos.
+2. Recursos com "Acesso Prévio" são acessíveis a qualquer momento.
+3. Os demais só após o início da turma. Para recursos ligados diretamente ao
+   treinamento vale a turma do aluno nesse treinamento que já iniciou.
+
+Quando um aluno é informado, o acesso também exige matrícula na turma (ou
+em alguma turma do treinamento) do recurso.
+
+`ids_acessiveis` guarda em cache, por aluno e dia, os IDs resultantes da
+regra. A chave inclui a geração do aluno (`versao:aluno:<id>`, também
+usada pelas leituras por aluno de core.warmup), incrementada por
+`invalidar_alunos` só para os alunos afetados: as escritas em Aluno e
+Matricula mudam a do aluno; as em Recurso, Turma e Treinamento, as dos
+alunos matriculados na turma (ou no treinamento). A entrada expira no
+próximo `data_inicio` entre as turmas futuras do aluno, quando o acesso
+muda sem nenhuma escrita. Com o dia na chave, core.warmup pode calcular
+de véspera a entrada do dia em que uma turma começa.
+
+Acima de `ACESSO_CACHE_MAX_IDS` IDs, as listagens voltam a avaliar a regra
+em SQL em vez de enviar um `IN (...)` enorme ao banco.
+"""
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import BooleanField, Case, Exists, Min, OuterRef, Q, Value, When
+from django.utils import timezone
+
+from .response_cache import geracoes, incrementar_geracoes
+
+
+def _hoje(hoje):
+    return hoje or timezone.localdate()
+
+
+def pode_acessar_q(aluno=None, hoje=None):
+    """Retorna o `Q` que seleciona os recursos acessíveis."""
+    from .models import Matricula
+
+    hoje = _hoje(hoje)
+
+    if aluno is None:
+        return Q(draft=False) & (Q(acesso_previo=True) | Q(turma__data_inicio__lte=hoje))
+
+    matriculas = Matricula.objects.filter(aluno=aluno)
+    matricula_turma = matriculas.filter(turma=OuterRef('turma'))
+    matricula_treinamento = matriculas.filter(turma__treinamento=OuterRef('treinamento'))
+
+    return Q(draft=False) & (
+        (
+            Q(Exists(matricula_turma))
+            & (Q(acesso_previo=True) | Q(turma__data_inicio__lte=hoje))
+        ) | (
+            Q(Exists(matricula_treinamento))
+            & (Q(acesso_previo=True) | Q(Exists(matricula_treinamento.filter(turma__data_inicio__lte=hoje))))
+        )
+    )
+
+
+def anotar_pode_acessar(queryset, aluno=None, hoje=None):
+    """Anota `pode_acessar` (booleano calculado no banco) em um queryset de Recurso."""
+    # Case/When em vez de expor o Q direto: comparações com turma nula
+    # (recursos do treinamento) resultariam em NULL, não em False
+    return queryset.annotate(
+        pode_acessar=Case(
+            When(pode_acessar_q(aluno, hoje), then=Value(True)),
+            default=Value(False),
+            output_field=BooleanField(),
+        )
+    )
+
+
+def recursos_disponiveis(aluno, hoje=None):
+    """Queryset dos recursos que o aluno pode acessar, já anotado com `pode_acessar`."""
+    from .models import Recurso
+
+    # O filtro já garante o acesso; não há por que reavaliar a regra no SELECT
+    return Recurso.objects.filter(pode_acessar_q(aluno, hoje)).annotate(
+        pode_acessar=Value(True, output_field=BooleanField())
+    )
+
+
+def _ttl_acesso(aluno, hoje):
+    """Segundos até o início da próxima turma do aluno, limitado a ACESSO_CACHE_TTL."""
+    from .models import Matricula
+    from .stats import inicio_do_dia
+
+    ttl = getattr(settings, 'ACESSO_CACHE_TTL', 3600)
+    proximo_inicio = Matricula.objects.filter(
+        aluno=aluno, turma__data_inicio__gt=hoje
+    ).aggregate(inicio=Min('turma__data_inicio'))['inicio']
+    if proximo_inicio is not None:
+        restante = (inicio_do_dia(proximo_inicio) - timezone.now()).total_seconds()
+        ttl = min(ttl, max(int(restante), 1))
+    return ttl
+
+
+def _chave_geracao(aluno_id):
+    return f'versao:aluno:{aluno_id}'
+
+
+def geracao_aluno(aluno_id):
+    """Geração atual das leituras em cache do aluno."""
+    return geracoes([_chave_geracao(aluno_id)])[0]
+
+
+def invalidar_alunos(alunos=(), turmas=(), treinamentos=()):
+    """
+    Invalida as leituras em cache (`ids_acessiveis`, core.warmup) dos alunos
+    informados e dos matriculados nas turmas (ou em alguma turma dos
+    treinamentos) informadas.
+    """
+    from .models import Matricula
+
+    aluno_ids = set(alunos)
+    turmas = {pk for pk in turmas if pk}
+    treinamentos = {pk for pk in treinamentos if pk}
+    if turmas or treinamentos:
+        aluno_ids.update(
+            Matricula.objects.filter(Q(turma_id__in=turmas) | Q(turma__treinamento_id__in=treinamentos))
+            .values_list('aluno_id', flat=True)
+        )
+    if aluno_ids:
+        incrementar_geracoes(*map(_chave_geracao, aluno_ids))
+
+
+def invalidar_alunos_dos_recursos(vinculos):
+    """`invalidar_alunos` a partir de pares (turma_id, treinamento_id) de recursos."""
+    vinculos = list(vinculos)
+    invalidar_alunos(
+        turmas=[turma_id for turma_id, _ in vinculos],
+        treinamentos=[treinamento_id for _, treinamento_id in vinculos],
+    )
+
+
+def ids_acessiveis(aluno, hoje=None):
+    """IDs dos recursos que o aluno pode acessar no dia; consulta o banco só na falta do cache."""
+    from .models import Recurso
+
+    hoje = _hoje(hoje)
+    chave = f'acesso:{aluno.pk}:{hoje.isoformat()}:{geracao_aluno(aluno.pk)}'
+    ids = cache.get(chave)
+    if ids is None:
+        ids = list(Recurso.objects.filter(pode_acessar_q(aluno, hoje)).values_list('pk', flat=True))
+        ttl = _ttl_acesso(aluno, hoje)
+        if ttl:
+            cache.set(chave, ids, ttl)
+    return ids
+
+
+def _ids_para_filtro(aluno):
+    """IDs em cache do aluno, ou None quando são muitos para um `IN (...)`."""
+    ids = ids_acessiveis(aluno)
+    if len(ids) > getattr(settings, 'ACESSO_CACHE_MAX_IDS', 500):
+        return None
+    return ids
+
+
+def recursos_disponiveis_em_cache(aluno):
+    """Como `recursos_disponiveis`, filtrando pelos IDs de `ids_acessiveis`."""
+    from .models import Recurso
+
+    ids = _ids_para_filtro(aluno)
+    if ids is None:
+        return recursos_disponiveis(aluno)
+    return Recurso.objects.filter(pk__in=ids).annotate(
+        pode_acessar=Value(True, output_field=BooleanField())
+    )
+
+
+def anotar_pode_acessar_em_cache(queryset, aluno):
+    """Como `anotar_pode_acessar`, com o acesso do aluno lido de `ids_acessiveis`."""
+    ids = _ids_para_filtro(aluno)
+    if ids is None:
+        return anotar_pode_acessar(queryset, aluno)
+    return queryset.annotate(
+        pode_acessar=Case(
+            When(pk__in=ids, then=Value(True)),
+            default=Value(False),
+            output_field=BooleanField(),
+        )
+    )
+
+
+def pode_acessar(recurso, aluno=None, hoje=None):
+    """Avalia a regra em Python para um único recurso."""
+    hoje = _hoje(hoje)
+
+    if recurso.draft:
+        return False
+
+    if aluno is None:
+        if recurso.acesso_previo:
+            return True
+        return recurso.turma_id is not None and recurso.turma.data_inicio <= hoje
+
+    if recurso.turma_id is not None:
+        turmas = aluno.matriculas.filter(turma_id=recurso.turma_id)
+    else:
+        turmas = aluno.matriculas.filter(turma__treinamento_id=recurso.treinamento_id)
+
+    if recurso.acesso_previo:
+        return turmas.exists()
+    return turmas.filter(turma__data_inicio__lte=hoje).exists()
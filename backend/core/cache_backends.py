@@ -0,0 +1,275 @@
+"""
+Backend de cache em duas camadas.
+
+* L1: LRU em memória, por thread (o Django cria uma instância do backend
+  por thread), limitado em número de entradas (`L1_MAX_ENTRIES`) e em
+  tempo de vida (`L1_TTL`, segundos);
+* L2: o cache compartilhado configurado em outro alias (`L2`), em geral
+  o Redis.
+
+Leituras tentam a L1 e só então a L2. Escritas vão para a L2; as que
+sobrescrevem ou removem um valor existente são publicadas num log de
+invalidação guardado na própria L2: um contador de sequência (`l1:seq`) e
+uma chave por item alterado (`l1:inv:<n>`). Gravar uma chave nova não
+invalida nada e não é publicado. Cada thread confere o contador no
+máximo a cada `SYNC_INTERVAL` segundos e descarta da sua L1 as chaves
+alteradas por outras threads ou workers; se o log tiver lacunas (expirou
+ou foi limpo), descarta a L1 inteira. Entradas da L1 podem, portanto,
+ficar até `SYNC_INTERVAL` segundos atrasadas em relação a escritas de
+outra thread, mesmo no mesmo processo, e até `L1_TTL` além da expiração
+na L2.
+
+A L1 guarda os valores serializados (pickle), como o LocMemCache: quem lê
+recebe uma cópia e pode alterá-la sem afetar os outros leitores. Os
+contadores de geração (`versao:*`, core.response_cache) não passam pela
+L1: são a base da invalidação e precisam refletir na hora as escritas das
+outras threads e processos.
+
+Configuração (settings.CACHES):
+
+    'default': {
+        'BACKEND': 'core.cache_backends.DuasCamadasCache',
+        'OPTIONS': {'L2': 'compartilhado', 'L1_MAX_ENTRIES': 1000, 'L1_TTL': 5},
+    },
+    'compartilhado': {'BACKEND': 'django_redis.cache.RedisCache', ...},
+
+`estatisticas()` retorna acertos e falhas por camada (da thread atual).
+"""
+import pickle
+import threading
+import time
+from collections import Counter, OrderedDict
+
+from django.core.cache import caches
+from django.core.cache.backends.base import DEFAULT_TIMEOUT, BaseCache
+
+CHAVE_SEQUENCIA = 'l1:seq'
+PREFIXO_INVALIDACAO = 'l1:inv'
+# Itens do log além disso fazem a thread descartar a L1 inteira
+MAX_LOG = 1000
+TTL_LOG = 300
+# Chaves lidas e escritas sempre direto na L2
+PREFIXOS_SEM_L1 = ('versao:',)
+
+_AUSENTE = object()
+
+
+class DuasCamadasCache(BaseCache):
+    def __init__(self, location, params):
+        super().__init__(params)
+        opcoes = params.get('OPTIONS', {})
+        self._alias_l2 = opcoes.get('L2', 'compartilhado')
+        self._max_l1 = int(opcoes.get('L1_MAX_ENTRIES', 1000))
+        self._ttl_l1 = float(opcoes.get('L1_TTL', 5))
+        self._intervalo_sync = float(opcoes.get('SYNC_INTERVAL', 1))
+        self._l1 = OrderedDict()
+        self._lock = threading.Lock()
+        # Estado da sincronização; só uma thread sincroniza por vez
+        self._lock_sync = threading.Lock()
+        self._contadores = Counter()
+        self._ultima_sequencia = None
+        self._proxima_sync = 0.0
+
+    @property
+    def l2(self):
+        return caches[self._alias_l2]
+
+    # L1
+
+    def _chave(self, key, version):
+        return self.l2.make_key(key, version=version)
+
+    @staticmethod
+    def _usa_l1(key):
+        return not str(key).startswith(PREFIXOS_SEM_L1)
+
+    def _ler_l1(self, chave):
+        with self._lock:
+            item = self._l1.get(chave)
+            if item is not None and item[0] <= time.monotonic():
+                del self._l1[chave]
+                item = None
+            if item is None:
+                self._contadores['l1_falhas'] += 1
+                return _AUSENTE
+            self._l1.move_to_end(chave)
+            self._contadores['l1_acertos'] += 1
+        return pickle.loads(item[1])
+
+    def _guardar_l1(self, chave, valor, timeout=DEFAULT_TIMEOUT):
+        ttl = self._ttl_l1
+        timeout = self.l2.get_backend_timeout(timeout)
+        if timeout is not None:
+            ttl = min(ttl, timeout - time.time())
+        if ttl <= 0 or not self._max_l1:
+            return
+        serializado = pickle.dumps(valor, pickle.HIGHEST_PROTOCOL)
+        with self._lock:
+            self._l1[chave] = (time.monotonic() + ttl, serializado)
+            self._l1.move_to_end(chave)
+            while len(self._l1) > self._max_l1:
+                self._l1.popitem(last=False)
+
+    def _descartar_l1(self, chaves):
+        with self._lock:
+            for chave in chaves:
+                self._l1.pop(chave, None)
+
+    def _limpar_l1(self):
+        with self._lock:
+            self._l1.clear()
+
+    # Invalidação entre threads e processos
+
+    def _publicar(self, chaves):
+        """Registra as chaves alteradas no log compartilhado."""
+        self._descartar_l1(chaves)
+        if not chaves:
+            return
+        try:
+            ultima = self.l2.incr(CHAVE_SEQUENCIA, len(chaves))
+        except ValueError:
+            self.l2.add(CHAVE_SEQUENCIA, 0, None)
+            ultima = self.l2.incr(CHAVE_SEQUENCIA, len(chaves))
+        primeira = ultima - len(chaves) + 1
+        self.l2.set_many(
+            {f'{PREFIXO_INVALIDACAO}:{n}': chave for n, chave in zip(range(primeira, ultima + 1), chaves)},
+            TTL_LOG,
+        )
+
+    def _sincronizar(self):
+        if time.monotonic() < self._proxima_sync:
+            return
+        # Outra thread já está sincronizando: a L1 segue válida por ora
+        if not self._lock_sync.acquire(blocking=False):
+            return
+        try:
+            agora = time.monotonic()
+            if agora < self._proxima_sync:
+                return
+            self._proxima_sync = agora + self._intervalo_sync
+
+            sequencia = self.l2.get(CHAVE_SEQUENCIA) or 0
+            ultima, self._ultima_sequencia = self._ultima_sequencia, sequencia
+            if ultima is None or sequencia == ultima:
+                # Primeira sincronização da thread: a L1 ainda está vazia
+                return
+            if sequencia < ultima or sequencia - ultima > MAX_LOG:
+                self._limpar_l1()
+                return
+            chaves_log = [f'{PREFIXO_INVALIDACAO}:{n}' for n in range(ultima + 1, sequencia + 1)]
+            alteradas = self.l2.get_many(chaves_log)
+            if len(alteradas) < len(chaves_log):
+                self._limpar_l1()
+            else:
+                self._descartar_l1(alteradas.values())
+        finally:
+            self._lock_sync.release()
+
+    # API do cache
+
+    def get(self, key, default=None, version=None):
+        if not self._usa_l1(key):
+            return self.l2.get(key, default, version=version)
+        self._sincronizar()
+        chave = self._chave(key, version)
+        valor = self._ler_l1(chave)
+        if valor is not _AUSENTE:
+            return valor
+        valor = self.l2.get(key, _AUSENTE, version=version)
+        if valor is _AUSENTE:
+            self._contadores['l2_falhas'] += 1
+            return default
+        self._contadores['l2_acertos'] += 1
+        self._guardar_l1(chave, valor)
+        return valor
+
+    def get_many(self, keys, version=None):
+        self._sincronizar()
+        encontrados, faltando = {}, []
+        for key in keys:
+            valor = self._ler_l1(self._chave(key, version)) if self._usa_l1(key) else _AUSENTE
+            if valor is _AUSENTE:
+                faltando.append(key)
+            else:
+                encontrados[key] = valor
+        if faltando:
+            da_l2 = self.l2.get_many(faltando, version=version)
+            self._contadores['l2_acertos'] += len(da_l2)
+            self._contadores['l2_falhas'] += len(faltando) - len(da_l2)
+            for key, valor in da_l2.items():
+                if self._usa_l1(key):
+                    self._guardar_l1(self._chave(key, version), valor)
+            encontrados.update(da_l2)
+        return encontrados
+
+    def has_key(self, key, version=None):
+        return self.get(key, _AUSENTE, version=version) is not _AUSENTE
+
+    def set(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        if not self._usa_l1(key):
+            self.l2.set(key, value, timeout, version=version)
+            return
+        # add() na L2 diz se havia valor: só sobrescrever invalida a L1 dos outros
+        if not self.l2.add(key, value, timeout, version=version):
+            self.l2.set(key, value, timeout, version=version)
+            self._publicar([self._chave(key, version)])
+        self._guardar_l1(self._chave(key, version), value, timeout)
+
+    def add(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        # Chave ausente na L2: nenhuma L1 tem o que invalidar
+        if not self.l2.add(key, value, timeout, version=version):
+            return False
+        if self._usa_l1(key):
+            self._guardar_l1(self._chave(key, version), value, timeout)
+        return True
+
+    def set_many(self, data, timeout=DEFAULT_TIMEOUT, version=None):
+        falhas = self.l2.set_many(data, timeout, version=version)
+        self._publicar([self._chave(key, version) for key in data if self._usa_l1(key)])
+        return falhas
+
+    def touch(self, key, timeout=DEFAULT_TIMEOUT, version=None):
+        return self.l2.touch(key, timeout, version=version)
+
+    def incr(self, key, delta=1, version=None):
+        valor = self.l2.incr(key, delta, version=version)
+        if self._usa_l1(key):
+            self._publicar([self._chave(key, version)])
+        return valor
+
+    def decr(self, key, delta=1, version=None):
+        return self.incr(key, -delta, version=version)
+
+    def delete(self, key, version=None):
+        removido = self.l2.delete(key, version=version)
+        self._publicar([self._chave(key, version)])
+        return removido
+
+    def delete_many(self, keys, version=None):
+        self.l2.delete_many(keys, version=version)
+        self._publicar([self._chave(key, version) for key in keys])
+
+    def clear(self):
+        self.l2.clear()
+        self._limpar_l1()
+        # Salto maior que MAX_LOG: as outras threads descartam a L1 inteira
+        self.l2.set(CHAVE_SEQUENCIA, (self._ultima_sequencia or 0) + MAX_LOG + 1, None)
+
+    def close(self, **kwargs):
+        self.l2.close(**kwargs)
+
+    def estatisticas(self):
+        """Acertos e falhas por camada, contados nesta thread."""
+        with self._lock:
+            return {
+                'l1': {
+                    'acertos': self._contadores['l1_acertos'],
+                    'falhas': self._contadores['l1_falhas'],
+                    'entradas': len(self._l1),
+                },
+                'l2': {
+                    'acertos': self._contadores['l2_acertos'],
+                    'falhas': self._contadores['l2_falhas'],
+                },
+            }
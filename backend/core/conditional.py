@@ -0,0 +1,85 @@
+"""
+GET condicional (ETag) nas listagens e detalhes da API.
+
+* listagem: ETag a partir de `Max(updated_at)` e `Count` do queryset já
+  filtrado (uma consulta agregada);
+* detalhe: ETag a partir do `updated_at` do objeto.
+
+Os dois incluem as gerações de core.response_cache dos models de que a
+resposta depende (contadores e nomes relacionados não alteram o
+`updated_at` da linha), o usuário, os query params, o media type e o dia.
+`If-None-Match` responde 304 antes de qualquer serialização.
+
+Não há `Last-Modified`/`If-Modified-Since`: exclusões, contadores e
+nomes relacionados mudam a resposta sem avançar nenhum `updated_at`, e a
+data daria 304 para uma lista ou um detalhe alterados.
+"""
+import hashlib
+
+from django.db.models import Count, Max
+from django.http import HttpResponseNotModified
+from django.utils import timezone
+from django.utils.cache import patch_cache_control
+from django.utils.http import parse_etags, quote_etag
+
+from .response_cache import versoes
+
+
+class RequisicaoCondicionalMixin:
+    """
+    Adiciona validadores a `list`/`retrieve` de um ViewSet. As dependências
+    vêm de `cache_dependencias` (as mesmas do cache de respostas).
+    """
+    cache_dependencias = ()
+
+    def _etag(self, request, *partes):
+        base = [
+            self.queryset.model._meta.label_lower,
+            *map(str, partes),
+            *map(str, versoes(self.cache_dependencias)),
+            str(request.user.pk),
+            request.META.get('QUERY_STRING', ''),
+            request.accepted_media_type or '',
+            timezone.localdate().isoformat(),
+        ]
+        return quote_etag(hashlib.sha256('|'.join(base).encode()).hexdigest())
+
+    def _nao_modificado(self, request, etag):
+        self._etag_resposta = etag
+        if_none_match = request.META.get('HTTP_IF_NONE_MATCH')
+        if not if_none_match:
+            return False
+        # Comparação fraca, permitida para GET/HEAD
+        etags = {valor.removeprefix('W/') for valor in parse_etags(if_none_match)}
+        return '*' in etags or etag in etags
+
+    def get_object(self):
+        # retrieve() valida e serializa o mesmo objeto com uma consulta
+        if not hasattr(self, '_objeto'):
+            self._objeto = super().get_object()
+        return self._objeto
+
+    def list(self, request, *args, **kwargs):
+        agregado = self.filter_queryset(self.get_queryset()).order_by().aggregate(
+            ultima=Max('updated_at'), total=Count('pk')
+        )
+        etag = self._etag(request, agregado['ultima'], agregado['total'])
+        if self._nao_modificado(request, etag):
+            return HttpResponseNotModified()
+        return super().list(request, *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        instance = self.get_object()
+        etag = self._etag(request, instance.pk, instance.updated_at)
+        if self._nao_modificado(request, etag):
+            return HttpResponseNotModified()
+        return super().retrieve(request, *args, **kwargs)
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        response = super().finalize_response(request, response, *args, **kwargs)
+        etag = getattr(self, '_etag_resposta', None)
+        if etag and response.status_code in (200, 304):
+            response['ETag'] = etag
+            # O navegador guarda a resposta, mas sempre revalida com o servidor
+            patch_cache_control(response, private=True, no_cache=True)
+        return response
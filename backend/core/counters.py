@@ -0,0 +1,74 @@
+"""
+Manutenção dos contadores desnormalizados de matrículas.
+
+`Turma.total_alunos` e `Aluno.total_matriculas` são atualizados com
+UPDATE atômico (F()) a cada criação/remoção de `Matricula`, evitando um
+COUNT por linha nas listagens. As funções de recálculo abaixo servem aos
+caminhos em lote e ao comando `recalcular_contadores`.
+"""
+from django.db.models import Count, F, IntegerField, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+
+
+def _subquery_contagem(campo):
+    from .models import Matricula
+
+    return Coalesce(
+        Subquery(
+            Matricula.objects.filter(**{campo: OuterRef('pk')})
+            .order_by()
+            .values(campo)
+            .annotate(total=Count('pk'))
+            .values('total'),
+            output_field=IntegerField(),
+        ),
+        Value(0),
+    )
+
+
+def ajustar_contadores(turma_id, aluno_id, delta):
+    """Soma `delta` aos contadores da turma e do aluno de uma matrícula."""
+    from .models import Aluno, Turma
+
+    Turma.objects.filter(pk=turma_id).update(total_alunos=F('total_alunos') + delta)
+    Aluno.objects.filter(pk=aluno_id).update(total_matriculas=F('total_matriculas') + delta)
+
+
+def recalcular_contadores(turma_ids=None, aluno_ids=None):
+    """
+    Recalcula os contadores a partir da tabela de matrículas.
+
+    Sem argumentos recalcula todas as turmas e alunos. Cada tabela é
+    corrigida com um único UPDATE baseado em subquery.
+    """
+    from .models import Aluno, Turma
+
+    turmas = Turma.objects.all()
+    alunos = Aluno.objects.all()
+    if turma_ids is not None:
+        turmas = turmas.filter(pk__in=turma_ids)
+    if aluno_ids is not None:
+        alunos = alunos.filter(pk__in=aluno_ids)
+
+    turmas.update(total_alunos=_subquery_contagem('turma'))
+    alunos.update(total_matriculas=_subquery_contagem('aluno'))
+
+    from .response_cache import incrementar_versao
+    incrementar_versao(Turma, Aluno)
+
+
+def divergencias():
+    """Retorna (turmas, alunos) cujo contador difere da contagem real."""
+    from .models import Aluno, Turma
+
+    turmas = (
+        Turma.objects.annotate(real=_subquery_contagem('turma'))
+        .exclude(total_alunos=F('real'))
+        .values_list('pk', 'total_alunos', 'real')
+    )
+    alunos = (
+        Aluno.objects.annotate(real=_subquery_contagem('aluno'))
+        .exclude(total_matriculas=F('real'))
+        .values_list('pk', 'total_matriculas', 'real')
+    )
+    return list(turmas), list(alunos)
@@ -0,0 +1,246 @@
+"""
+Entrega protegida dos arquivos de `Recurso`.
+
+`RecursoViewSet.download` avalia a regra de acesso (core.access) uma vez e
+responde com `resposta_de_arquivo`:
+
+* com `MEDIA_ACCEL_REDIRECT` configurado (ex.: '/media-protegida/'), uma
+  resposta vazia com `X-Accel-Redirect` para a location `internal` do nginx,
+  que envia o arquivo com sendfile; o Django só atende a requisição curta;
+* sem ele (desenvolvimento, ou o Django servindo a mídia), um
+  `FileResponse` com suporte a `Range` (um ou vários intervalos, `206`,
+  `multipart/byteranges`), `If-Range` e validadores `ETag`/`Last-Modified`.
+  Um intervalo único é entregue pelo `wsgi.file_wrapper` a partir do
+  offset do trecho, de modo que servidores como o gunicorn usam
+  `os.sendfile` só nos bytes pedidos; vários intervalos são lidos com
+  `os.pread`. Buscar no meio de um vídeo não retransmite o arquivo do
+  início.
+
+No caminho do nginx, Range e validadores ficam a cargo dele. O nginx não
+expõe mais /media/: `arquivo_url` aponta para o download.
+"""
+import mimetypes
+import os
+import re
+import secrets
+
+from django.conf import settings
+from django.http import FileResponse, Http404, HttpResponse, StreamingHttpResponse
+from django.urls import reverse
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.encoding import filepath_to_uri
+from django.utils.http import content_disposition_header, http_date, parse_http_date_safe, quote_etag
+
+_MARCADOR = '00000000-0000-0000-0000-000000000000'
+_INTERVALO = re.compile(r'(\d*)-(\d*)', re.ASCII)
+# Acima disso (após unir sobreposições) o Range é ignorado e o arquivo vai inteiro
+MAX_INTERVALOS = 16
+BLOCO = 64 * 1024
+
+
+def url_download(request, pk):
+    """URL absoluta do download de um recurso."""
+    return request.build_absolute_uri(reverse('recurso-download', args=[pk]))
+
+
+def formatador_url_download(request):
+    """Equivalente a `url_download(request, pk)`, com o prefixo calculado uma vez."""
+    antes, depois = url_download(request, _MARCADOR).split(_MARCADOR)
+    return lambda pk: f'{antes}{pk}{depois}'
+
+
+def nome_do_arquivo(recurso):
+    """Nome exibido no download: o do recurso com a extensão do arquivo enviado."""
+    extensao = os.path.splitext(recurso.arquivo.name)[1]
+    return f'{recurso.nome_recurso}{extensao}'
+
+
+def intervalos_pedidos(cabecalho, tamanho):
+    """
+    Intervalos `(inicio, fim)` (inclusivos, ordenados e unidos) de um
+    cabeçalho `Range: bytes=...`. None quando o cabeçalho deve ser ignorado
+    (inválido ou com intervalos demais) e [] quando nenhum é satisfazível.
+    """
+    unidade, _, especificacao = cabecalho.partition('=')
+    if unidade.strip().lower() != 'bytes' or not especificacao.strip():
+        return None
+    intervalos = []
+    for parte in especificacao.split(','):
+        encontrado = _INTERVALO.fullmatch(parte.strip())
+        if not encontrado or not any(encontrado.groups()):
+            return None
+        inicio, fim = encontrado.groups()
+        if not inicio:
+            # bytes=-n: os últimos n bytes
+            if int(fim) and tamanho:
+                intervalos.append((max(tamanho - int(fim), 0), tamanho - 1))
+            continue
+        inicio = int(inicio)
+        if fim and int(fim) < inicio:
+            return None
+        if inicio < tamanho:
+            intervalos.append((inicio, min(int(fim), tamanho - 1) if fim else tamanho - 1))
+
+    unidos = []
+    for inicio, fim in sorted(intervalos):
+        if unidos and inicio <= unidos[-1][1] + 1:
+            unidos[-1] = (unidos[-1][0], max(unidos[-1][1], fim))
+        else:
+            unidos.append((inicio, fim))
+    if len(unidos) > MAX_INTERVALOS:
+        return None
+    return unidos
+
+
+def _if_range_atende(request, etag, ultima_alteracao):
+    """Se o `If-Range` (quando presente) ainda corresponde ao arquivo."""
+    valor = request.META.get('HTTP_IF_RANGE', '').strip()
+    if not valor:
+        return True
+    if valor.startswith(('"', 'W/')):
+        # Comparação forte: ETags fracas nunca atendem
+        return valor == etag
+    return parse_http_date_safe(valor) == ultima_alteracao
+
+
+class _Trecho:
+    """
+    Arquivo limitado a `[inicio, fim]` para o `FileResponse`.
+
+    O descritor fica posicionado em `inicio` e `fileno()` é exposto: o
+    `wsgi.file_wrapper` do gunicorn faz `os.sendfile` a partir da posição
+    atual pelos `Content-Length` bytes. Sem ele, `read` usa `os.pread`.
+    """
+
+    def __init__(self, arquivo, inicio, fim):
+        self.arquivo = arquivo
+        self.posicao = inicio
+        self.fim = fim
+        arquivo.seek(inicio)
+
+    def fileno(self):
+        return self.arquivo.fileno()
+
+    def read(self, tamanho=-1):
+        restante = self.fim + 1 - self.posicao
+        if tamanho is None or tamanho < 0 or tamanho > restante:
+            tamanho = restante
+        if tamanho <= 0:
+            return b''
+        dados = os.pread(self.arquivo.fileno(), tamanho, self.posicao)
+        self.posicao += len(dados)
+        return dados
+
+    def close(self):
+        self.arquivo.close()
+
+
+def _ler(arquivo, inicio, fim):
+    descritor = arquivo.fileno()
+    while inicio <= fim:
+        dados = os.pread(descritor, min(BLOCO, fim + 1 - inicio), inicio)
+        if not dados:
+            return
+        inicio += len(dados)
+        yield dados
+
+
+class _Multipart:
+    """Corpo `multipart/byteranges`; o arquivo fecha com a resposta, mesmo sem ser lido."""
+
+    def __init__(self, arquivo, partes, fronteira):
+        self.arquivo = arquivo
+        self.partes = partes
+        self.fronteira = fronteira
+
+    def __iter__(self):
+        for cabecalho, (inicio, fim) in self.partes:
+            yield cabecalho
+            yield from _ler(self.arquivo, inicio, fim)
+            yield b'\r\n'
+        yield f'--{self.fronteira}--\r\n'.encode()
+
+    def close(self):
+        self.arquivo.close()
+
+
+def _resposta_parcial(request, arquivo, content_type, nome, anexo):
+    """`FileResponse` do arquivo local, respeitando Range, If-Range e validadores."""
+    estado = os.fstat(arquivo.fileno())
+    tamanho = estado.st_size
+    etag = quote_etag(f'{estado.st_mtime_ns:x}-{tamanho:x}')
+    ultima_alteracao = int(estado.st_mtime)
+
+    intervalos = None
+    cabecalho = request.META.get('HTTP_RANGE')
+    if cabecalho and request.method == 'GET' and _if_range_atende(request, etag, ultima_alteracao):
+        intervalos = intervalos_pedidos(cabecalho, tamanho)
+
+    condicional = get_conditional_response(request, etag=etag, last_modified=ultima_alteracao)
+    if condicional is not None:
+        arquivo.close()
+        response = condicional
+    elif intervalos == []:
+        arquivo.close()
+        response = HttpResponse(status=416)
+        response['Content-Range'] = f'bytes */{tamanho}'
+    elif intervalos is None:
+        response = FileResponse(arquivo, content_type=content_type, as_attachment=anexo, filename=nome)
+    elif len(intervalos) == 1:
+        inicio, fim = intervalos[0]
+        response = FileResponse(
+            _Trecho(arquivo, inicio, fim), status=206, content_type=content_type,
+            as_attachment=anexo, filename=nome,
+        )
+        response['Content-Length'] = fim + 1 - inicio
+        response['Content-Range'] = f'bytes {inicio}-{fim}/{tamanho}'
+    else:
+        fronteira = secrets.token_hex(16)
+        partes = [
+            (
+                f'--{fronteira}\r\nContent-Type: {content_type}\r\n'
+                f'Content-Range: bytes {inicio}-{fim}/{tamanho}\r\n\r\n'.encode(),
+                (inicio, fim),
+            )
+            for inicio, fim in intervalos
+        ]
+        response = StreamingHttpResponse(
+            _Multipart(arquivo, partes, fronteira), status=206,
+            content_type=f'multipart/byteranges; boundary={fronteira}',
+        )
+        response['Content-Length'] = sum(
+            len(cabecalho) + fim + 1 - inicio + 2 for cabecalho, (inicio, fim) in partes
+        ) + len(fronteira) + 6
+        response['Content-Disposition'] = content_disposition_header(anexo, nome)
+
+    response['Accept-Ranges'] = 'bytes'
+    response['ETag'] = etag
+    response['Last-Modified'] = http_date(ultima_alteracao)
+    return response
+
+
+def resposta_de_arquivo(request, arquivo, nome, anexo=False):
+    """Resposta que entrega `arquivo` (FieldFile) inline ou como anexo."""
+    content_type = mimetypes.guess_type(arquivo.name)[0] or 'application/octet-stream'
+    prefixo = getattr(settings, 'MEDIA_ACCEL_REDIRECT', '')
+    if prefixo:
+        response = HttpResponse(content_type=content_type)
+        response['X-Accel-Redirect'] = prefixo.rstrip('/') + '/' + filepath_to_uri(arquivo.name).lstrip('/')
+        response['Content-Disposition'] = content_disposition_header(anexo, nome)
+    else:
+        try:
+            caminho = arquivo.path
+        except NotImplementedError:
+            caminho = None
+        try:
+            if caminho is not None:
+                response = _resposta_parcial(request, open(caminho, 'rb'), content_type, nome, anexo)
+            else:
+                # Storage sem caminho local: sem Range nem sendfile
+                conteudo = arquivo.storage.open(arquivo.name, 'rb')
+                response = FileResponse(conteudo, content_type=content_type, as_attachment=anexo, filename=nome)
+        except FileNotFoundError:
+            raise Http404
+    # Conteúdo restrito: nenhum cache compartilhado deve guardá-lo
+    patch_cache_control(response, private=True)
+    return response
@@ -0,0 +1,224 @@
+"""
+Leitura rápida das listagens (somente leitura).
+
+Para listas grandes, instanciar o ModelSerializer e chamar o
+`to_representation` de cada campo em cada linha domina o tempo de CPU, e
+os serializers de Recurso chamam `request.build_absolute_uri` por linha.
+Aqui cada serializer suportado tem um leitor que busca com `.values()`
+apenas as colunas dos campos pedidos e monta os dicts num laço simples,
+com o prefixo das URLs de arquivo calculado uma vez por requisição.
+
+A saída é idêntica byte a byte à dos serializers (mesma ordem de chaves,
+mesmos formatos de data/UUID e mesmas chaves omitidas quando a relação é
+nula), inclusive com ?fields=/?omit=. Ao alterar os campos de um
+serializer abaixo, altere o leitor correspondente. core.conditional e
+core.response_cache continuam valendo, pois o leitor só substitui a
+serialização.
+
+`python manage.py benchmark_serializacao` compara os dois caminhos.
+"""
+from abc import ABC, abstractmethod
+
+from django.conf import settings
+from django.utils import timezone
+from rest_framework.response import Response
+
+from .downloads import formatador_url_download
+from .fieldsets import selecionar
+from .serializers import (
+    MatriculaSerializer, RecursoAlunoSerializer, RecursoSerializer, TreinamentoSerializer,
+    TurmaSerializer,
+)
+
+
+def _formatador_data_hora():
+    """Mesmo formato do DateTimeField do DRF (ISO 8601 no fuso corrente, 'Z' para UTC)."""
+    fuso = timezone.get_current_timezone() if settings.USE_TZ else None
+
+    def formatar(valor):
+        if valor is None:
+            return None
+        if fuso is not None:
+            valor = valor.astimezone(fuso) if timezone.is_aware(valor) else timezone.make_aware(valor, fuso)
+        texto = valor.isoformat()
+        return texto[:-6] + 'Z' if texto.endswith('+00:00') else texto
+
+    return formatar
+
+
+def _data(valor):
+    return valor.isoformat() if valor else None
+
+
+# Valor dos campos cuja chave o serializer omite (source por relação nula)
+OMITIR = object()
+
+
+def _coluna(nome):
+    return lambda linha: linha[nome]
+
+
+def _relacionado(chave, coluna):
+    # Como no serializer: source='turma.nome' com turma nula omite a chave
+    return lambda linha: OMITIR if linha[chave] is None else linha[coluna]
+
+
+class Leitor(ABC):
+    """
+    Campos de um serializer: (nome, colunas de `.values()`, extrator). A
+    seleção de ?fields=/?omit= (core.fieldsets) reduz campos e colunas.
+    """
+
+    def __init__(self, request, nomes=None):
+        self.request = request
+        self.data_hora = _formatador_data_hora()
+        campos = self.campos()
+        if nomes is not None:
+            nomes = set(nomes)
+            campos = [campo for campo in campos if campo[0] in nomes]
+        self.extratores = [(nome, extrair) for nome, _, extrair in campos]
+        self.colunas = list(dict.fromkeys(coluna for _, colunas, _ in campos for coluna in colunas))
+
+    @abstractmethod
+    def campos(self):
+        """Lista de (nome, colunas, extrator) na ordem dos campos do serializer."""
+
+    def montar(self, linhas):
+        extratores = self.extratores
+        resultado = []
+        for linha in linhas:
+            item = {}
+            for nome, extrair in extratores:
+                valor = extrair(linha)
+                if valor is not OMITIR:
+                    item[nome] = valor
+            resultado.append(item)
+        return resultado
+
+
+class TreinamentoLeitor(Leitor):
+    def campos(self):
+        data_hora = self.data_hora
+        return [
+            ('id', ('id',), lambda linha: str(linha['id'])),
+            ('nome', ('nome',), _coluna('nome')),
+            ('descricao', ('descricao',), _coluna('descricao')),
+            ('nivel', ('nivel',), _coluna('nivel')),
+            ('created_at', ('created_at',), lambda linha: data_hora(linha['created_at'])),
+            ('updated_at', ('updated_at',), lambda linha: data_hora(linha['updated_at'])),
+        ]
+
+
+class TurmaLeitor(Leitor):
+    def campos(self):
+        data_hora = self.data_hora
+        return [
+            ('id', ('id',), lambda linha: str(linha['id'])),
+            ('nome', ('nome',), _coluna('nome')),
+            ('treinamento', ('treinamento_id',), _coluna('treinamento_id')),
+            ('treinamento_nome', ('treinamento__nome',), _coluna('treinamento__nome')),
+            ('data_inicio', ('data_inicio',), lambda linha: _data(linha['data_inicio'])),
+            ('data_conclusao', ('data_conclusao',), lambda linha: _data(linha['data_conclusao'])),
+            ('link_acesso', ('link_acesso',), _coluna('link_acesso')),
+            ('total_alunos', ('total_alunos',), _coluna('total_alunos')),
+            ('created_at', ('created_at',), lambda linha: data_hora(linha['created_at'])),
+            ('updated_at', ('updated_at',), lambda linha: data_hora(linha['updated_at'])),
+        ]
+
+
+class RecursoLeitor(Leitor):
+    def campos(self):
+        data_hora = self.data_hora
+        download = formatador_url_download(self.request) if self.request is not None else None
+        com_request = self.request is not None
+        return [
+            ('id', ('id',), lambda linha: str(linha['id'])),
+            ('nome_recurso', ('nome_recurso',), _coluna('nome_recurso')),
+            ('descricao_recurso', ('descricao_recurso',), _coluna('descricao_recurso')),
+            ('turma', ('turma_id',), _coluna('turma_id')),
+            ('turma_nome', ('turma_id', 'turma__nome'), _relacionado('turma_id', 'turma__nome')),
+            ('treinamento', ('treinamento_id',), _coluna('treinamento_id')),
+            ('treinamento_nome', ('treinamento_id', 'treinamento__nome'),
+             _relacionado('treinamento_id', 'treinamento__nome')),
+            ('tipo_recurso', ('tipo_recurso',), _coluna('tipo_recurso')),
+            ('arquivo_url', ('id', 'arquivo'),
+             lambda linha: download(linha['id']) if linha['arquivo'] and com_request else None),
+            ('acesso_previo', ('acesso_previo',), _coluna('acesso_previo')),
+            ('draft', ('draft',), _coluna('draft')),
+            ('created_at', ('created_at',), lambda linha: data_hora(linha['created_at'])),
+            ('updated_at', ('updated_at',), lambda linha: data_hora(linha['updated_at'])),
+        ]
+
+
+class RecursoAlunoLeitor(Leitor):
+    # pode_acessar é a anotação de core.access
+    def campos(self):
+        data_hora = self.data_hora
+        download = formatador_url_download(self.request) if self.request is not None else None
+        com_request = self.request is not None
+        return [
+            ('id', ('id',), lambda linha: str(linha['id'])),
+            ('nome_recurso', ('nome_recurso',), _coluna('nome_recurso')),
+            ('descricao_recurso', ('descricao_recurso',), _coluna('descricao_recurso')),
+            ('turma', ('turma_id',), _coluna('turma_id')),
+            ('turma_nome', ('turma_id', 'turma__nome'), _relacionado('turma_id', 'turma__nome')),
+            ('treinamento', ('treinamento_id',), _coluna('treinamento_id')),
+            ('tipo_recurso', ('tipo_recurso',), _coluna('tipo_recurso')),
+            ('arquivo_url', ('id', 'arquivo', 'pode_acessar'),
+             lambda linha: (
+                 download(linha['id']) if linha['arquivo'] and linha['pode_acessar'] and com_request else None
+             )),
+            ('pode_acessar', ('pode_acessar',), _coluna('pode_acessar')),
+            ('created_at', ('created_at',), lambda linha: data_hora(linha['created_at'])),
+        ]
+
+
+class MatriculaLeitor(Leitor):
+    def campos(self):
+        data_hora = self.data_hora
+        return [
+            ('id', ('id',), lambda linha: str(linha['id'])),
+            ('aluno', ('aluno_id',), _coluna('aluno_id')),
+            ('aluno_nome', ('aluno__nome',), _coluna('aluno__nome')),
+            ('turma', ('turma_id',), _coluna('turma_id')),
+            ('turma_nome', ('turma__nome',), _coluna('turma__nome')),
+            ('treinamento_nome', ('turma__treinamento__nome',), _coluna('turma__treinamento__nome')),
+            ('data_matricula', ('data_matricula',), lambda linha: data_hora(linha['data_matricula'])),
+            ('created_at', ('created_at',), lambda linha: data_hora(linha['created_at'])),
+            ('updated_at', ('updated_at',), lambda linha: data_hora(linha['updated_at'])),
+        ]
+
+
+LEITORES = {
+    TreinamentoSerializer: TreinamentoLeitor,
+    TurmaSerializer: TurmaLeitor,
+    RecursoSerializer: RecursoLeitor,
+    RecursoAlunoSerializer: RecursoAlunoLeitor,
+    MatriculaSerializer: MatriculaLeitor,
+}
+
+
+def serializar(serializer_class, queryset, request=None):
+    """Lista serializada pelo leitor rápido (mesma saída de `serializer_class(many=True)`)."""
+    leitor = LEITORES[serializer_class](request, selecionar(request, serializer_class().fields.keys()))
+    return leitor.montar(queryset.values(*leitor.colunas))
+
+
+class LeituraRapidaMixin:
+    """
+    `list` de um ViewSet pelo leitor rápido do serializer da action, quando
+    existe um e `API_LEITURA_RAPIDA` está ligado (desligado por padrão).
+    """
+
+    def list(self, request, *args, **kwargs):
+        serializer_class = self.get_serializer_class()
+        leitor_class = LEITORES.get(serializer_class)
+        if leitor_class is None or not getattr(settings, 'API_LEITURA_RAPIDA', False):
+            return super().list(request, *args, **kwargs)
+
+        leitor = leitor_class(request, selecionar(request, serializer_class().fields.keys()))
+        queryset = self.filter_queryset(self.get_queryset()).values(*leitor.colunas)
+        page = self.paginate_queryset(queryset)
+        if page is not None:
+            return self.get_paginated_response(leitor.montar(page))
+        return Response(leitor.montar(queryset))
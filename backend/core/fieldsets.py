@@ -0,0 +1,163 @@
+"""
+Campos esparsos: `?fields=a,b` e `?omit=c` nas leituras da API.
+
+* `CamposDinamicosMixin` (serializers): remove da saída os campos não
+  pedidos, em requisições GET/HEAD;
+* `CamposEsparsosMixin` (ViewSets): leva a mesma seleção ao queryset de
+  `list`/`retrieve`, com `.only()` nas colunas usadas e sem os
+  `select_related` cujos campos não foram pedidos.
+
+As colunas de cada campo vêm do `source` do serializer; campos calculados
+declaram as suas em `colunas_campos` (ex.: `arquivo_url` lê `id` e `arquivo`).
+Quando um campo não tem colunas conhecidas, o queryset fica como está e
+só a saída é reduzida. core.fast_read aplica a mesma seleção aos leitores.
+"""
+from django.core.exceptions import FieldDoesNotExist
+from rest_framework import serializers
+
+PARAMETRO_CAMPOS = 'fields'
+PARAMETRO_OMITIR = 'omit'
+
+
+def _nomes(valor):
+    return {nome.strip() for nome in valor.split(',') if nome.strip()}
+
+
+def selecionar(request, disponiveis):
+    """
+    Nomes de `disponiveis` (na ordem original) pedidos por ?fields=/?omit=,
+    ou None quando a requisição não restringe os campos.
+    """
+    if request is None or request.method not in ('GET', 'HEAD'):
+        return None
+    params = getattr(request, 'query_params', request.GET)
+    campos, omitir = params.get(PARAMETRO_CAMPOS), params.get(PARAMETRO_OMITIR)
+    if not campos and not omitir:
+        return None
+    selecionados = list(disponiveis)
+    if campos:
+        pedidos = _nomes(campos)
+        selecionados = [nome for nome in selecionados if nome in pedidos]
+    if omitir:
+        omitidos = _nomes(omitir)
+        selecionados = [nome for nome in selecionados if nome not in omitidos]
+    return selecionados
+
+
+class CamposDinamicosMixin:
+    """Serializer que respeita ?fields=/?omit= da requisição do contexto."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        selecionados = selecionar(self.context.get('request'), self.fields.keys())
+        if selecionados is not None:
+            for nome in set(self.fields) - set(selecionados):
+                self.fields.pop(nome)
+
+
+def _caminho_do_campo(model, source):
+    """
+    (coluna para `.only()`, relações atravessadas) de um `source` com pontos,
+    ou None se ele não corresponde a campos do model.
+    """
+    partes = source.split('.')
+    relacoes = []
+    for i, parte in enumerate(partes):
+        try:
+            campo = model._meta.get_field(parte)
+        except FieldDoesNotExist:
+            return None
+        if i < len(partes) - 1:
+            if not campo.is_relation or campo.many_to_many or campo.one_to_many:
+                return None
+            relacoes.append('__'.join(partes[:i + 1]))
+            model = campo.related_model
+        elif campo.many_to_many or campo.one_to_many:
+            return None
+    return '__'.join(partes), relacoes
+
+
+def colunas_do_serializer(serializer_class, nomes):
+    """
+    Colunas e relações usadas pelos campos `nomes` do serializer, ou None se
+    algum deles não puder ser mapeado para colunas do model.
+    """
+    model = serializer_class.Meta.model
+    campos = serializer_class().fields
+    declaradas = getattr(serializer_class, 'colunas_campos', {})
+    colunas, relacoes = set(), set()
+    for nome in nomes:
+        if nome in declaradas:
+            colunas.update(declaradas[nome])
+            continue
+        campo = campos[nome]
+        if campo.write_only:
+            continue
+        if isinstance(campo, serializers.SerializerMethodField) or campo.source == '*':
+            return None
+        caminho = _caminho_do_campo(model, campo.source)
+        if caminho is None:
+            return None
+        colunas.add(caminho[0])
+        relacoes.update(caminho[1])
+    return colunas, relacoes
+
+
+def _caminhos_select_related(arvore, prefixo=''):
+    caminhos = []
+    for nome, filhos in arvore.items():
+        caminho = f'{prefixo}{nome}'
+        caminhos.append(caminho)
+        caminhos.extend(_caminhos_select_related(filhos, f'{caminho}__'))
+    return caminhos
+
+
+def podar_queryset(queryset, serializer_class, nomes):
+    """Aplica `.only()` e reduz os `select_related` aos campos `nomes`."""
+    mapeamento = colunas_do_serializer(serializer_class, nomes)
+    if mapeamento is None:
+        return queryset
+    colunas, relacoes = mapeamento
+
+    existentes = queryset.query.select_related
+    if existentes is True:
+        # select_related() sem argumentos: não há como saber o que podar
+        return queryset
+    existentes = _caminhos_select_related(existentes) if existentes else []
+    mantidas = [caminho for caminho in existentes if caminho in relacoes]
+
+    # Relações fora do select_related continuam carregadas sob demanda: basta
+    # a chave estrangeira no nível mais fundo que ainda vem no JOIN
+    somente = {'pk'}
+    for coluna in colunas:
+        partes = coluna.split('__')
+        nivel = len(partes) - 1
+        while nivel and '__'.join(partes[:nivel]) not in mantidas:
+            nivel -= 1
+        somente.add('__'.join(partes[:nivel + 1]))
+    # Ordenação (inclusive a posição do keyset) sem consultas extras por linha
+    nomes_locais = {campo.name for campo in queryset.model._meta.concrete_fields}
+    for ordem in queryset.query.order_by or queryset.model._meta.ordering:
+        if isinstance(ordem, str) and ordem.lstrip('-') in nomes_locais:
+            somente.add(ordem.lstrip('-'))
+    # Chaves estrangeiras das relações mantidas no JOIN
+    somente.update(mantidas)
+
+    queryset = queryset.select_related(None)
+    if mantidas:
+        queryset = queryset.select_related(*mantidas)
+    return queryset.only(*somente)
+
+
+class CamposEsparsosMixin:
+    """ViewSet cujas leituras selecionam só as colunas dos campos pedidos."""
+
+    def filter_queryset(self, queryset):
+        queryset = super().filter_queryset(queryset)
+        if self.action not in ('list', 'retrieve'):
+            return queryset
+        serializer_class = self.get_serializer_class()
+        nomes = selecionar(self.request, serializer_class().fields.keys())
+        if nomes is None:
+            return queryset
+        return podar_queryset(queryset, serializer_class, nomes)
@@ -0,0 +1,230 @@
+"""
+Importação de alunos a partir de CSV/XLSX.
+
+O arquivo é lido linha a linha (CSV via `csv.DictReader` sobre o upload,
+XLSX via openpyxl em modo read-only) e processado em lotes: emails
+existentes e colisões de username são resolvidos com consultas por
+conjunto, e `User`/`Aluno` são criados com `bulk_create`. Linhas inválidas
+entram no relatório sem interromper a importação.
+"""
+import codecs
+import csv
+import zipfile
+from itertools import chain, islice
+
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import User
+from django.core.exceptions import ValidationError
+from django.core.validators import validate_email
+from django.db import IntegrityError, transaction
+
+from .models import Aluno
+from .usernames import alocar_usernames, base_username
+
+TAMANHO_LOTE = 500
+# Bytes lidos do início do CSV para decidir entre UTF-8 e cp1252
+AMOSTRA_CODIFICACAO = 64 * 1024
+# Chave adicionada às linhas do CSV com bytes inválidos na codificação detectada
+LINHA_ILEGIVEL = '__ilegivel__'
+
+
+class FormatoInvalido(Exception):
+    pass
+
+
+def _codificacao_csv(arquivo):
+    """
+    'utf-8-sig' ou, se o início do arquivo não for UTF-8 válido, 'cp1252'
+    (o que o Excel em português no Windows exporta).
+    """
+    amostra = arquivo.read(AMOSTRA_CODIFICACAO)
+    arquivo.seek(0)
+    try:
+        # final=False: a amostra pode cortar um caractere multibyte ao meio
+        codecs.getincrementaldecoder('utf-8')().decode(amostra, final=False)
+    except UnicodeDecodeError:
+        return 'cp1252'
+    return 'utf-8-sig'
+
+
+def _linhas_csv(arquivo):
+    # Iterar o arquivo (upload do Django ou arquivo binário) gera uma linha
+    # por vez; nada além da linha corrente fica em memória
+    codificacao = _codificacao_csv(arquivo)
+    ilegivel = False
+
+    def decodificar():
+        # Bytes inválidos fora da amostra viram U+FFFD e a linha é marcada,
+        # em vez de abortar uma importação com lotes já gravados
+        nonlocal ilegivel
+        for bruta in arquivo:
+            try:
+                yield bruta.decode(codificacao)
+            except UnicodeDecodeError:
+                ilegivel = True
+                yield bruta.decode(codificacao, errors='replace')
+
+    linhas = decodificar()
+    try:
+        primeira = next(linhas, None)
+        if primeira is None:
+            return
+        delimitador = ';' if primeira.count(';') > primeira.count(',') else ','
+        leitor = csv.DictReader(chain([primeira], linhas), delimiter=delimitador)
+        leitor.fieldnames = [(campo or '').strip().lower() for campo in leitor.fieldnames]
+        ilegivel = False
+        for linha in leitor:
+            if ilegivel:
+                linha[LINHA_ILEGIVEL] = True
+                ilegivel = False
+            yield linha
+    except csv.Error as e:
+        raise FormatoInvalido(f'CSV inválido: {e}')
+
+
+def _linhas_xlsx(arquivo):
+    try:
+        from openpyxl import load_workbook
+        from openpyxl.utils.exceptions import InvalidFileException
+    except ImportError:
+        raise FormatoInvalido('Importação de XLSX requer o pacote openpyxl.')
+
+    try:
+        planilha = load_workbook(arquivo, read_only=True, data_only=True).active
+    except (InvalidFileException, zipfile.BadZipFile, KeyError):
+        raise FormatoInvalido('Arquivo XLSX inválido ou corrompido.')
+    linhas = planilha.iter_rows(values_only=True)
+    cabecalho = next(linhas, None)
+    if not cabecalho:
+        return
+    cabecalho = [str(campo or '').strip().lower() for campo in cabecalho]
+    for valores in linhas:
+        yield {
+            campo: '' if valor is None else str(valor)
+            for campo, valor in zip(cabecalho, valores)
+        }
+
+
+def ler_linhas(arquivo, nome_arquivo):
+    """Gera um dict por linha do arquivo, conforme a extensão."""
+    nome_arquivo = (nome_arquivo or '').lower()
+    if nome_arquivo.endswith('.xlsx'):
+        return _linhas_xlsx(arquivo)
+    if nome_arquivo.endswith('.csv'):
+        return _linhas_csv(arquivo)
+    raise FormatoInvalido('Formato não suportado. Envie um arquivo .csv ou .xlsx.')
+
+
+def _validar(dados):
+    erros = {}
+    nome = (dados.get('nome') or '').strip()
+    email = (dados.get('email') or '').strip()
+    telefone = (dados.get('telefone') or '').strip() or None
+
+    if not nome:
+        erros['nome'] = 'Nome é obrigatório.'
+    elif len(nome) > 200:
+        erros['nome'] = 'Nome deve ter no máximo 200 caracteres.'
+    if not email:
+        erros['email'] = 'Email é obrigatório.'
+    else:
+        try:
+            validate_email(email)
+        except ValidationError:
+            erros['email'] = 'Email inválido.'
+    if telefone and len(telefone) > 20:
+        erros['telefone'] = 'Telefone deve ter no máximo 20 caracteres.'
+    if dados.get(LINHA_ILEGIVEL):
+        erros['arquivo'] = 'Linha com caracteres inválidos: salve o CSV como UTF-8.'
+
+    return {'nome': nome, 'email': email, 'telefone': telefone}, erros
+
+
+def _criar_individualmente(validas, relatorio):
+    """Caminho de contingência quando o lote colide com escritas concorrentes."""
+    for numero, dados in validas:
+        username = alocar_usernames([base_username(dados['email'], dados['nome'])])[0]
+        try:
+            with transaction.atomic():
+                user = User.objects.create(
+                    username=username,
+                    first_name=dados['nome'],
+                    email=dados['email'],
+                    password=make_password(None),
+                )
+                Aluno.objects.create(user=user, **dados)
+        except IntegrityError:
+            relatorio['erros'].append({'linha': numero, 'erros': {'email': 'Este email já está em uso.'}})
+        else:
+            relatorio['criados'] += 1
+
+
+def _processar_lote(lote, emails_vistos, relatorio):
+    validas = []
+    for numero, linha in lote:
+        dados, erros = _validar(linha)
+        if not erros and dados['email'] in emails_vistos:
+            erros['email'] = 'Email repetido no arquivo.'
+        if erros:
+            relatorio['erros'].append({'linha': numero, 'erros': erros})
+            continue
+        emails_vistos.add(dados['email'])
+        validas.append((numero, dados))
+
+    # Uma consulta para os emails já cadastrados do lote
+    em_uso = set(
+        Aluno.objects.filter(email__in=[dados['email'] for _, dados in validas])
+        .values_list('email', flat=True)
+    )
+    if em_uso:
+        for numero, dados in validas:
+            if dados['email'] in em_uso:
+                relatorio['erros'].append({'linha': numero, 'erros': {'email': 'Este email já está em uso.'}})
+        validas = [(numero, dados) for numero, dados in validas if dados['email'] not in em_uso]
+    if not validas:
+        return
+
+    usernames = alocar_usernames([base_username(dados['email'], dados['nome']) for _, dados in validas])
+    senha_inutilizavel = make_password(None)
+    users = [
+        User(username=username, first_name=dados['nome'], email=dados['email'], password=senha_inutilizavel)
+        for username, (_, dados) in zip(usernames, validas)
+    ]
+
+    try:
+        with transaction.atomic():
+            User.objects.bulk_create(users)
+            if any(user.pk is None for user in users):
+                # Bancos sem RETURNING no INSERT em lote (ex.: MySQL)
+                ids = dict(User.objects.filter(username__in=usernames).values_list('username', 'pk'))
+                for user in users:
+                    user.pk = ids[user.username]
+            Aluno.objects.bulk_create([
+                Aluno(user=user, **dados) for user, (_, dados) in zip(users, validas)
+            ])
+    except IntegrityError:
+        _criar_individualmente(validas, relatorio)
+    else:
+        relatorio['criados'] += len(validas)
+
+
+def importar_alunos(linhas, tamanho_lote=TAMANHO_LOTE):
+    """
+    Importa alunos a partir de um iterável de dicts (nome, email, telefone).
+
+    Retorna o relatório com o total de linhas lidas, alunos criados e os
+    erros por linha (numeradas a partir de 2, contando o cabeçalho).
+    """
+    relatorio = {'total': 0, 'criados': 0, 'erros': []}
+    emails_vistos = set()
+    numeradas = enumerate(linhas, start=2)
+
+    while True:
+        lote = list(islice(numeradas, tamanho_lote))
+        if not lote:
+            break
+        relatorio['total'] += len(lote)
+        _processar_lote(lote, emails_vistos, relatorio)
+
+    relatorio['erros'].sort(key=lambda erro: erro['linha'])
+    return relatorio
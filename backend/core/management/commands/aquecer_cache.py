@@ -0,0 +1,54 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from core.warmup import aquecer, executar_agendado
+
+
+class Command(BaseCommand):
+    help = (
+        "Pré-calcula no cache o perfil, as turmas e os recursos disponíveis dos alunos "
+        "das turmas que começam nos próximos minutos"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--minutos', type=int, default=None,
+            help='Janela de início das turmas, em minutos (padrão: WARMUP_MINUTOS)'
+        )
+        parser.add_argument(
+            '--intervalo', type=int, default=None,
+            help='Repete o aquecimento a cada N segundos, até ser interrompido (padrão: WARMUP_INTERVALO)'
+        )
+
+    def handle(self, *args, **options):
+        minutos = options['minutos'] or getattr(settings, 'WARMUP_MINUTOS', 30)
+        intervalo = options['intervalo']
+        if intervalo is None:
+            intervalo = getattr(settings, 'WARMUP_INTERVALO', 0)
+
+        if not intervalo:
+            self._relatar(aquecer(minutos))
+            return
+
+        self.stdout.write(f"Aquecendo a cada {intervalo}s (janela de {minutos} min). Ctrl+C para parar.")
+        try:
+            while True:
+                relatorio = executar_agendado(intervalo, minutos)
+                if relatorio is not None:
+                    self._relatar(relatorio)
+                time.sleep(intervalo)
+        except KeyboardInterrupt:
+            pass
+
+    def _relatar(self, relatorio):
+        for turma in relatorio['turmas']:
+            self.stdout.write(
+                f"  {turma['nome']} ({turma['data_inicio']}): "
+                f"{turma['alunos']} aluno(s) em {turma['segundos']:.3f}s"
+            )
+        self.stdout.write(self.style.SUCCESS(
+            f"{len(relatorio['turmas'])} turma(s), {relatorio['alunos']} aluno(s) "
+            f"aquecido(s) em {relatorio['segundos']:.3f}s."
+        ))
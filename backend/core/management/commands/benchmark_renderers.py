@@ -0,0 +1,78 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from rest_framework.renderers import JSONRenderer as DRFJSONRenderer
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+
+from core.fast_read import serializar
+from core.models import Matricula, Recurso, Turma
+from core.renderers import JSONRenderer, MessagePackRenderer, msgpack, orjson
+from core.serializers import MatriculaSerializer, RecursoSerializer, TurmaSerializer
+
+from .benchmark_serializacao import Desfazer, popular_dados_sinteticos
+
+
+class Command(BaseCommand):
+    help = (
+        "Compara tempo de codificação e tamanho das respostas entre o JSON do DRF, "
+        "o JSON de core.renderers (orjson) e o MessagePack, em dados sintéticos desfeitos ao final"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--linhas', type=int, default=10000, help='Linhas por payload (padrão: 10000)')
+        parser.add_argument('--repeticoes', type=int, default=5, help='Execuções por formato; vale a melhor')
+
+    def _medir(self, renderer, dados, repeticoes):
+        melhor, conteudo = None, None
+        for _ in range(repeticoes):
+            inicio = time.perf_counter()
+            conteudo = renderer.render(dados)
+            duracao = time.perf_counter() - inicio
+            melhor = duracao if melhor is None else min(melhor, duracao)
+        return melhor, conteudo
+
+    def handle(self, *args, **options):
+        linhas, repeticoes = options['linhas'], options['repeticoes']
+        if linhas < 1 or repeticoes < 1:
+            raise CommandError("--linhas e --repeticoes devem ser positivos.")
+
+        renderers = [('JSON (DRF)', DRFJSONRenderer())]
+        if orjson is not None:
+            renderers.append(('JSON (orjson)', JSONRenderer()))
+        else:
+            self.stdout.write(self.style.WARNING("orjson não instalado: core.renderers usa o JSON do DRF."))
+        if msgpack is not None:
+            renderers.append(('MessagePack', MessagePackRenderer()))
+        else:
+            self.stdout.write(self.style.WARNING("msgpack não instalado: formato omitido."))
+
+        host = next((h for h in settings.ALLOWED_HOSTS if h not in ('*', '') and not h.startswith('.')), 'localhost')
+        request = Request(APIRequestFactory().get('/api/recursos/', HTTP_HOST=host))
+
+        try:
+            with transaction.atomic():
+                self.stdout.write(f"Criando {linhas} linha(s) por model (desfeitas ao final)...")
+                popular_dados_sinteticos(linhas)
+                payloads = [
+                    ('Recursos', serializar(RecursoSerializer, Recurso.objects.order_by('-created_at')[:linhas], request)),
+                    ('Turmas', serializar(TurmaSerializer, Turma.objects.order_by('-data_inicio')[:linhas], request)),
+                    ('Matrículas', serializar(MatriculaSerializer, Matricula.objects.order_by('-data_matricula')[:linhas], request)),
+                    # Linhas cruas: UUID, date e datetime ainda como objetos Python
+                    ('Turmas (.values())', list(Turma.objects.values()[:linhas])),
+                ]
+                for nome, dados in payloads:
+                    self.stdout.write(f"{nome}:")
+                    base = None
+                    for rotulo, renderer in renderers:
+                        tempo, conteudo = self._medir(renderer, dados, repeticoes)
+                        base = base or tempo
+                        self.stdout.write(
+                            f"  {rotulo:<14} {tempo * 1000:8.1f} ms  {base / tempo:5.1f}x  "
+                            f"{len(conteudo) / 1024:9.1f} KiB"
+                        )
+                raise Desfazer
+        except Desfazer:
+            pass
@@ -0,0 +1,121 @@
+import time
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from rest_framework.renderers import JSONRenderer
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+
+from core.fast_read import serializar
+from core.models import Aluno, Matricula, Recurso, Treinamento, Turma
+from core.serializers import MatriculaSerializer, RecursoSerializer, TreinamentoSerializer, TurmaSerializer
+
+
+def popular_dados_sinteticos(linhas):
+    """Cria `linhas` treinamentos, turmas, recursos, alunos e matrículas (use dentro de uma transação)."""
+    treinamento = Treinamento.objects.create(nome='Benchmark', descricao='Dados sintéticos')
+    Treinamento.objects.bulk_create(
+        (
+            Treinamento(nome=f'Treinamento {n}', descricao='Descrição', nivel='intermediario')
+            for n in range(linhas - 1)
+        ),
+        batch_size=1000,
+    )
+    turma = Turma(treinamento=treinamento, nome='Turma', data_inicio='2024-01-01', data_conclusao='2024-12-31')
+    Turma.objects.bulk_create(
+        [turma] + [
+            Turma(treinamento=treinamento, nome=f'Turma {n}', data_inicio='2024-01-01',
+                  data_conclusao='2024-12-31', link_acesso='https://example.com/aula')
+            for n in range(linhas - 1)
+        ],
+        batch_size=1000,
+    )
+    Recurso.objects.bulk_create(
+        (
+            Recurso(
+                turma=turma if n % 2 else None, treinamento=None if n % 2 else treinamento,
+                nome_recurso=f'Recurso {n}', tipo_recurso='arquivo_pdf',
+                arquivo=f'recursos/arquivo_{n}.pdf', draft=False,
+            )
+            for n in range(linhas)
+        ),
+        batch_size=1000,
+    )
+    users = User.objects.bulk_create(
+        (User(username=f'benchmark_{n}') for n in range(linhas)), batch_size=1000
+    )
+    alunos = Aluno.objects.bulk_create(
+        (Aluno(user=user, nome=f'Aluno {n}', email=f'benchmark{n}@example.com') for n, user in enumerate(users)),
+        batch_size=1000,
+    )
+    Matricula.objects.bulk_create(
+        [Matricula(turma=turma, aluno=aluno) for aluno in alunos], batch_size=1000
+    )
+
+
+class Desfazer(Exception):
+    """Desfaz a transação dos dados sintéticos ao final do benchmark."""
+
+
+class Command(BaseCommand):
+    help = (
+        "Compara o tempo de serialização das listagens pelo ModelSerializer e pela "
+        "leitura rápida (core.fast_read) em dados sintéticos, desfeitos ao final"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--linhas', type=int, default=10000, help='Linhas por listagem (padrão: 10000)')
+        parser.add_argument('--repeticoes', type=int, default=3, help='Execuções por caminho; vale a melhor')
+
+    def _medir(self, funcao, repeticoes):
+        melhor, resultado = None, None
+        for _ in range(repeticoes):
+            inicio = time.perf_counter()
+            resultado = funcao()
+            duracao = time.perf_counter() - inicio
+            melhor = duracao if melhor is None else min(melhor, duracao)
+        return melhor, resultado
+
+    def handle(self, *args, **options):
+        linhas, repeticoes = options['linhas'], options['repeticoes']
+        if linhas < 1 or repeticoes < 1:
+            raise CommandError("--linhas e --repeticoes devem ser positivos.")
+
+        # Host aceito por ALLOWED_HOSTS, para montar as URLs absolutas de arquivo
+        host = next((h for h in settings.ALLOWED_HOSTS if h not in ('*', '') and not h.startswith('.')), 'localhost')
+        request = Request(APIRequestFactory().get('/api/recursos/', HTTP_HOST=host))
+        renderer = JSONRenderer()
+        # id desempata as linhas criadas no mesmo instante
+        casos = [
+            ('Treinamento', TreinamentoSerializer, Treinamento.objects.order_by('-created_at', 'id')),
+            ('Turma', TurmaSerializer,
+             Turma.objects.select_related('treinamento').order_by('-data_inicio', 'id')),
+            ('Recurso', RecursoSerializer,
+             Recurso.objects.select_related('turma', 'treinamento').order_by('-created_at', 'id')),
+            ('Matricula', MatriculaSerializer,
+             Matricula.objects.select_related('aluno', 'turma__treinamento').order_by('-data_matricula', 'id')),
+        ]
+
+        try:
+            with transaction.atomic():
+                self.stdout.write(f"Criando {linhas} linha(s) por model (desfeitas ao final)...")
+                popular_dados_sinteticos(linhas)
+                for nome, serializer_class, queryset in casos:
+                    queryset = queryset[:linhas]
+                    tempo_drf, corpo_drf = self._medir(lambda: renderer.render(
+                        serializer_class(queryset.all(), many=True, context={'request': request}).data
+                    ), repeticoes)
+                    tempo_rapido, corpo_rapido = self._medir(lambda: renderer.render(
+                        serializar(serializer_class, queryset.all(), request)
+                    ), repeticoes)
+                    identico = 'idêntica' if corpo_drf == corpo_rapido else 'DIFERENTE'
+                    self.stdout.write(
+                        f"  {nome:<12} serializer {tempo_drf * 1000:8.1f} ms | "
+                        f"leitura rápida {tempo_rapido * 1000:8.1f} ms | "
+                        f"{tempo_drf / tempo_rapido:5.1f}x | saída {identico} ({len(corpo_drf)} bytes)"
+                    )
+                raise Desfazer
+        except Desfazer:
+            pass
@@ -0,0 +1,37 @@
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+
+from core.importacao import TAMANHO_LOTE, FormatoInvalido, importar_alunos, ler_linhas
+
+
+class Command(BaseCommand):
+    help = "Importa alunos de um arquivo CSV ou XLSX (colunas: nome, email, telefone)"
+
+    def add_arguments(self, parser):
+        parser.add_argument('arquivo', help='Caminho do arquivo .csv ou .xlsx')
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=TAMANHO_LOTE,
+            help=f'Linhas por lote (padrão: {TAMANHO_LOTE})',
+        )
+
+    def handle(self, *args, **options):
+        caminho = options['arquivo']
+        try:
+            with open(caminho, 'rb') as arquivo:
+                relatorio = importar_alunos(ler_linhas(arquivo, caminho), options['batch_size'])
+        except FormatoInvalido as e:
+            raise CommandError(str(e))
+        except OSError as e:
+            raise CommandError(f"Não foi possível ler {caminho}: {e}")
+
+        for erro in relatorio['erros']:
+            self.stdout.write(f"Linha {erro['linha']}: {json.dumps(erro['erros'], ensure_ascii=False)}")
+
+        estilo = self.style.SUCCESS if not relatorio['erros'] else self.style.WARNING
+        self.stdout.write(estilo(
+            f"{relatorio['criados']} de {relatorio['total']} aluno(s) importado(s); "
+            f"{len(relatorio['erros'])} linha(s) com erro."
+        ))
@@ -0,0 +1,25 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from core.uploads import limpar_expiradas
+
+
+class Command(BaseCommand):
+    help = "Descarta uploads retomáveis sem partes novas há mais de --horas horas e seus arquivos parciais"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--horas',
+            type=int,
+            default=None,
+            help='Horas sem atividade (padrão: UPLOAD_RETOMAVEL_EXPIRACAO)',
+        )
+
+    def handle(self, *args, **options):
+        horas = options['horas']
+        if horas is None:
+            horas = getattr(settings, 'UPLOAD_RETOMAVEL_EXPIRACAO', 24)
+        if horas < 0:
+            raise CommandError("--horas não pode ser negativo.")
+        removidas = limpar_expiradas(horas)
+        self.stdout.write(self.style.SUCCESS(f"{removidas} upload(s) expirado(s) descartado(s)."))
@@ -0,0 +1,42 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from core.counters import divergencias, recalcular_contadores
+
+
+class Command(BaseCommand):
+    help = "Recalcula Turma.total_alunos e Aluno.total_matriculas a partir das matrículas"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Apenas lista os contadores divergentes, sem corrigir',
+        )
+
+    def handle(self, *args, **options):
+        turmas, alunos = divergencias()
+
+        for pk, atual, real in turmas:
+            self.stdout.write(f"Turma {pk}: total_alunos={atual}, real={real}")
+        for pk, atual, real in alunos:
+            self.stdout.write(f"Aluno {pk}: total_matriculas={atual}, real={real}")
+
+        if not turmas and not alunos:
+            self.stdout.write(self.style.SUCCESS("Nenhuma divergência encontrada."))
+            return
+
+        if options['dry_run']:
+            self.stdout.write(self.style.WARNING(
+                f"{len(turmas)} turma(s) e {len(alunos)} aluno(s) divergentes (dry-run)."
+            ))
+            return
+
+        with transaction.atomic():
+            recalcular_contadores(
+                turma_ids=[pk for pk, _, _ in turmas],
+                aluno_ids=[pk for pk, _, _ in alunos],
+            )
+        self.stdout.write(self.style.SUCCESS(
+            f"Corrigidos {len(turmas)} turma(s) e {len(alunos)} aluno(s)."
+        ))
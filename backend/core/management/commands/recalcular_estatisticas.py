@@ -0,0 +1,28 @@
+from datetime import date
+
+from django.core.management.base import BaseCommand, CommandError
+
+from core.stats import recalcular_estatisticas
+
+
+def _data(valor):
+    try:
+        return date.fromisoformat(valor)
+    except ValueError:
+        raise CommandError(f"Data inválida: {valor} (use AAAA-MM-DD)")
+
+
+class Command(BaseCommand):
+    help = "Preenche ou corrige as estatísticas diárias (DailyStats) a partir das tabelas de origem"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--desde', type=_data, help='Primeiro dia a recalcular (AAAA-MM-DD)')
+        parser.add_argument('--ate', type=_data, help='Último dia a recalcular (AAAA-MM-DD)')
+
+    def handle(self, *args, **options):
+        inicio, fim = options['desde'], options['ate']
+        if inicio and fim and inicio > fim:
+            raise CommandError("--desde deve ser anterior ou igual a --ate.")
+
+        linhas = recalcular_estatisticas(inicio, fim)
+        self.stdout.write(self.style.SUCCESS(f"{linhas} linha(s) de estatísticas diárias gravada(s)."))
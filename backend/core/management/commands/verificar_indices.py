@@ -0,0 +1,121 @@
+import re
+import uuid
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+
+from core.access import recursos_disponiveis
+from core.models import Aluno, Treinamento, Turma
+from core.views import (
+    AlunoViewSet, MatriculaViewSet, RecursoViewSet, TreinamentoViewSet, TurmaViewSet
+)
+
+
+# Padrões de varredura sequencial por banco; linhas de SCAN de tabelas FTS5
+# (SQLite: VIRTUAL TABLE) filtram pelo MATCH e não são sinalizadas.
+SEQ_SCAN = {
+    'sqlite': re.compile(r'\bSCAN (?:TABLE )?(?!CONSTANT ROW)(\S+)(?!.*(?:USING (?:COVERING )?INDEX|VIRTUAL TABLE))'),
+    'postgresql': re.compile(r'Seq Scan on (\S+)'),
+}
+
+# Varredura completa de um índice (SQLite: "SCAN tabela USING INDEX ...", sem
+# SEARCH): só evita a ordenação e lê a tabela inteira quando há filtro. É o
+# plano esperado apenas nas listagens sem filtro, que param no LIMIT.
+INDEX_SCAN = {
+    'sqlite': re.compile(r'\bSCAN (?:TABLE )?(\S+) USING (?:COVERING )?INDEX'),
+}
+
+
+def _pk(model):
+    """Usa um id existente quando há dados; caso contrário, um UUID qualquer."""
+    return model.objects.values_list('pk', flat=True).first() or uuid.uuid4()
+
+
+class Command(BaseCommand):
+    help = "Executa EXPLAIN nas consultas canônicas dos ViewSets e sinaliza varreduras sequenciais"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--strict',
+            action='store_true',
+            help='Falha (código de saída != 0) se alguma varredura sequencial for encontrada',
+        )
+        parser.add_argument(
+            '--page-size',
+            type=int,
+            default=20,
+            help='Tamanho da página aplicado às listagens (padrão: 20)',
+        )
+
+    def _queryset(self, viewset_class, user, params):
+        request = Request(APIRequestFactory().get('/', params))
+        request.user = user
+        view = viewset_class(request=request, action='list', format_kwarg=None, kwargs={})
+        return view.get_queryset()
+
+    def casos(self):
+        admin = User(username='explain-admin', is_staff=True)
+        aluno = Aluno.objects.first() or Aluno(id=uuid.uuid4())
+        aluno_user = User(username='explain-aluno', is_staff=False)
+        aluno_user.aluno_profile = aluno
+
+        treinamento_id = _pk(Treinamento)
+        turma_id = _pk(Turma)
+
+        # (nome, queryset, listagem sem filtro: pode percorrer o índice da ordenação)
+        return [
+            ('TreinamentoViewSet.list', self._queryset(TreinamentoViewSet, admin, {}), True),
+            ('TurmaViewSet.list', self._queryset(TurmaViewSet, admin, {}), True),
+            ('TurmaViewSet.list ?search', self._queryset(TurmaViewSet, admin, {'search': 'python'}), False),
+            ('TurmaViewSet.list ?treinamento',
+             self._queryset(TurmaViewSet, admin, {'treinamento': treinamento_id}), False),
+            ('RecursoViewSet.list (admin)', self._queryset(RecursoViewSet, admin, {}), True),
+            ('RecursoViewSet.list ?turma (aluno)',
+             self._queryset(RecursoViewSet, aluno_user, {'turma': turma_id}), False),
+            ('RecursoViewSet.list ?treinamento',
+             self._queryset(RecursoViewSet, admin, {'treinamento': treinamento_id}), False),
+            ('AlunoViewSet.list', self._queryset(AlunoViewSet, admin, {}), True),
+            ('AlunoViewSet.list ?search', self._queryset(AlunoViewSet, admin, {'search': 'silva'}), False),
+            # Caminho SQL do cache de acesso: só usado para alunos com muitos
+            # recursos, em que percorrer created_at até o LIMIT é o melhor plano
+            ('AlunoViewSet.recursos_disponiveis', recursos_disponiveis(aluno).order_by('-created_at'), True),
+            ('MatriculaViewSet.list', self._queryset(MatriculaViewSet, admin, {}), True),
+            ('MatriculaViewSet.list ?aluno', self._queryset(MatriculaViewSet, admin, {'aluno': _pk(Aluno)}), False),
+            ('MatriculaViewSet.list ?turma', self._queryset(MatriculaViewSet, admin, {'turma': turma_id}), False),
+        ]
+
+    def handle(self, *args, **options):
+        padrao = SEQ_SCAN.get(connection.vendor)
+        padrao_indice = INDEX_SCAN.get(connection.vendor)
+        if padrao is None:
+            self.stdout.write(self.style.WARNING(
+                f"Banco '{connection.vendor}' não suportado; os planos serão exibidos sem análise."
+            ))
+
+        sinalizados = []
+        for nome, queryset, sem_filtro in self.casos():
+            plano = queryset[:options['page_size']].explain()
+            tabelas = set(padrao.findall(plano)) if padrao else set()
+            if padrao_indice and not sem_filtro:
+                tabelas.update(padrao_indice.findall(plano))
+            tabelas = sorted(tabelas)
+
+            self.stdout.write(self.style.MIGRATE_HEADING(nome))
+            self.stdout.write(plano)
+            if tabelas:
+                sinalizados.append((nome, tabelas))
+                self.stdout.write(self.style.WARNING(f"  varredura sequencial: {', '.join(tabelas)}"))
+            else:
+                self.stdout.write(self.style.SUCCESS("  OK"))
+
+        if not sinalizados:
+            self.stdout.write(self.style.SUCCESS("Nenhuma varredura sequencial encontrada."))
+            return
+
+        resumo = f"{len(sinalizados)} consulta(s) com varredura sequencial."
+        if options['strict']:
+            raise CommandError(resumo)
+        self.stdout.write(self.style.WARNING(resumo))
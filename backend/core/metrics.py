@@ -0,0 +1,108 @@
+"""
+Métricas do dashboard administrativo.
+
+Agregadas no banco (Count/Avg condicionais e TruncMonth), em vez de o
+frontend baixar as listas completas de alunos e turmas; a série mensal vem
+da tabela consolidada DailyStats (core.stats). O resultado fica em cache
+por `DASHBOARD_METRICS_TTL` segundos.
+"""
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Avg, Count, Q, Sum
+from django.db.models.functions import TruncMonth
+from django.utils import timezone
+
+from .models import Aluno, DailyStats, Matricula, Recurso, Treinamento, Turma
+from .stats import inicio_do_dia
+
+CACHE_KEY = 'dashboard:metrics'
+MESES_SERIE = 12
+DIAS_TURMA_ATIVA = 90
+
+
+def _inicio_do_mes(dia, meses_atras=0):
+    ano, mes = divmod(dia.year * 12 + dia.month - 1 - meses_atras, 12)
+    return dia.replace(year=ano, month=mes + 1, day=1)
+
+
+def _serie_mensal(meses, hoje):
+    """Novos alunos e matrículas por mês, lidos das linhas globais de DailyStats."""
+    por_mes = {
+        linha['mes']: linha
+        for linha in DailyStats.objects.filter(
+            dia__gte=meses[0], dia__lte=hoje, treinamento_id=None, turma_id=None
+        )
+        .annotate(mes=TruncMonth('dia'))
+        .values('mes')
+        .annotate(novos_alunos=Sum('novos_alunos'), novas_matriculas=Sum('novas_matriculas'))
+        .order_by()
+    }
+    return [
+        {
+            'mes': mes.strftime('%Y-%m'),
+            'novos_alunos': por_mes.get(mes, {}).get('novos_alunos', 0),
+            'novas_matriculas': por_mes.get(mes, {}).get('novas_matriculas', 0),
+        }
+        for mes in meses
+    ]
+
+
+def calcular_metricas(hoje=None):
+    hoje = hoje or timezone.localdate()
+    inicio_mes = _inicio_do_mes(hoje)
+    inicio_mes_anterior = _inicio_do_mes(hoje, 1)
+
+    alunos = Aluno.objects.aggregate(
+        total=Count('pk'),
+        este_mes=Count('pk', filter=Q(created_at__gte=inicio_do_dia(inicio_mes))),
+        mes_anterior=Count('pk', filter=Q(
+            created_at__gte=inicio_do_dia(inicio_mes_anterior), created_at__lt=inicio_do_dia(inicio_mes)
+        )),
+    )
+    turmas = Turma.objects.aggregate(
+        total=Count('pk'),
+        ativas=Count('pk', filter=Q(
+            data_inicio__gte=hoje - timedelta(days=DIAS_TURMA_ATIVA), data_inicio__lte=hoje
+        )),
+        # total_alunos é o contador de matrículas mantido em core.counters
+        media_alunos=Avg('total_alunos'),
+    )
+    treinamentos = Treinamento.objects.count()
+    recursos = Recurso.objects.count()
+    matriculas = Matricula.objects.count()
+
+    if alunos['mes_anterior']:
+        crescimento = (alunos['este_mes'] - alunos['mes_anterior']) / alunos['mes_anterior'] * 100
+    else:
+        crescimento = 100 if alunos['este_mes'] else 0
+
+    meses = [_inicio_do_mes(hoje, n) for n in range(MESES_SERIE - 1, -1, -1)]
+
+    return {
+        'totais': {
+            'treinamentos': treinamentos,
+            'turmas': turmas['total'],
+            'alunos': alunos['total'],
+            'recursos': recursos,
+            'matriculas': matriculas,
+        },
+        'alunos_este_mes': alunos['este_mes'],
+        'alunos_mes_anterior': alunos['mes_anterior'],
+        'crescimento_alunos': round(crescimento, 1),
+        'turmas_ativas': turmas['ativas'],
+        'media_alunos_por_turma': round(turmas['media_alunos'] or 0, 1),
+        'utilizacao_recursos': round(recursos / max(treinamentos, 1) * 100, 1),
+        'serie_mensal': _serie_mensal(meses, hoje),
+        'gerado_em': timezone.now().isoformat(),
+    }
+
+
+def metricas_dashboard():
+    """Métricas do dashboard, servidas do cache enquanto o TTL não expira."""
+    metricas = cache.get(CACHE_KEY)
+    if metricas is None:
+        metricas = calcular_metricas()
+        cache.set(CACHE_KEY, metricas, getattr(settings, 'DASHBOARD_METRICS_TTL', 60))
+    return metricas
@@ -0,0 +1,50 @@
+from django.db import migrations, models
+from django.db.models import Count, IntegerField, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+
+
+def preencher_contadores(apps, schema_editor):
+    Turma = apps.get_model("core", "Turma")
+    Aluno = apps.get_model("core", "Aluno")
+    Matricula = apps.get_model("core", "Matricula")
+
+    def contagem(campo):
+        return Coalesce(
+            Subquery(
+                Matricula.objects.filter(**{campo: OuterRef("pk")})
+                .order_by()
+                .values(campo)
+                .annotate(total=Count("pk"))
+                .values("total"),
+                output_field=IntegerField(),
+            ),
+            Value(0),
+        )
+
+    Turma.objects.update(total_alunos=contagem("turma"))
+    Aluno.objects.update(total_matriculas=contagem("aluno"))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("core", "0004_treinamento_nivel"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="turma",
+            name="total_alunos",
+            field=models.PositiveIntegerField(
+                default=0, editable=False, verbose_name="Total de Alunos"
+            ),
+        ),
+        migrations.AddField(
+            model_name="aluno",
+            name="total_matriculas",
+            field=models.PositiveIntegerField(
+                default=0, editable=False, verbose_name="Total de Matrículas"
+            ),
+        ),
+        migrations.RunPython(preencher_contadores, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,49 @@
+# Generated by Django 4.2.16 on 2026-10-18 03:39
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("core", "0005_contadores_matricula"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="aluno",
+            index=models.Index(fields=["nome"], name="aluno_nome_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="matricula",
+            index=models.Index(fields=["aluno", "data_matricula"], name="matricula_aluno_data_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="matricula",
+            index=models.Index(fields=["-data_matricula"], name="matricula_data_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="recurso",
+            index=models.Index(fields=["turma", "draft", "acesso_previo"], name="recurso_turma_acesso_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="recurso",
+            index=models.Index(fields=["treinamento", "draft"], name="recurso_treinamento_draft_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="recurso",
+            index=models.Index(fields=["-created_at"], name="recurso_created_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="treinamento",
+            index=models.Index(fields=["-created_at"], name="treinamento_created_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="turma",
+            index=models.Index(fields=["treinamento", "data_inicio"], name="turma_treinamento_inicio_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="turma",
+            index=models.Index(fields=["-data_inicio"], name="turma_inicio_idx"),
+        ),
+    ]
@@ -0,0 +1,77 @@
+from django.db import migrations
+
+# Índices GIN (PostgreSQL): mesmas expressões usadas em core.search
+GIN_POSTGRESQL = {
+    "Treinamento": ["nome", "descricao"],
+    "Turma": ["nome"],
+    "Recurso": ["nome_recurso", "descricao_recurso"],
+    "Aluno": ["nome", "email"],
+}
+
+
+def criar_busca(apps, schema_editor):
+    connection = schema_editor.connection
+
+    if connection.vendor == "sqlite":
+        from core.search import instalar_fts_sqlite
+
+        with connection.cursor() as cursor:
+            instalar_fts_sqlite(cursor)
+
+    elif connection.vendor == "postgresql":
+        from django.contrib.postgres.indexes import GinIndex
+        from django.contrib.postgres.search import SearchVector
+
+        with connection.cursor() as cursor:
+            cursor.execute("CREATE EXTENSION IF NOT EXISTS unaccent")
+            cursor.execute(
+                "DO $$ BEGIN "
+                "IF NOT EXISTS (SELECT 1 FROM pg_ts_config WHERE cfgname = 'pt_unaccent') THEN "
+                "CREATE TEXT SEARCH CONFIGURATION pt_unaccent (COPY = portuguese); "
+                "ALTER TEXT SEARCH CONFIGURATION pt_unaccent "
+                "ALTER MAPPING FOR hword, hword_part, word WITH unaccent, portuguese_stem; "
+                "END IF; END $$"
+            )
+
+        for modelo, campos in GIN_POSTGRESQL.items():
+            model = apps.get_model("core", modelo)
+            schema_editor.add_index(
+                model,
+                GinIndex(
+                    SearchVector(*campos, config="pt_unaccent"),
+                    name=f"{model._meta.db_table}_busca_gin",
+                ),
+            )
+        # Busca de turmas pelo nome do treinamento
+        schema_editor.add_index(
+            apps.get_model("core", "Treinamento"),
+            GinIndex(SearchVector("nome", config="pt_unaccent"), name="core_treinamento_nome_gin"),
+        )
+
+
+def remover_busca(apps, schema_editor):
+    connection = schema_editor.connection
+
+    if connection.vendor == "sqlite":
+        from core.search import remover_fts_sqlite
+
+        with connection.cursor() as cursor:
+            remover_fts_sqlite(cursor)
+
+    elif connection.vendor == "postgresql":
+        with connection.cursor() as cursor:
+            for modelo in GIN_POSTGRESQL:
+                tabela = apps.get_model("core", modelo)._meta.db_table
+                cursor.execute(f"DROP INDEX IF EXISTS {tabela}_busca_gin")
+            cursor.execute("DROP INDEX IF EXISTS core_treinamento_nome_gin")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("core", "0006_indices_compostos"),
+    ]
+
+    operations = [
+        migrations.RunPython(criar_busca, remover_busca),
+    ]
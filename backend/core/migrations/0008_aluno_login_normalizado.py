@@ -0,0 +1,35 @@
+# Generated by Django 4.2.16 on 2026-10-18 03:44
+
+import unicodedata
+
+from django.db import migrations, models
+
+
+def normalizar_login(valor):
+    decomposto = unicodedata.normalize("NFKD", valor or "")
+    sem_acentos = "".join(c for c in decomposto if not unicodedata.combining(c))
+    return " ".join(sem_acentos.casefold().split())
+
+
+def preencher_login_normalizado(apps, schema_editor):
+    Aluno = apps.get_model("core", "Aluno")
+    alunos = list(Aluno.objects.only("id", "nome"))
+    for aluno in alunos:
+        aluno.login_normalizado = normalizar_login(aluno.nome)
+    Aluno.objects.bulk_update(alunos, ["login_normalizado"], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("core", "0007_busca_textual"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="aluno",
+            name="login_normalizado",
+            field=models.CharField(db_index=True, default="", editable=False, max_length=200),
+        ),
+        migrations.RunPython(preencher_login_normalizado, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,65 @@
+# Generated by Django 4.2.16 on 2026-10-18 03:57
+
+from django.db import migrations, models
+
+
+def preencher_estatisticas(apps, schema_editor):
+    from core.stats import recalcular_estatisticas
+
+    recalcular_estatisticas()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("core", "0008_aluno_login_normalizado"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="DailyStats",
+            fields=[
+                ("id", models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name="ID")),
+                ("dia", models.DateField(verbose_name="Dia")),
+                ("treinamento_id", models.UUIDField(blank=True, null=True)),
+                ("turma_id", models.UUIDField(blank=True, null=True)),
+                ("novos_alunos", models.IntegerField(default=0)),
+                ("novas_matriculas", models.IntegerField(default=0)),
+                ("recursos_publicados", models.IntegerField(default=0)),
+                ("turmas_ativas", models.IntegerField(default=0)),
+            ],
+            options={
+                "verbose_name": "Estatística Diária",
+                "verbose_name_plural": "Estatísticas Diárias",
+                "ordering": ["dia"],
+                "indexes": [
+                    models.Index(fields=["treinamento_id", "dia"], name="dailystats_treinamento_idx"),
+                    models.Index(fields=["turma_id", "dia"], name="dailystats_turma_idx"),
+                ],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name="dailystats",
+            constraint=models.UniqueConstraint(
+                fields=("dia", "treinamento_id", "turma_id"), name="dailystats_escopo_uniq"
+            ),
+        ),
+        migrations.AddConstraint(
+            model_name="dailystats",
+            constraint=models.UniqueConstraint(
+                condition=models.Q(("turma_id__isnull", True)),
+                fields=("dia", "treinamento_id"),
+                name="dailystats_treinamento_uniq",
+            ),
+        ),
+        migrations.AddConstraint(
+            model_name="dailystats",
+            constraint=models.UniqueConstraint(
+                condition=models.Q(("treinamento_id__isnull", True), ("turma_id__isnull", True)),
+                fields=("dia",),
+                name="dailystats_global_uniq",
+            ),
+        ),
+        # Preenche o histórico a partir das tabelas (mesmo cálculo do comando recalcular_estatisticas)
+        migrations.RunPython(preencher_estatisticas, migrations.RunPython.noop),
+    ]
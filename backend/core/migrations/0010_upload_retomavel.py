@@ -0,0 +1,42 @@
+# Generated by Django 4.2.16 on 2026-10-18 04:29
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+import uuid
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ("core", "0009_estatisticas_diarias"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="UploadRetomavel",
+            fields=[
+                ("id", models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ("nome_arquivo", models.CharField(max_length=255, verbose_name="Nome do Arquivo")),
+                ("tamanho", models.PositiveBigIntegerField(verbose_name="Tamanho")),
+                ("recebido", models.PositiveBigIntegerField(default=0, verbose_name="Recebido")),
+                ("sha256", models.CharField(blank=True, default="", max_length=64, verbose_name="SHA-256")),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+                (
+                    "usuario",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="uploads_retomaveis",
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Upload Retomável",
+                "verbose_name_plural": "Uploads Retomáveis",
+                "ordering": ["-created_at"],
+            },
+        ),
+    ]
@@ -1,8 +1,12 @@
-from django.db import models
+from django.db import models, transaction
 from django.contrib.auth.models import User
 from django.core.validators import FileExtensionValidator
+from collections import Counter
+from contextlib import nullcontext
+import unicodedata
 import uuid
 import os
+from .response_cache import incrementar_versao
 
 def upload_to(instance, filename):
     """Generate upload path for files"""
@@ -10,6 +14,60 @@ def upload_to(instance, filename):
     filename = f"{uuid.uuid4()}.{ext}"
     return os.path.join('recursos', filename)
 
+def normalizar_login(valor):
+    """Chave de login: sem acentos, casefold e espaços colapsados."""
+    decomposto = unicodedata.normalize('NFKD', valor or '')
+    sem_acentos = ''.join(c for c in decomposto if not unicodedata.combining(c))
+    return ' '.join(sem_acentos.casefold().split())
+
+def _preservar_contadores(instance, save_kwargs, *contadores):
+    """
+    Exclui os contadores desnormalizados de um save() de instância existente,
+    para que o valor carregado em memória não sobrescreva o mantido no banco.
+    """
+    if instance._state.adding or save_kwargs.get('update_fields') is not None:
+        return
+    save_kwargs['update_fields'] = [
+        field.name for field in instance._meta.concrete_fields
+        if not field.primary_key and field.name not in contadores
+    ]
+
+class VersionadoQuerySet(models.QuerySet):
+    """
+    Operações em lote não disparam signals: invalida o cache de respostas
+    (core.response_cache) depois de gravar.
+    """
+    def update(self, **kwargs):
+        linhas = super().update(**kwargs)
+        incrementar_versao(self.model)
+        return linhas
+
+    def bulk_create(self, objs, *args, **kwargs):
+        objs = super().bulk_create(objs, *args, **kwargs)
+        incrementar_versao(self.model)
+        return objs
+
+    def bulk_update(self, objs, fields, *args, **kwargs):
+        linhas = super().bulk_update(objs, fields, *args, **kwargs)
+        incrementar_versao(self.model)
+        return linhas
+
+class TreinamentoQuerySet(VersionadoQuerySet):
+    # Nome e descrição aparecem nas turmas em cache de cada aluno (core.warmup)
+    def update(self, **kwargs):
+        from .access import invalidar_alunos
+        pks = list(self.values_list('pk', flat=True))
+        linhas = super().update(**kwargs)
+        invalidar_alunos(treinamentos=pks)
+        return linhas
+
+    def bulk_update(self, objs, fields, *args, **kwargs):
+        from .access import invalidar_alunos
+        objs = list(objs)
+        linhas = super().bulk_update(objs, fields, *args, **kwargs)
+        invalidar_alunos(treinamentos=[obj.pk for obj in objs])
+        return linhas
+
 class Treinamento(models.Model):
     NIVEL_CHOICES = [
         ('iniciante', 'Iniciante'),
@@ -29,14 +87,67 @@ class Treinamento(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    objects = TreinamentoQuerySet.as_manager()
+
     class Meta:
         verbose_name = "Treinamento"
         verbose_name_plural = "Treinamentos"
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['-created_at'], name='treinamento_created_idx'),
+        ]
 
     def __str__(self):
         return self.nome
 
+class TurmaQuerySet(VersionadoQuerySet):
+    # Atualizações só do contador não mudam as leituras por aluno (core.access);
+    # as matrículas que o alteram já invalidam os alunos delas
+    contadores = {'total_alunos'}
+    # Campos que definem as turmas ativas por dia/treinamento (core.stats)
+    campos_periodo = {'treinamento', 'treinamento_id', 'data_inicio', 'data_conclusao'}
+
+    def update(self, **kwargs):
+        if not kwargs.keys() - self.contadores:
+            return super().update(**kwargs)
+        from .access import invalidar_alunos
+        pks = list(self.values_list('pk', flat=True))
+        if not self.campos_periodo & kwargs.keys():
+            linhas = super().update(**kwargs)
+        else:
+            # Aplica a diferença de turmas ativas e leva as linhas das turmas
+            # movidas para o novo treinamento, como o signal de Turma
+            from .stats import aplicar_diferenca_turmas, mover_turmas, turmas_por_periodo
+            alteradas = self.model.objects.filter(pk__in=pks)
+            with transaction.atomic(using=self.db):
+                treinamentos = dict(alteradas.values_list('pk', 'treinamento_id'))
+                antes = turmas_por_periodo(alteradas)
+                linhas = super().update(**kwargs)
+                aplicar_diferenca_turmas(antes, turmas_por_periodo(alteradas))
+                mover_turmas(treinamentos, dict(alteradas.values_list('pk', 'treinamento_id')))
+        invalidar_alunos(turmas=pks)
+        return linhas
+
+    def bulk_create(self, objs, *args, **kwargs):
+        # bulk_create não dispara post_save: soma as turmas ativas das
+        # criadas (lidas do banco, por causa de ignore_conflicts)
+        from .stats import aplicar_diferenca_turmas, turmas_por_periodo
+        with transaction.atomic(using=self.db):
+            objs = super().bulk_create(objs, *args, **kwargs)
+            novas = turmas_por_periodo(self.model.objects.filter(pk__in=[obj.pk for obj in objs]))
+            aplicar_diferenca_turmas({}, novas)
+        return objs
+
+    def bulk_update(self, objs, fields, *args, **kwargs):
+        # O bulk_update do Django grava com update(): as turmas ativas já
+        # são ajustadas lá, lote a lote
+        objs = list(objs)
+        linhas = super().bulk_update(objs, fields, *args, **kwargs)
+        if set(fields) - self.contadores:
+            from .access import invalidar_alunos
+            invalidar_alunos(turmas=[obj.pk for obj in objs])
+        return linhas
+
 class Turma(models.Model):
     id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
     treinamento = models.ForeignKey(Treinamento, on_delete=models.CASCADE, related_name='turmas')
@@ -44,22 +155,85 @@ class Turma(models.Model):
     data_inicio = models.DateField(verbose_name="Data de Início")
     data_conclusao = models.DateField(verbose_name="Data de Conclusão")
     link_acesso = models.URLField(blank=True, null=True, verbose_name="Link de Acesso")
+    # Mantido por core.counters a cada criação/remoção de Matricula
+    total_alunos = models.PositiveIntegerField(default=0, editable=False, verbose_name="Total de Alunos")
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    objects = TurmaQuerySet.as_manager()
+
     class Meta:
         verbose_name = "Turma"
         verbose_name_plural = "Turmas"
         ordering = ['-data_inicio']
+        indexes = [
+            models.Index(fields=['treinamento', 'data_inicio'], name='turma_treinamento_inicio_idx'),
+            models.Index(fields=['-data_inicio'], name='turma_inicio_idx'),
+        ]
 
     def __str__(self):
         return f"{self.nome} - {self.treinamento.nome}"
 
+    def save(self, *args, **kwargs):
+        _preservar_contadores(self, kwargs, 'total_alunos')
+        super().save(*args, **kwargs)
+
     def clean(self):
         from django.core.exceptions import ValidationError
         if self.data_inicio and self.data_conclusao and self.data_inicio >= self.data_conclusao:
             raise ValidationError("A data de início deve ser anterior à data de conclusão.")
 
+class RecursoQuerySet(VersionadoQuerySet):
+    # Campos dos quais dependem os IDs acessíveis por aluno (core.access)
+    campos_acesso = {'draft', 'acesso_previo', 'turma', 'turma_id', 'treinamento', 'treinamento_id'}
+    # Campos que definem os recursos publicados por dia/escopo (core.stats)
+    campos_publicacao = {'draft', 'turma', 'turma_id', 'treinamento', 'treinamento_id', 'created_at'}
+
+    def update(self, **kwargs):
+        # Publicar/despublicar ou mover recursos em massa altera as
+        # estatísticas diárias (aplica a diferença de publicados por
+        # dia/escopo) e o acesso dos alunos das turmas envolvidas
+        if not (self.campos_acesso | self.campos_publicacao) & kwargs.keys():
+            return super().update(**kwargs)
+        from .access import invalidar_alunos_dos_recursos
+        from .stats import aplicar_diferenca, recursos_publicados
+        with transaction.atomic(using=self.db):
+            pks = list(self.values_list('pk', flat=True))
+            alterados = self.model.objects.filter(pk__in=pks)
+            vinculos = set(alterados.values_list('turma_id', 'treinamento_id'))
+            antes = recursos_publicados(alterados)
+            linhas = super().update(**kwargs)
+            depois = recursos_publicados(alterados)
+            aplicar_diferenca('recursos_publicados', antes, depois)
+            vinculos.update(alterados.values_list('turma_id', 'treinamento_id'))
+            invalidar_alunos_dos_recursos(vinculos)
+        return linhas
+
+    def bulk_create(self, objs, *args, **kwargs):
+        # Soma os publicados criados (lidos do banco, por causa de ignore_conflicts)
+        from .access import invalidar_alunos_dos_recursos
+        from .stats import aplicar_diferenca, recursos_publicados
+        with transaction.atomic(using=self.db):
+            objs = super().bulk_create(objs, *args, **kwargs)
+            novos = recursos_publicados(self.model.objects.filter(pk__in=[obj.pk for obj in objs]))
+            aplicar_diferenca('recursos_publicados', {}, novos)
+        invalidar_alunos_dos_recursos({(obj.turma_id, obj.treinamento_id) for obj in objs if not obj.draft})
+        return objs
+
+    def bulk_update(self, objs, fields, *args, **kwargs):
+        objs = list(objs)
+        if not (self.campos_acesso | self.campos_publicacao) & set(fields):
+            return super().bulk_update(objs, fields, *args, **kwargs)
+        # Os publicados são ajustados pelo update() que o bulk_update do
+        # Django usa para gravar cada lote
+        from .access import invalidar_alunos_dos_recursos
+        vinculos = set(
+            self.model.objects.filter(pk__in=[obj.pk for obj in objs]).values_list('turma_id', 'treinamento_id')
+        )
+        linhas = super().bulk_update(objs, fields, *args, **kwargs)
+        invalidar_alunos_dos_recursos(vinculos | {(obj.turma_id, obj.treinamento_id) for obj in objs})
+        return linhas
+
 class Recurso(models.Model):
     TIPO_CHOICES = [
         ('video', 'Vídeo'),
@@ -84,10 +258,18 @@ class Recurso(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    objects = RecursoQuerySet.as_manager()
+
     class Meta:
         verbose_name = "Recurso"
         verbose_name_plural = "Recursos"
         ordering = ['-created_at']
+        indexes = [
+            # Caminhos de listagem do aluno (core.access) e do admin
+            models.Index(fields=['turma', 'draft', 'acesso_previo'], name='recurso_turma_acesso_idx'),
+            models.Index(fields=['treinamento', 'draft'], name='recurso_treinamento_draft_idx'),
+            models.Index(fields=['-created_at'], name='recurso_created_idx'),
+        ]
 
     def __str__(self):
         if self.turma:
@@ -143,29 +325,198 @@ class Recurso(models.Model):
             if not self.arquivo.name.lower().endswith('.zip'):
                 raise ValidationError("Para tipo ZIP, apenas arquivos ZIP são permitidos.")
 
+class AlunoQuerySet(VersionadoQuerySet):
+    # Atualizações só do contador não invalidam as leituras por aluno
+    # (core.access): as matrículas que o alteram já o fazem
+    contadores = {'total_matriculas'}
+
+    def bulk_create(self, objs, *args, **kwargs):
+        # bulk_create não chama save(): preenche a chave de login aqui
+        objs = list(objs)
+        for obj in objs:
+            obj.login_normalizado = normalizar_login(obj.nome)
+        objs = super().bulk_create(objs, *args, **kwargs)
+        for obj in objs:
+            obj._guardar_sincronizados()
+        # bulk_create não dispara post_save: soma os novos alunos por dia
+        from .stats import ajustar, dia_local
+        for dia, total in Counter(dia_local(obj.created_at) for obj in objs).items():
+            ajustar('novos_alunos', total, dia)
+        return objs
+
+    def bulk_update(self, objs, fields, *args, **kwargs):
+        # Sincroniza no User, também em lote, apenas os alunos alterados
+        objs = list(objs)
+        fields = set(fields)
+        if 'nome' in fields:
+            for obj in objs:
+                obj.login_normalizado = normalizar_login(obj.nome)
+            fields.add('login_normalizado')
+        alterados = [(obj, obj._alteracoes_user(fields)) for obj in objs]
+        alterados = [(obj, alteracoes) for obj, alteracoes in alterados if alteracoes]
+        with transaction.atomic(using=self.db) if alterados else nullcontext():
+            linhas = super().bulk_update(objs, fields, *args, **kwargs)
+            if alterados:
+                users = [User(pk=obj.user_id, **alteracoes) for obj, alteracoes in alterados]
+                campos_user = set().union(*(alteracoes for _, alteracoes in alterados))
+                User.objects.bulk_update(users, campos_user, *args, **kwargs)
+        for obj in objs:
+            obj._guardar_sincronizados()
+        if fields - self.contadores:
+            from .access import invalidar_alunos
+            invalidar_alunos(alunos=[obj.pk for obj in objs])
+        return linhas
+
+    def update(self, **kwargs):
+        sincronizados = Aluno.SINCRONIZADOS_COM_USER.keys() & kwargs.keys()
+        if isinstance(kwargs.get('nome'), str):
+            kwargs['login_normalizado'] = normalizar_login(kwargs['nome'])
+        # nome como expressão (F(), Concat()): a chave de login é recalculada
+        # em Python a partir dos valores gravados
+        recalcular_login = 'nome' in kwargs and 'login_normalizado' not in kwargs
+        if not kwargs.keys() - self.contadores:
+            return super().update(**kwargs)
+        from .access import invalidar_alunos
+        with transaction.atomic(using=self.db) if sincronizados or recalcular_login else nullcontext():
+            pks = list(self.values_list('pk', flat=True))
+            linhas = super().update(**kwargs)
+            if recalcular_login:
+                Aluno.objects.bulk_update([
+                    Aluno(pk=pk, login_normalizado=normalizar_login(nome))
+                    for pk, nome in Aluno.objects.filter(pk__in=pks).values_list('pk', 'nome')
+                ], ['login_normalizado'], batch_size=500)
+            if sincronizados:
+                # Um UPDATE no User copiando os valores já gravados nos alunos
+                # (funciona também com expressões como F() ou Concat())
+                origem = Aluno.objects.filter(user=models.OuterRef('pk'))
+                User.objects.filter(aluno_profile__in=pks).update(**{
+                    Aluno.SINCRONIZADOS_COM_USER[campo]: models.Subquery(origem.values(campo)[:1])
+                    for campo in sincronizados
+                })
+        invalidar_alunos(alunos=pks)
+        return linhas
+
 class Aluno(models.Model):
     id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
     user = models.OneToOneField(User, on_delete=models.CASCADE, related_name='aluno_profile')
     nome = models.CharField(max_length=200, verbose_name="Nome")
+    # Chave indexada para o login pelo nome do aluno (ver normalizar_login)
+    login_normalizado = models.CharField(max_length=200, editable=False, db_index=True, default='')
     email = models.EmailField(unique=True, verbose_name="Email")
     telefone = models.CharField(max_length=20, blank=True, null=True, verbose_name="Telefone")
+    # Mantido por core.counters a cada criação/remoção de Matricula
+    total_matriculas = models.PositiveIntegerField(default=0, editable=False, verbose_name="Total de Matrículas")
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    objects = AlunoQuerySet.as_manager()
+
+    # Campo do aluno -> campo do User mantido igual
+    SINCRONIZADOS_COM_USER = {'email': 'email', 'nome': 'first_name'}
+
     class Meta:
         verbose_name = "Aluno"
         verbose_name_plural = "Alunos"
         ordering = ['nome']
+        indexes = [
+            models.Index(fields=['nome'], name='aluno_nome_idx'),
+        ]
 
     def __str__(self):
         return self.nome
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._guardar_sincronizados()
+        return instance
+
+    def _guardar_sincronizados(self):
+        """Guarda os valores (como estão no banco) dos campos copiados para o User."""
+        self._sincronizados = {
+            campo: self.__dict__[campo] for campo in self.SINCRONIZADOS_COM_USER if campo in self.__dict__
+        }
+
+    def _alteracoes_user(self, update_fields=None):
+        """Campos do User a atualizar: apenas os que mudaram desde a leitura."""
+        originais = getattr(self, '_sincronizados', {})
+        alteracoes = {}
+        for campo, campo_user in self.SINCRONIZADOS_COM_USER.items():
+            if update_fields is not None and campo not in update_fields:
+                continue
+            valor = getattr(self, campo)
+            if campo in originais:
+                if originais[campo] == valor:
+                    continue
+            elif Aluno.user.is_cached(self) and getattr(self.user, campo_user) == valor:
+                # Aluno novo com User já criado com os mesmos dados
+                continue
+            alteracoes[campo_user] = valor
+        return alteracoes
+
     def save(self, *args, **kwargs):
-        # Sync email with User model
-        if self.user:
-            self.user.email = self.email
-            self.user.save()
-        super().save(*args, **kwargs)
+        update_fields = kwargs.get('update_fields')
+        self.login_normalizado = normalizar_login(self.nome)
+        if update_fields is not None and 'nome' in update_fields:
+            kwargs['update_fields'] = {*update_fields, 'login_normalizado'}
+        _preservar_contadores(self, kwargs, 'total_matriculas')
+
+        # Mantém email/first_name do User sincronizados, escrevendo só o que mudou
+        alteracoes = self._alteracoes_user(update_fields)
+        with transaction.atomic(using=kwargs.get('using')) if alteracoes else nullcontext():
+            super().save(*args, **kwargs)
+            if alteracoes:
+                User.objects.filter(pk=self.user_id).update(**alteracoes)
+                if Aluno.user.is_cached(self):
+                    for campo_user, valor in alteracoes.items():
+                        setattr(self.user, campo_user, valor)
+        self._guardar_sincronizados()
+
+
+class MatriculaQuerySet(VersionadoQuerySet):
+    def bulk_create(self, objs, *args, **kwargs):
+        # bulk_create não dispara post_save: recalcula os contadores das
+        # turmas/alunos afetados e soma as novas matrículas por dia/escopo.
+        # As linhas são lidas do banco: com ignore_conflicts, os objetos
+        # recusados não contam.
+        from .access import invalidar_alunos
+        from .counters import recalcular_contadores
+        from .stats import aplicar_diferenca, matriculas_por_dia
+        with transaction.atomic(using=self.db):
+            objs = super().bulk_create(objs, *args, **kwargs)
+            if objs:
+                recalcular_contadores(
+                    turma_ids={obj.turma_id for obj in objs},
+                    aluno_ids={obj.aluno_id for obj in objs},
+                )
+                novas = matriculas_por_dia(self.model.objects.filter(pk__in=[obj.pk for obj in objs]))
+                aplicar_diferenca('novas_matriculas', {}, novas)
+                invalidar_alunos(alunos={obj.aluno_id for obj in objs})
+        return objs
+
+    def update(self, **kwargs):
+        # Mover matrículas entre turmas/alunos em massa altera os contadores
+        # dos dois lados; turma e data mudam as estatísticas diárias.
+        if not {'turma', 'turma_id', 'aluno', 'aluno_id', 'data_matricula'} & kwargs.keys():
+            return super().update(**kwargs)
+        from .access import invalidar_alunos
+        from .counters import recalcular_contadores
+        from .stats import aplicar_diferenca, matriculas_por_dia
+        with transaction.atomic(using=self.db):
+            antes = list(self.values_list('pk', 'turma_id', 'aluno_id'))
+            pks = [pk for pk, _, _ in antes]
+            por_dia = matriculas_por_dia(self.model.objects.filter(pk__in=pks))
+            linhas = super().update(**kwargs)
+            depois = self.model.objects.filter(pk__in=pks)
+            aplicar_diferenca('novas_matriculas', por_dia, matriculas_por_dia(depois))
+            afetados = [(turma_id, aluno_id) for _, turma_id, aluno_id in antes]
+            afetados += depois.values_list('turma_id', 'aluno_id')
+            recalcular_contadores(
+                turma_ids={turma_id for turma_id, _ in afetados},
+                aluno_ids={aluno_id for _, aluno_id in afetados},
+            )
+            invalidar_alunos(alunos={aluno_id for _, aluno_id in afetados})
+        return linhas
 
 class Matricula(models.Model):
     id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
@@ -175,11 +526,77 @@ class Matricula(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    objects = MatriculaQuerySet.as_manager()
+
     class Meta:
         verbose_name = "Matrícula"
         verbose_name_plural = "Matrículas"
         unique_together = ['turma', 'aluno']
         ordering = ['-data_matricula']
+        indexes = [
+            models.Index(fields=['aluno', 'data_matricula'], name='matricula_aluno_data_idx'),
+            models.Index(fields=['-data_matricula'], name='matricula_data_idx'),
+        ]
 
     def __str__(self):
         return f"{self.aluno.nome} - {self.turma.nome}"
+
+
+class DailyStats(models.Model):
+    """Contagens diárias consolidadas (ver core.stats)."""
+    dia = models.DateField(verbose_name="Dia")
+    # Escopo opcional; sem FK para que o histórico não dependa das linhas de origem
+    treinamento_id = models.UUIDField(blank=True, null=True)
+    turma_id = models.UUIDField(blank=True, null=True)
+    novos_alunos = models.IntegerField(default=0)
+    novas_matriculas = models.IntegerField(default=0)
+    recursos_publicados = models.IntegerField(default=0)
+    turmas_ativas = models.IntegerField(default=0)
+
+    class Meta:
+        verbose_name = "Estatística Diária"
+        verbose_name_plural = "Estatísticas Diárias"
+        ordering = ['dia']
+        constraints = [
+            models.UniqueConstraint(fields=['dia', 'treinamento_id', 'turma_id'], name='dailystats_escopo_uniq'),
+            # NULL não colide em UNIQUE: escopos global e de treinamento precisam de índices parciais
+            models.UniqueConstraint(
+                fields=['dia', 'treinamento_id'],
+                condition=models.Q(turma_id__isnull=True),
+                name='dailystats_treinamento_uniq',
+            ),
+            models.UniqueConstraint(
+                fields=['dia'],
+                condition=models.Q(treinamento_id__isnull=True, turma_id__isnull=True),
+                name='dailystats_global_uniq',
+            ),
+        ]
+        indexes = [
+            models.Index(fields=['treinamento_id', 'dia'], name='dailystats_treinamento_idx'),
+            models.Index(fields=['turma_id', 'dia'], name='dailystats_turma_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.dia} ({self.turma_id or self.treinamento_id or 'global'})"
+
+
+class UploadRetomavel(models.Model):
+    """Upload de arquivo em partes (ver core.uploads); o conteúdo parcial fica em disco."""
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    usuario = models.ForeignKey(User, on_delete=models.CASCADE, related_name='uploads_retomaveis')
+    nome_arquivo = models.CharField(max_length=255, verbose_name="Nome do Arquivo")
+    tamanho = models.PositiveBigIntegerField(verbose_name="Tamanho")
+    # Bytes já gravados: o offset esperado na próxima parte
+    recebido = models.PositiveBigIntegerField(default=0, verbose_name="Recebido")
+    # SHA-256 esperado, quando o cliente informa; conferido ao finalizar
+    sha256 = models.CharField(max_length=64, blank=True, default='', verbose_name="SHA-256")
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name = "Upload Retomável"
+        verbose_name_plural = "Uploads Retomáveis"
+        ordering = ['-created_at']
+
+    def __str__(self):
+        return f"{self.nome_arquivo} ({self.recebido}/{self.tamanho})"
@@ -0,0 +1,163 @@
+"""
+Paginação das listagens da API.
+
+Por padrão as listagens continuam paginadas por número de página (formato
+usado pelo frontend). Com `?pagination=cursor` (ou quando um `?cursor=` é
+enviado) a paginação passa a ser por keyset: a posição é a ordenação do
+ViewSet mais o `id` como desempate, sem COUNT(*) nem OFFSET, de modo que o
+custo de uma página profunda é o mesmo da primeira.
+"""
+import base64
+import json
+from collections import OrderedDict
+from types import SimpleNamespace
+
+from django.core.exceptions import FieldDoesNotExist, ValidationError
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination, PageNumberPagination
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+
+def _inverter(campo):
+    return campo[1:] if campo.startswith('-') else f'-{campo}'
+
+
+class KeysetPagination(BasePagination):
+    page_size = api_settings.PAGE_SIZE
+    cursor_query_param = 'cursor'
+    tiebreaker = 'id'
+    invalid_cursor_message = 'Cursor inválido.'
+
+    def get_ordering(self, queryset):
+        """Ordenação do queryset (ou do Meta do model) com o desempate por id."""
+        # Ordenações por anotação (ex.: relevância da busca) não têm posição
+        # estável por coluna e ficam de fora do keyset
+        nomes_campos = {campo.name for campo in queryset.model._meta.concrete_fields}
+        ordering = [
+            campo for campo in (queryset.query.order_by or queryset.model._meta.ordering)
+            if isinstance(campo, str) and campo.lstrip('-') in nomes_campos | {'pk'}
+        ]
+        nomes = {campo.lstrip('-') for campo in ordering}
+        if self.tiebreaker not in nomes and 'pk' not in nomes:
+            direcao = '-' if ordering and ordering[0].startswith('-') else ''
+            ordering.append(f'{direcao}{self.tiebreaker}')
+        return ordering
+
+    def encode_cursor(self, valores, reverso):
+        payload = json.dumps({'v': valores, 'r': reverso}, separators=(',', ':'))
+        cursor = base64.urlsafe_b64encode(payload.encode()).decode()
+        return replace_query_param(
+            remove_query_param(self.base_url, 'page'), self.cursor_query_param, cursor
+        )
+
+    def decode_cursor(self, request, campos):
+        cursor = request.query_params.get(self.cursor_query_param)
+        if not cursor:
+            return None, False
+        try:
+            payload = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+            valores = payload['v']
+            if len(valores) != len(campos):
+                raise ValueError
+            valores = [campo.to_python(valor) for campo, valor in zip(campos, valores)]
+            return valores, bool(payload.get('r'))
+        except (TypeError, ValueError, KeyError, ValidationError):
+            raise NotFound(self.invalid_cursor_message)
+
+    def _apos(self, ordering, valores):
+        """Q das linhas posteriores à posição `valores` na ordenação dada."""
+        condicao = Q()
+        for i, campo in enumerate(ordering):
+            iguais = {ordering[j].lstrip('-'): valores[j] for j in range(i)}
+            operador = 'lt' if campo.startswith('-') else 'gt'
+            condicao |= Q(**iguais, **{f'{campo.lstrip("-")}__{operador}': valores[i]})
+        return condicao
+
+    def _valores(self, obj):
+        if isinstance(obj, dict):
+            # Linhas de .values() (core.fast_read), com as colunas pelo attname
+            obj = SimpleNamespace(**obj)
+        return [campo.value_to_string(obj) for campo in self.campos]
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.base_url = request.build_absolute_uri()
+
+        ordering = self.get_ordering(queryset)
+        try:
+            self.campos = [queryset.model._meta.get_field(campo.lstrip('-')) for campo in ordering]
+        except FieldDoesNotExist:
+            raise NotFound(self.invalid_cursor_message)
+
+        valores, reverso = self.decode_cursor(request, self.campos)
+        if reverso:
+            ordering = [_inverter(campo) for campo in ordering]
+
+        colunas = getattr(queryset, '_fields', None)
+        if colunas:
+            # .values() com colunas reduzidas (?fields=): o cursor precisa da ordenação
+            faltando = [campo.attname for campo in self.campos if campo.attname not in colunas]
+            if faltando:
+                queryset = queryset.values(*colunas, *faltando)
+
+        queryset = queryset.order_by(*ordering)
+        if valores is not None:
+            queryset = queryset.filter(self._apos(ordering, valores))
+
+        resultados = list(queryset[:self.page_size + 1])
+        tem_mais = len(resultados) > self.page_size
+        resultados = resultados[:self.page_size]
+        if reverso:
+            resultados.reverse()
+
+        # Voltando a partir de um cursor, sempre há página seguinte
+        self.has_next = tem_mais if not reverso else True
+        self.has_previous = tem_mais if reverso else valores is not None
+        self.primeiro = self._valores(resultados[0]) if resultados else None
+        self.ultimo = self._valores(resultados[-1]) if resultados else None
+        return resultados
+
+    def get_next_link(self):
+        if not self.has_next or self.ultimo is None:
+            return None
+        return self.encode_cursor(self.ultimo, False)
+
+    def get_previous_link(self):
+        if not self.has_previous or self.primeiro is None:
+            return None
+        return self.encode_cursor(self.primeiro, True)
+
+    def get_paginated_response(self, data):
+        return Response(OrderedDict([
+            ('next', self.get_next_link()),
+            ('previous', self.get_previous_link()),
+            ('results', data),
+        ]))
+
+
+class StandardPagination(PageNumberPagination):
+    """Número de página por padrão; keyset quando solicitado na requisição."""
+    mode_query_param = 'pagination'
+    keyset_class = KeysetPagination
+
+    def uses_keyset(self, request):
+        return (
+            request.query_params.get(self.mode_query_param) == 'cursor'
+            or self.keyset_class.cursor_query_param in request.query_params
+        )
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.keyset = None
+        if self.uses_keyset(request):
+            self.keyset = self.keyset_class()
+            self.keyset.page_size = self.get_page_size(request) or self.keyset.page_size
+            return self.keyset.paginate_queryset(queryset, request, view)
+        return super().paginate_queryset(queryset, request, view)
+
+    def get_paginated_response(self, data):
+        if self.keyset is not None:
+            return self.keyset.get_paginated_response(data)
+        return super().get_paginated_response(data)
@@ -0,0 +1,66 @@
+"""
+Renderers da API.
+
+* `JSONRenderer`: mesmo JSON do renderer do DRF, codificado com orjson
+  (UUID, datas e dicts de serializer nativos, em C). Sem orjson instalado,
+  ou quando a saída pedida é indentada/ASCII, usa o renderer do DRF;
+* `MessagePackRenderer`: `application/msgpack`, escolhido pelo `Accept`
+  quando o pacote opcional msgpack está instalado.
+
+Tipos que o orjson não codifica (Decimal, datetime com o formato do DRF,
+lazy strings, querysets...) passam pelo `default` do encoder do DRF, de
+modo que a saída é a mesma do renderer padrão.
+`python manage.py benchmark_renderers` compara os formatos.
+"""
+from rest_framework import renderers
+from rest_framework.utils.encoders import JSONEncoder
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - dependência opcional
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:  # pragma: no cover - dependência opcional
+    msgpack = None
+
+_encoder = JSONEncoder()
+
+if orjson is not None:
+    # Datas e horas seguem o formato do DRF (milissegundos, 'Z' para UTC)
+    OPCOES_ORJSON = orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_NON_STR_KEYS
+
+
+def _padrao(obj):
+    return _encoder.default(obj)
+
+
+class JSONRenderer(renderers.JSONRenderer):
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if orjson is None or data is None or self.ensure_ascii or not self.compact:
+            return super().render(data, accepted_media_type, renderer_context)
+        if self.get_indent(accepted_media_type, renderer_context or {}) is not None:
+            return super().render(data, accepted_media_type, renderer_context)
+        try:
+            conteudo = orjson.dumps(data, default=_padrao, option=OPCOES_ORJSON)
+        except TypeError:
+            # Inteiros acima de 64 bits e afins: o encoder da stdlib aceita
+            return super().render(data, accepted_media_type, renderer_context)
+        # Como o DRF: U+2028/U+2029 escapados mantêm a saída um subconjunto de JavaScript
+        if b'\xe2\x80\xa8' in conteudo or b'\xe2\x80\xa9' in conteudo:
+            conteudo = conteudo.replace(b'\xe2\x80\xa8', b'\\u2028').replace(b'\xe2\x80\xa9', b'\\u2029')
+        return conteudo
+
+
+class MessagePackRenderer(renderers.BaseRenderer):
+    media_type = 'application/msgpack'
+    format = 'msgpack'
+    charset = None
+    render_style = 'binary'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        # UUID, datas e Decimal viram os mesmos valores do JSON
+        return msgpack.packb(data, default=_padrao, use_bin_type=True, datetime=False)
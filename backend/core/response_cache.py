@@ -0,0 +1,138 @@
+"""
+Cache de respostas das leituras de catálogo.
+
+Cada model versionado tem um contador de geração no cache
+(`versao:<app.model>`), incrementado pelos signals de save/delete e pelos
+caminhos em lote dos QuerySets. A chave de uma resposta combina as gerações
+dos models dos quais a view depende, o perfil do usuário (admin, aluno ou
+anônimo), o caminho, os query params, o media type negociado e o dia
+corrente (as regras de acesso dependem da data). Invalidar é um INCR; as
+respostas antigas simplesmente deixam de ser lidas e expiram pelo TTL.
+
+Funciona com o Redis opcional de `CACHES` e com o LocMemCache padrão; com
+LocMem as gerações são por processo, adequado apenas ao desenvolvimento.
+"""
+import functools
+import hashlib
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.http import HttpResponse
+from django.utils import timezone
+from rest_framework.response import Response
+
+
+def _chave_versao(model):
+    return f'versao:{model._meta.label_lower}'
+
+
+def _versao_inicial():
+    # Se a chave for descartada pelo cache, a nova geração não repete uma antiga
+    return time.time_ns()
+
+
+def incrementar_geracoes(*chaves):
+    """Incrementa contadores de geração do cache (agora e após o commit)."""
+    def incrementar():
+        for chave in chaves:
+            try:
+                cache.incr(chave)
+            except ValueError:
+                cache.set(chave, _versao_inicial(), None)
+
+    incrementar()
+    # Leituras concorrentes entre o save e o commit ainda veem os dados antigos
+    # com a geração nova; o segundo incremento descarta essas respostas
+    transaction.on_commit(incrementar)
+
+
+def incrementar_versao(*models):
+    """Invalida as respostas que dependem dos models (agora e após o commit)."""
+    incrementar_geracoes(*map(_chave_versao, models))
+
+
+def geracoes(chaves):
+    """Valores atuais dos contadores de geração, criando os ausentes."""
+    atuais = cache.get_many(chaves)
+    faltando = {chave: _versao_inicial() for chave in chaves if chave not in atuais}
+    for chave, valor in faltando.items():
+        # add() não sobrescreve uma geração criada por outro processo
+        if not cache.add(chave, valor, None):
+            faltando[chave] = cache.get(chave, valor)
+    atuais.update(faltando)
+    return [atuais[chave] for chave in chaves]
+
+
+def versoes(models):
+    return geracoes([_chave_versao(model) for model in models])
+
+
+def _ttl():
+    return getattr(settings, 'API_CACHE_TTL', 300)
+
+
+def perfil(user):
+    if user.is_staff:
+        return 'admin'
+    return 'aluno' if user.is_authenticated else 'anonimo'
+
+
+def chave_resposta(request, dependencias):
+    partes = [
+        *map(str, versoes(dependencias)),
+        perfil(request.user),
+        request.build_absolute_uri(request.path),
+        '&'.join(f'{nome}={valor}' for nome, valor in sorted(request.query_params.lists())),
+        request.accepted_media_type or '',
+        timezone.localdate().isoformat(),
+    ]
+    return 'resposta:' + hashlib.sha256('|'.join(partes).encode()).hexdigest()
+
+
+def em_cache(metodo):
+    """Serve a action do cache quando a resposta da chave atual já existe."""
+    @functools.wraps(metodo)
+    def wrapper(self, request, *args, **kwargs):
+        resposta = self.resposta_em_cache(request)
+        if resposta is not None:
+            return resposta
+        return metodo(self, request, *args, **kwargs)
+    return wrapper
+
+
+class RespostaEmCacheMixin:
+    """
+    Cache de `list`/`retrieve` (e de actions marcadas com @em_cache) de um
+    ViewSet. `cache_dependencias` lista os models cujos dados aparecem na
+    resposta, incluindo os lidos por serializers e contadores.
+    """
+    cache_dependencias = ()
+
+    def resposta_em_cache(self, request):
+        self._chave_resposta = None
+        if request.method != 'GET' or not _ttl():
+            return None
+        self._chave_resposta = chave_resposta(request, self.cache_dependencias)
+        guardada = cache.get(self._chave_resposta)
+        if guardada is None:
+            return None
+        conteudo, content_type = guardada
+        return HttpResponse(conteudo, content_type=content_type)
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        response = super().finalize_response(request, response, *args, **kwargs)
+        chave = getattr(self, '_chave_resposta', None)
+        if chave and isinstance(response, Response) and response.status_code == 200:
+            response.render()
+            cache.set(chave, (response.content, response['Content-Type']), _ttl())
+        return response
+
+    @em_cache
+    def list(self, request, *args, **kwargs):
+        return super().list(request, *args, **kwargs)
+
+    @em_cache
+    def retrieve(self, request, *args, **kwargs):
+        return super().retrieve(request, *args, **kwargs)
@@ -0,0 +1,225 @@
+"""
+Busca textual (`?search=`) das listagens.
+
+* PostgreSQL: `to_tsvector` com a configuração `pt_unaccent` (stemming em
+  português + unaccent) e índices GIN sobre as mesmas expressões;
+* SQLite: tabelas virtuais FTS5 (`<tabela>_fts`) mantidas por triggers,
+  com o tokenizer unicode61 removendo acentos;
+* demais bancos: `icontains`, como antes.
+
+Os índices GIN são criados na migração 0007; as tabelas FTS5 e triggers,
+por `instalar_fts_sqlite` (migração 0007 e após cada `migrate`, já que o
+SQLite recria a tabela em alguns ALTERs e descarta os triggers). As tabelas
+FTS5 guardam o `id` do model numa coluna UNINDEXED: o `rowid` implícito das
+tabelas com chave UUID pode ser renumerado por um VACUUM. Os resultados
+recebem a anotação `relevancia` (maior = mais relevante); use `ordenar()`
+para ordenar por ela quando houver busca.
+"""
+import re
+
+from django.db import connection
+from django.db.models import Case, FloatField, Q, Value, When
+from django.db.models.expressions import RawSQL
+
+PG_CONFIG = 'pt_unaccent'
+
+# SQLite: quantos resultados recebem a relevância calculada pelo FTS5
+MAX_RANQUEADOS = 1000
+
+# Colunas indexadas por model; Turma também busca pelo nome do treinamento
+CAMPOS = {
+    'core.Treinamento': ['nome', 'descricao'],
+    'core.Turma': ['nome'],
+    'core.Recurso': ['nome_recurso', 'descricao_recurso'],
+    'core.Aluno': ['nome', 'email'],
+}
+
+
+# Tabelas FTS5 (SQLite): coluna -> expressão sobre a linha de origem (NEW.*),
+# e as colunas de origem cuja alteração precisa reindexar a linha
+FTS_SQLITE = {
+    'core_treinamento': (
+        {'nome': 'NEW.nome', 'descricao': 'NEW.descricao'},
+        ['nome', 'descricao'],
+    ),
+    'core_turma': (
+        {
+            'nome': 'NEW.nome',
+            'treinamento_nome': '(SELECT nome FROM core_treinamento WHERE id = NEW.treinamento_id)',
+        },
+        ['nome', 'treinamento_id'],
+    ),
+    'core_recurso': (
+        {'nome_recurso': 'NEW.nome_recurso', 'descricao_recurso': 'NEW.descricao_recurso'},
+        ['nome_recurso', 'descricao_recurso'],
+    ),
+    'core_aluno': (
+        {'nome': 'NEW.nome', 'email': 'NEW.email'},
+        ['nome', 'email'],
+    ),
+}
+
+
+def instalar_fts_sqlite(cursor):
+    """
+    Cria (se necessário) as tabelas FTS5 e seus triggers. Quando algum
+    trigger está ausente o índice da tabela é reconstruído do zero.
+    """
+    cursor.execute("SELECT name FROM sqlite_master WHERE type = 'trigger'")
+    existentes = {nome for (nome,) in cursor.fetchall()}
+    cursor.execute("SELECT name FROM sqlite_master WHERE type = 'table'")
+    tabelas = {nome for (nome,) in cursor.fetchall()}
+
+    for tabela, (colunas, origem) in FTS_SQLITE.items():
+        fts = f'{tabela}_fts'
+        nomes = ', '.join(colunas)
+        valores = ', '.join(colunas.values())
+        triggers = {
+            f'{fts}_ai': f'AFTER INSERT ON {tabela} BEGIN '
+                         f'INSERT INTO {fts}(id, {nomes}) VALUES (NEW.id, {valores}); END',
+            f'{fts}_ad': f'AFTER DELETE ON {tabela} BEGIN '
+                         f'DELETE FROM {fts} WHERE id = OLD.id; END',
+            f'{fts}_au': f'AFTER UPDATE OF {", ".join(origem)} ON {tabela} BEGIN '
+                         f'DELETE FROM {fts} WHERE id = OLD.id; '
+                         f'INSERT INTO {fts}(id, {nomes}) VALUES (NEW.id, {valores}); END',
+        }
+        if tabela == 'core_treinamento':
+            # Renomear um treinamento atualiza o nome desnormalizado nas turmas
+            triggers['core_treinamento_fts_turma_au'] = (
+                'AFTER UPDATE OF nome ON core_treinamento BEGIN '
+                'UPDATE core_turma_fts SET treinamento_nome = NEW.nome '
+                'WHERE id IN (SELECT id FROM core_turma WHERE treinamento_id = NEW.id); END'
+            )
+        com_id = False
+        if fts in tabelas:
+            cursor.execute(f'PRAGMA table_info({fts})')
+            com_id = 'id' in {coluna[1] for coluna in cursor.fetchall()}
+        if com_id and existentes.issuperset(triggers):
+            continue
+
+        if not com_id:
+            # Tabela antiga, ligada pelo rowid: recriada com a coluna id
+            cursor.execute(f'DROP TABLE IF EXISTS {fts}')
+        cursor.execute(
+            f"CREATE VIRTUAL TABLE IF NOT EXISTS {fts} "
+            f"USING fts5(id UNINDEXED, {nomes}, tokenize='unicode61 remove_diacritics 2')"
+        )
+        for nome, corpo in triggers.items():
+            cursor.execute(f'DROP TRIGGER IF EXISTS {nome}')
+            cursor.execute(f'CREATE TRIGGER {nome} {corpo}')
+        cursor.execute(f'DELETE FROM {fts}')
+        cursor.execute(
+            f'INSERT INTO {fts}(id, {nomes}) '
+            f'SELECT id, {valores.replace("NEW.", f"{tabela}.")} FROM {tabela}'
+        )
+
+
+def remover_fts_sqlite(cursor):
+    cursor.execute('DROP TRIGGER IF EXISTS core_treinamento_fts_turma_au')
+    for tabela in FTS_SQLITE:
+        fts = f'{tabela}_fts'
+        for sufixo in ('ai', 'ad', 'au'):
+            cursor.execute(f'DROP TRIGGER IF EXISTS {fts}_{sufixo}')
+        cursor.execute(f'DROP TABLE IF EXISTS {fts}')
+
+
+def garantir_fts(sender, using='default', **kwargs):
+    """Receiver de post_migrate: reinstala o FTS5 se algum ALTER o removeu."""
+    from django.db import connections
+
+    conexao = connections[using]
+    if conexao.vendor != 'sqlite':
+        return
+    tabelas = set(conexao.introspection.table_names())
+    if not tabelas.issuperset(FTS_SQLITE):
+        return
+    with conexao.cursor() as cursor:
+        instalar_fts_sqlite(cursor)
+
+
+def termos(texto):
+    """Quebra a busca em termos alfanuméricos (descarta operadores e aspas)."""
+    return re.findall(r'\w+', texto or '')
+
+
+def _busca_icontains(queryset, texto):
+    campos = list(CAMPOS[queryset.model._meta.label])
+    if queryset.model._meta.label == 'core.Turma':
+        campos.append('treinamento__nome')
+    condicao = Q()
+    for campo in campos:
+        condicao |= Q(**{f'{campo}__icontains': texto})
+    return queryset.filter(condicao)
+
+
+def _busca_sqlite(queryset, palavras):
+    tabela = queryset.model._meta.db_table
+    fts = f'{tabela}_fts'
+    # Cada termo vira um prefixo ("pyth"*): todos precisam ocorrer
+    consulta = ' '.join(f'"{palavra}"*' for palavra in palavras)
+
+    # Um único MATCH traz a relevância dos mais bem colocados; uma subconsulta
+    # correlacionada refaria o MATCH para cada linha do resultado. Além do
+    # limite, as linhas continuam no filtro com relevância 0 (vão para o fim)
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f'SELECT id, -bm25({fts}) FROM {fts} WHERE {fts} MATCH %s ORDER BY bm25({fts}) LIMIT %s',
+            (consulta, MAX_RANQUEADOS),
+        )
+        ranque = cursor.fetchall()
+
+    return queryset.filter(
+        pk__in=RawSQL(f'SELECT id FROM {fts} WHERE {fts} MATCH %s', (consulta,))
+    ).annotate(
+        relevancia=Case(
+            *(When(pk=pk, then=Value(relevancia)) for pk, relevancia in ranque),
+            default=Value(0.0),
+            output_field=FloatField(),
+        )
+    )
+
+
+def _busca_postgresql(queryset, palavras):
+    from django.contrib.postgres.search import SearchQuery, SearchRank, SearchVector
+
+    from .models import Treinamento
+
+    consulta = SearchQuery(
+        ' & '.join(f'{palavra}:*' for palavra in palavras), search_type='raw', config=PG_CONFIG
+    )
+    campos = CAMPOS[queryset.model._meta.label]
+    # Mesma expressão dos índices GIN da migração 0007
+    vetor = SearchVector(*campos, config=PG_CONFIG)
+    queryset = queryset.annotate(vetor_busca=vetor)
+
+    if queryset.model._meta.label != 'core.Turma':
+        return queryset.filter(vetor_busca=consulta).annotate(relevancia=SearchRank(vetor, consulta))
+
+    treinamentos = Treinamento.objects.annotate(
+        vetor_busca=SearchVector('nome', config=PG_CONFIG)
+    ).filter(vetor_busca=consulta).values('pk')
+    return queryset.filter(
+        Q(vetor_busca=consulta) | Q(treinamento__in=treinamentos)
+    ).annotate(
+        relevancia=SearchRank(vetor, consulta)
+        + SearchRank(SearchVector('treinamento__nome', config=PG_CONFIG), consulta)
+    )
+
+
+def buscar(queryset, texto):
+    """Filtra `queryset` pela busca textual e anota `relevancia`."""
+    palavras = termos(texto)
+    if not palavras:
+        return queryset
+    if connection.vendor == 'sqlite':
+        return _busca_sqlite(queryset, palavras)
+    if connection.vendor == 'postgresql':
+        return _busca_postgresql(queryset, palavras)
+    return _busca_icontains(queryset, texto)
+
+
+def ordenar(queryset, *ordering):
+    """Ordena pela relevância da busca (se houver) e depois pela ordenação padrão."""
+    if 'relevancia' in queryset.query.annotations:
+        return queryset.order_by('-relevancia', *ordering)
+    return queryset.order_by(*ordering)
@@ -1,21 +1,26 @@
 from rest_framework import serializers
+from django.conf import settings
 from django.contrib.auth.models import User
 from django.contrib.auth.password_validation import validate_password
 from django.core.exceptions import ValidationError
-from django.db import IntegrityError
-from django.utils.text import slugify
+from django.db import IntegrityError, transaction
 import re
-from .models import Treinamento, Turma, Recurso, Aluno, Matricula
+from types import SimpleNamespace
+from .models import Treinamento, Turma, Recurso, Aluno, Matricula, UploadRetomavel
+from .access import pode_acessar
+from .downloads import url_download
+from .fieldsets import CamposDinamicosMixin
+from .usernames import alocar_usernames, base_username
 
 
-class UserSerializer(serializers.ModelSerializer):
+class UserSerializer(CamposDinamicosMixin, serializers.ModelSerializer):
     class Meta:
         model = User
         fields = ['id', 'username', 'email', 'first_name', 'last_name', 'is_staff']
         read_only_fields = ['id']
 
 
-class AdminSerializer(serializers.ModelSerializer):
+class AdminSerializer(CamposDinamicosMixin, serializers.ModelSerializer):
     password = serializers.CharField(write_only=True, min_length=8)
     password_confirm = serializers.CharField(write_only=True)
     access_level = serializers.ChoiceField(
@@ -204,7 +209,7 @@ class AdminPasswordUpdateSerializer(serializers.Serializer):
         return attrs
 
 
-class TreinamentoSerializer(serializers.ModelSerializer):
+class TreinamentoSerializer(CamposDinamicosMixin, serializers.ModelSerializer):
     class Meta:
         model = Treinamento
         fields = ['id', 'nome', 'descricao', 'nivel', 'created_at', 'updated_at']
@@ -216,19 +221,15 @@ class TreinamentoSerializer(serializers.ModelSerializer):
         return value.strip()
 
 
-class TurmaSerializer(serializers.ModelSerializer):
+class TurmaSerializer(CamposDinamicosMixin, serializers.ModelSerializer):
     treinamento_nome = serializers.CharField(source='treinamento.nome', read_only=True)
-    total_alunos = serializers.SerializerMethodField()
 
     class Meta:
         model = Turma
         fields = ['id', 'nome', 'treinamento', 'treinamento_nome', 'data_inicio', 
                  'data_conclusao', 'link_acesso', 'total_alunos', 'created_at', 'updated_at']
-        read_only_fields = ['id', 'created_at', 'updated_at']
-
-    def get_total_alunos(self, obj):
-        # Usa related_name definido no modelo: 'matriculas'
-        return obj.matriculas.count()
+        # total_alunos é um contador mantido em core.counters
+        read_only_fields = ['id', 'total_alunos', 'created_at', 'updated_at']
 
     def validate(self, data):
         if data.get('data_conclusao') and data.get('data_inicio'):
@@ -239,10 +240,12 @@ class TurmaSerializer(serializers.ModelSerializer):
         return data
 
 
-class RecursoSerializer(serializers.ModelSerializer):
+class RecursoSerializer(CamposDinamicosMixin, serializers.ModelSerializer):
     turma_nome = serializers.CharField(source='turma.nome', read_only=True)
     treinamento_nome = serializers.CharField(source='treinamento.nome', read_only=True)
     arquivo_url = serializers.SerializerMethodField()
+    # Colunas lidas pelos campos calculados (core.fieldsets)
+    colunas_campos = {'arquivo_url': ('id', 'arquivo')}
 
     class Meta:
         model = Recurso
@@ -250,12 +253,17 @@ class RecursoSerializer(serializers.ModelSerializer):
                  'treinamento', 'treinamento_nome', 'tipo_recurso', 'arquivo', 'arquivo_url', 
                  'acesso_previo', 'draft', 'created_at', 'updated_at']
         read_only_fields = ['id', 'created_at', 'updated_at']
+        extra_kwargs = {
+            # Só para envio: a URL em /media/ não é servida, a leitura usa arquivo_url
+            'arquivo': {'write_only': True},
+        }
 
     def get_arquivo_url(self, obj):
+        # Download protegido (core.downloads); /media/ não é servido diretamente
         if obj.arquivo:
             request = self.context.get('request')
             if request:
-                return request.build_absolute_uri(obj.arquivo.url)
+                return url_download(request, obj.pk)
         return None
 
     def validate(self, data):
@@ -322,8 +330,67 @@ class RecursoSerializer(serializers.ModelSerializer):
         return data
 
 
-class AlunoSerializer(serializers.ModelSerializer):
-    total_matriculas = serializers.SerializerMethodField()
+class RecursoBulkSerializer(serializers.Serializer):
+    """Alteração em lote de draft/acesso_previo: por ids ou por turma/treinamento"""
+    ids = serializers.ListField(
+        child=serializers.UUIDField(), required=False, allow_empty=False, max_length=5000
+    )
+    turma = serializers.PrimaryKeyRelatedField(queryset=Turma.objects.all(), required=False)
+    treinamento = serializers.PrimaryKeyRelatedField(queryset=Treinamento.objects.all(), required=False)
+    draft = serializers.BooleanField(required=False)
+    acesso_previo = serializers.BooleanField(required=False)
+
+    def validate_ids(self, value):
+        return list(dict.fromkeys(value))
+
+    def validate(self, data):
+        if not {'ids', 'turma', 'treinamento'} & data.keys():
+            raise serializers.ValidationError(
+                'Informe os ids dos recursos ou um filtro por turma/treinamento.'
+            )
+        if not {'draft', 'acesso_previo'} & data.keys():
+            raise serializers.ValidationError('Informe draft e/ou acesso_previo.')
+        # Mesmo invariante do RecursoSerializer, aplicado ao lote inteiro
+        if data.get('draft') and data.get('acesso_previo'):
+            raise serializers.ValidationError({
+                'acesso_previo': 'Um recurso não pode ter "Acesso Prévio" e estar em "Rascunho" ao mesmo tempo.',
+                'draft': 'Um recurso não pode ter "Acesso Prévio" e estar em "Rascunho" ao mesmo tempo.'
+            })
+        return data
+
+
+class UploadRetomavelSerializer(CamposDinamicosMixin, serializers.ModelSerializer):
+    """Sessão de upload em partes (core.uploads)"""
+
+    class Meta:
+        model = UploadRetomavel
+        fields = ['id', 'nome_arquivo', 'tamanho', 'recebido', 'sha256', 'created_at', 'updated_at']
+        read_only_fields = ['id', 'recebido', 'created_at', 'updated_at']
+
+    def validate_nome_arquivo(self, value):
+        # Mesmas extensões aceitas pelo campo arquivo do Recurso
+        for validator in Recurso._meta.get_field('arquivo').validators:
+            try:
+                validator(SimpleNamespace(name=value))
+            except ValidationError as exc:
+                raise serializers.ValidationError(exc.messages)
+        return value
+
+    def validate_tamanho(self, value):
+        maximo = getattr(settings, 'UPLOAD_RETOMAVEL_MAX_TAMANHO', 0)
+        if value < 1:
+            raise serializers.ValidationError("O arquivo não pode ser vazio.")
+        if maximo and value > maximo:
+            raise serializers.ValidationError(f"O arquivo excede o limite de {maximo} bytes.")
+        return value
+
+    def validate_sha256(self, value):
+        if value and not re.fullmatch(r'[0-9a-fA-F]{64}', value):
+            raise serializers.ValidationError("Informe o SHA-256 em hexadecimal (64 caracteres).")
+        return value.lower()
+
+
+class AlunoSerializer(CamposDinamicosMixin, serializers.ModelSerializer):
     # Campos opcionais, write-only, caso queira fornecer explicitamente
     username = serializers.CharField(write_only=True, required=False)
     password = serializers.CharField(write_only=True, required=False)
@@ -332,26 +399,16 @@ class AlunoSerializer(serializers.ModelSerializer):
         model = Aluno
         fields = ['id', 'nome', 'email', 'telefone', 'total_matriculas', 
                  'created_at', 'updated_at', 'username', 'password']
-        read_only_fields = ['id', 'created_at', 'updated_at']
-
-    def get_total_matriculas(self, obj):
-        # Usa related_name definido no modelo: 'matriculas'
-        return obj.matriculas.count()
+        # total_matriculas é um contador mantido em core.counters
+        read_only_fields = ['id', 'total_matriculas', 'created_at', 'updated_at']
 
     def validate_email(self, value):
         if Aluno.objects.filter(email=value).exclude(pk=self.instance.pk if self.instance else None).exists():
             raise serializers.ValidationError("Este email já está em uso.")
         return value
 
-    def _generate_unique_username(self, base: str) -> str:
-        """Gera username único adicionando sufixo numérico quando necessário."""
-        base = slugify(base or 'aluno').replace('-', '') or 'aluno'
-        candidate = base
-        counter = 1
-        while User.objects.filter(username=candidate).exists():
-            counter += 1
-            candidate = f"{base}{counter}"
-        return candidate
+    # Tentativas de alocar username quando outra criação concorrente ocupa o mesmo
+    MAX_TENTATIVAS_USERNAME = 5
 
     def create(self, validated_data):
         # Extrai campos opcionais
@@ -365,36 +422,36 @@ class AlunoSerializer(serializers.ModelSerializer):
         if email and Aluno.objects.filter(email=email).exists():
             raise serializers.ValidationError({'email': 'Este email já está em uso.'})
 
-        # Define username se não fornecido
-        if not username:
-            base_username = (email.split('@')[0] if email else None) or (nome or 'aluno')
-            username = self._generate_unique_username(base_username)
-        
-        # Verifica se o username gerado já existe antes de tentar criar o User
-        if User.objects.filter(username=username).exists():
-            # Isso deve ser evitado pelo _generate_unique_username, mas é uma salvaguarda
-            raise serializers.ValidationError({'username': 'Este nome de usuário já está em uso.'})
-
-        # Cria usuário vinculado
-        user = User(username=username, first_name=nome or '', email=email or '')
-        if password:
-            user.set_password(password)
-        else:
-            # Senha não é necessária para gestão pelo admin; torna a senha inutilizável
-            user.set_unusable_password()
-        
-        try:
-            user.save()
-        except IntegrityError as e:
-            # Se houver um IntegrityError aqui, é provável que seja um problema de username
-            # ou um email único no User (se configurado).
-            # Para evitar mensagens genéricas, podemos tentar ser mais específicos.
-            if 'username' in str(e).lower(): # Tentativa de identificar a causa pelo erro
-                raise serializers.ValidationError({'username': 'Erro ao criar usuário: nome de usuário duplicado.'})
-            elif 'email' in str(e).lower(): # Se o User model tiver unique=True para email
-                raise serializers.ValidationError({'email': 'Erro ao criar usuário: email duplicado.'})
+        gerar_username = not username
+        tentativas = self.MAX_TENTATIVAS_USERNAME if gerar_username else 1
+        for tentativa in range(tentativas):
+            if gerar_username:
+                # Uma consulta, qualquer que seja o número de homônimos
+                username = alocar_usernames([base_username(email, nome)])[0]
+
+            # Cria usuário vinculado
+            user = User(username=username, first_name=nome or '', email=email or '')
+            if password:
+                user.set_password(password)
             else:
-                raise serializers.ValidationError({'detail': 'Erro inesperado ao criar usuário.'})
+                # Senha não é necessária para gestão pelo admin; torna a senha inutilizável
+                user.set_unusable_password()
+
+            try:
+                with transaction.atomic():
+                    user.save()
+            except IntegrityError as e:
+                # Outra criação concorrente ocupou o username alocado: realoca
+                if gerar_username and tentativa + 1 < tentativas:
+                    continue
+                # Para evitar mensagens genéricas, tenta identificar a causa pelo erro
+                if 'username' in str(e).lower():
+                    raise serializers.ValidationError({'username': 'Este nome de usuário já está em uso.'})
+                elif 'email' in str(e).lower(): # Se o User model tiver unique=True para email
+                    raise serializers.ValidationError({'email': 'Erro ao criar usuário: email duplicado.'})
+                else:
+                    raise serializers.ValidationError({'detail': 'Erro inesperado ao criar usuário.'})
+            break
 
         aluno = Aluno.objects.create(user=user, **validated_data)
         return aluno
@@ -404,28 +461,29 @@ class AlunoSerializer(serializers.ModelSerializer):
         username = validated_data.pop('username', None)
         password = validated_data.pop('password', None)
 
-        # Atualiza dados do Aluno
-        for field in ['nome', 'email', 'telefone']:
-            if field in validated_data:
-                setattr(instance, field, validated_data[field])
-        instance.save()
-
-        # Mantém User sincronizado
-        user = instance.user
-        if 'email' in validated_data:
-            user.email = validated_data['email']
-        if 'nome' in validated_data:
-            user.first_name = validated_data['nome']
-        if username:
-            user.username = username
-        if password:
-            user.set_password(password)
-        user.save()
+        # Atualiza dados do Aluno; Aluno.save sincroniza email/nome no User
+        # apenas quando mudaram
+        with transaction.atomic():
+            for field in ['nome', 'email', 'telefone']:
+                if field in validated_data:
+                    setattr(instance, field, validated_data[field])
+            instance.save()
+
+            # Credenciais explícitas: grava só as colunas alteradas
+            campos_user = []
+            if username:
+                instance.user.username = username
+                campos_user.append('username')
+            if password:
+                instance.user.set_password(password)
+                campos_user.append('password')
+            if campos_user:
+                instance.user.save(update_fields=campos_user)
 
         return instance
 
 
-class MatriculaSerializer(serializers.ModelSerializer):
+class MatriculaSerializer(CamposDinamicosMixin, serializers.ModelSerializer):
     aluno_nome = serializers.CharField(source='aluno.nome', read_only=True)
     turma_nome = serializers.CharField(source='turma.nome', read_only=True)
     treinamento_nome = serializers.CharField(source='turma.treinamento.nome', read_only=True)
@@ -451,16 +509,30 @@ class MatriculaSerializer(serializers.ModelSerializer):
         return data
 
 
-class RecursoAlunoSerializer(serializers.ModelSerializer):
+class MatriculaBulkSerializer(serializers.Serializer):
+    """Matrícula em lote: uma turma e a lista de alunos a matricular"""
+    turma = serializers.PrimaryKeyRelatedField(queryset=Turma.objects.all())
+    alunos = serializers.ListField(
+        child=serializers.UUIDField(), allow_empty=False, max_length=5000
+    )
+
+    def validate_alunos(self, value):
+        # Remove repetições preservando a ordem enviada
+        return list(dict.fromkeys(value))
+
+
+class RecursoAlunoSerializer(CamposDinamicosMixin, serializers.ModelSerializer):
     """Serializer específico para visualização do aluno com regras de acesso"""
     turma_nome = serializers.CharField(source='turma.nome', read_only=True)
     arquivo_url = serializers.SerializerMethodField()
     pode_acessar = serializers.SerializerMethodField()
+    # pode_acessar vem da anotação de core.access
+    colunas_campos = {'arquivo_url': ('id', 'arquivo'), 'pode_acessar': ()}
 
     class Meta:
         model = Recurso
-        fields = ['id', 'nome_recurso', 'descricao_recurso', 'turma_nome', 
-                 'tipo_recurso', 'arquivo_url', 
+        fields = ['id', 'nome_recurso', 'descricao_recurso', 'turma', 'turma_nome',
+                 'treinamento', 'tipo_recurso', 'arquivo_url',
                  'pode_acessar', 'created_at']
         read_only_fields = ['id', 'created_at']
 
@@ -468,19 +540,11 @@ class RecursoAlunoSerializer(serializers.ModelSerializer):
         if obj.arquivo and self.get_pode_acessar(obj):
             request = self.context.get('request')
             if request:
-                return request.build_absolute_uri(obj.arquivo.url)
+                return url_download(request, obj.pk)
         return None
 
     def get_pode_acessar(self, obj):
-        from django.utils import timezone
-        
-        # Se está em draft, não pode acessar
-        if obj.draft:
-            return False
-        
-        # Se permite acesso prévio, pode acessar
-        if obj.acesso_previo:
-            return True
-        
-        # Senão, só pode acessar se a turma já começou
-        return obj.turma.data_inicio <= timezone.now().date()
\ No newline at end of file
+        # Valor calculado no banco por core.access.anotar_pode_acessar
+        if hasattr(obj, 'pode_acessar'):
+            return obj.pode_acessar
+        return pode_acessar(obj, self.context.get('aluno'))
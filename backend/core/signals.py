@@ -0,0 +1,203 @@
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from .access import invalidar_alunos, invalidar_alunos_dos_recursos
+from .counters import ajustar_contadores
+from .models import Aluno, DailyStats, Matricula, Recurso, Treinamento, Turma
+from .response_cache import incrementar_versao
+from .stats import ajustar, dia_local, escopo_da_turma, escopo_do_recurso
+
+
+@receiver(pre_save, sender=Matricula)
+def guardar_vinculo_anterior(sender, instance, **kwargs):
+    """Guarda turma/aluno originais para ajustar contadores em caso de troca."""
+    instance._vinculo_anterior = None
+    if not instance._state.adding:
+        instance._vinculo_anterior = (
+            sender.objects.filter(pk=instance.pk)
+            .values_list('turma_id', 'aluno_id')
+            .first()
+        )
+
+
+@receiver(post_save, sender=Matricula)
+def incrementar_contadores(sender, instance, created, **kwargs):
+    if created:
+        ajustar_contadores(instance.turma_id, instance.aluno_id, 1)
+        return
+
+    anterior = getattr(instance, '_vinculo_anterior', None)
+    if anterior and anterior != (instance.turma_id, instance.aluno_id):
+        ajustar_contadores(*anterior, -1)
+        ajustar_contadores(instance.turma_id, instance.aluno_id, 1)
+
+
+@receiver(post_delete, sender=Matricula)
+def decrementar_contadores(sender, instance, **kwargs):
+    # Também cobre QuerySet.delete() e exclusões em cascata de Turma/Aluno:
+    # com receivers registrados o Collector envia post_delete por objeto.
+    ajustar_contadores(instance.turma_id, instance.aluno_id, -1)
+
+
+# Gerações do cache de respostas (core.response_cache)
+MODELOS_VERSIONADOS = (Treinamento, Turma, Recurso, Aluno, Matricula)
+
+
+@receiver([post_save, post_delete])
+def invalidar_respostas(sender, **kwargs):
+    if sender in MODELOS_VERSIONADOS:
+        incrementar_versao(sender)
+
+
+# Leituras por aluno (core.access, core.warmup): só os alunos afetados
+
+@receiver([post_save, post_delete], sender=Aluno)
+def leituras_aluno(sender, instance, **kwargs):
+    invalidar_alunos(alunos=[instance.pk])
+
+
+@receiver(post_save, sender=Matricula)
+def leituras_matricula_salva(sender, instance, **kwargs):
+    anterior = getattr(instance, '_vinculo_anterior', None)
+    invalidar_alunos(alunos={instance.aluno_id, *(anterior[1:] if anterior else ())})
+
+
+@receiver(post_delete, sender=Matricula)
+def leituras_matricula_removida(sender, instance, **kwargs):
+    invalidar_alunos(alunos=[instance.aluno_id])
+
+
+@receiver(post_save, sender=Recurso)
+def leituras_recurso_salvo(sender, instance, created, **kwargs):
+    anterior = getattr(instance, '_acesso_anterior', None)
+    atual = (instance.draft, instance.acesso_previo, instance.turma_id, instance.treinamento_id)
+    if anterior == atual or (created and instance.draft):
+        return
+    invalidar_alunos_dos_recursos([atual[2:], *([anterior[2:]] if anterior else [])])
+
+
+@receiver(post_delete, sender=Recurso)
+def leituras_recurso_removido(sender, instance, **kwargs):
+    if not instance.draft:
+        invalidar_alunos_dos_recursos([(instance.turma_id, instance.treinamento_id)])
+
+
+@receiver(post_save, sender=Turma)
+def leituras_turma_salva(sender, instance, created, **kwargs):
+    # Uma turma nova ainda não tem matrículas; na exclusão, as matrículas
+    # removidas em cascata invalidam os seus alunos
+    if not created:
+        invalidar_alunos(turmas=[instance.pk])
+
+
+@receiver(post_save, sender=Treinamento)
+def leituras_treinamento_salvo(sender, instance, created, **kwargs):
+    if not created:
+        invalidar_alunos(treinamentos=[instance.pk])
+
+
+# Estatísticas diárias (core.stats): cada evento aplica um delta no dia
+# correspondente; caminhos em lote reconstroem os dias afetados.
+
+@receiver(post_save, sender=Aluno)
+def estatisticas_aluno_criado(sender, instance, created, **kwargs):
+    if created:
+        ajustar('novos_alunos', 1, dia_local(instance.created_at))
+
+
+@receiver(post_delete, sender=Aluno)
+def estatisticas_aluno_removido(sender, instance, **kwargs):
+    ajustar('novos_alunos', -1, dia_local(instance.created_at))
+
+
+@receiver(post_save, sender=Matricula)
+def estatisticas_matricula_salva(sender, instance, created, **kwargs):
+    dia = dia_local(instance.data_matricula)
+    if created:
+        ajustar('novas_matriculas', 1, dia, escopo=escopo_da_turma(instance.turma_id))
+        return
+
+    anterior = getattr(instance, '_vinculo_anterior', None)
+    if anterior and anterior[0] != instance.turma_id:
+        ajustar('novas_matriculas', -1, dia, escopo=escopo_da_turma(anterior[0]))
+        ajustar('novas_matriculas', 1, dia, escopo=escopo_da_turma(instance.turma_id))
+
+
+@receiver(post_delete, sender=Matricula)
+def estatisticas_matricula_removida(sender, instance, **kwargs):
+    ajustar('novas_matriculas', -1, dia_local(instance.data_matricula), escopo=escopo_da_turma(instance.turma_id))
+
+
+@receiver(pre_save, sender=Recurso)
+def guardar_publicacao_anterior(sender, instance, **kwargs):
+    instance._publicacao_anterior = instance._acesso_anterior = None
+    if not instance._state.adding:
+        instance._acesso_anterior = (
+            sender.objects.filter(pk=instance.pk)
+            .values_list('draft', 'acesso_previo', 'turma_id', 'treinamento_id')
+            .first()
+        )
+        if instance._acesso_anterior:
+            draft, _, turma_id, treinamento_id = instance._acesso_anterior
+            instance._publicacao_anterior = (draft, turma_id, treinamento_id)
+
+
+@receiver(post_save, sender=Recurso)
+def estatisticas_recurso_salvo(sender, instance, **kwargs):
+    anterior = getattr(instance, '_publicacao_anterior', None)
+    atual = (instance.draft, instance.turma_id, instance.treinamento_id)
+    if anterior == atual:
+        return
+
+    dia = dia_local(instance.created_at)
+    if anterior and not anterior[0]:
+        ajustar('recursos_publicados', -1, dia, escopo=escopo_do_recurso(*anterior[1:]))
+    if not instance.draft:
+        ajustar('recursos_publicados', 1, dia, escopo=escopo_do_recurso(*atual[1:]))
+
+
+@receiver(post_delete, sender=Recurso)
+def estatisticas_recurso_removido(sender, instance, **kwargs):
+    if not instance.draft:
+        ajustar(
+            'recursos_publicados', -1, dia_local(instance.created_at),
+            escopo=escopo_do_recurso(instance.turma_id, instance.treinamento_id),
+        )
+
+
+@receiver(pre_save, sender=Turma)
+def guardar_periodo_anterior(sender, instance, **kwargs):
+    instance._periodo_anterior = None
+    if not instance._state.adding:
+        instance._periodo_anterior = (
+            sender.objects.filter(pk=instance.pk)
+            .values_list('treinamento_id', 'data_inicio', 'data_conclusao')
+            .first()
+        )
+
+
+@receiver(post_save, sender=Turma)
+def estatisticas_turma_salva(sender, instance, **kwargs):
+    anterior = getattr(instance, '_periodo_anterior', None)
+    atual = (instance.treinamento_id, instance.data_inicio, instance.data_conclusao)
+    if anterior == atual:
+        return
+
+    if anterior:
+        treinamento_id, inicio, fim = anterior
+        ajustar('turmas_ativas', -1, inicio, fim, escopo=(treinamento_id, None))
+        if treinamento_id != instance.treinamento_id:
+            # Matrículas e recursos da turma passam para o novo treinamento
+            DailyStats.objects.filter(turma_id=instance.pk).update(treinamento_id=instance.treinamento_id)
+    ajustar(
+        'turmas_ativas', 1, instance.data_inicio, instance.data_conclusao,
+        escopo=(instance.treinamento_id, None),
+    )
+
+
+@receiver(post_delete, sender=Turma)
+def estatisticas_turma_removida(sender, instance, **kwargs):
+    ajustar(
+        'turmas_ativas', -1, instance.data_inicio, instance.data_conclusao,
+        escopo=(instance.treinamento_id, None),
+    )
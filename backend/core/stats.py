@@ -0,0 +1,232 @@
+"""
+Estatísticas diárias consolidadas (`DailyStats`).
+
+Cada linha guarda, para um dia, os novos alunos, as novas matrículas, os
+recursos publicados (não-rascunho, pelo dia de criação) e as turmas ativas
+(`data_inicio <= dia <= data_conclusao`). O escopo da linha é:
+
+* global: `treinamento_id` e `turma_id` nulos (todas as métricas);
+* turma: matrículas e recursos da turma (com o treinamento dela);
+* treinamento (`turma_id` nulo): recursos do treinamento e turmas ativas.
+
+As linhas de um treinamento somadas dão os totais dele. Os signals de
+core.signals aplicam deltas com UPDATE atômico (F()); os caminhos em lote
+dos querysets aplicam os mesmos deltas agrupados por dia/escopo. O comando
+`recalcular_estatisticas` reconstrói os dias a partir das tabelas.
+"""
+from collections import Counter
+from datetime import datetime, time, timedelta
+
+from django.db import transaction
+from django.db.models import Count, F, Min, Max, Q
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+# Escopo da linha global: (treinamento_id, turma_id) nulos
+GLOBAL = (None, None)
+
+
+def inicio_do_dia(dia):
+    """Início do dia no fuso configurado, para filtrar colunas DateTime por índice."""
+    return timezone.make_aware(datetime.combine(dia, time.min))
+
+
+def dia_local(instante):
+    return timezone.localdate(instante) if isinstance(instante, datetime) else instante
+
+
+def _escopos(escopo):
+    return [GLOBAL] if escopo == GLOBAL else [GLOBAL, escopo]
+
+
+def ajustar(campo, delta, inicio, fim=None, escopo=GLOBAL):
+    """
+    Soma `delta` em `campo` nos dias [inicio, fim] do escopo
+    (treinamento_id, turma_id) e também na linha global.
+    """
+    from .models import DailyStats
+
+    fim = fim or inicio
+    if not delta or fim < inicio:
+        return
+    escopos = _escopos(escopo)
+    dias = [inicio + timedelta(days=n) for n in range((fim - inicio).days + 1)]
+    # Garante as linhas (as existentes são ignoradas) e aplica o delta no banco
+    DailyStats.objects.bulk_create(
+        [DailyStats(dia=dia, treinamento_id=t, turma_id=u) for dia in dias for t, u in escopos],
+        ignore_conflicts=True,
+    )
+    for t, u in escopos:
+        DailyStats.objects.filter(dia__range=(inicio, fim), treinamento_id=t, turma_id=u).update(
+            **{campo: F(campo) + delta}
+        )
+
+
+def escopo_da_turma(turma_id):
+    from .models import Turma
+
+    treinamento_id = Turma.objects.filter(pk=turma_id).values_list('treinamento_id', flat=True).first()
+    return treinamento_id, turma_id
+
+
+def escopo_do_recurso(turma_id, treinamento_id):
+    return escopo_da_turma(turma_id) if turma_id else (treinamento_id, None)
+
+
+def recursos_publicados(queryset):
+    """Contagem de recursos publicados de `queryset` por (dia, treinamento, turma)."""
+    linhas = (
+        queryset.filter(draft=False)
+        .annotate(dia=TruncDate('created_at'))
+        .values('dia', 'turma_id', 'turma__treinamento_id', 'treinamento_id')
+        .annotate(total=Count('pk'))
+        .order_by()
+    )
+    contagem = Counter()
+    for linha in linhas:
+        if linha['turma_id']:
+            chave = (linha['dia'], linha['turma__treinamento_id'], linha['turma_id'])
+        else:
+            chave = (linha['dia'], linha['treinamento_id'], None)
+        contagem[chave] += linha['total']
+    return contagem
+
+
+def matriculas_por_dia(queryset):
+    """Contagem de matrículas de `queryset` por (dia, treinamento, turma)."""
+    linhas = (
+        queryset.annotate(dia=TruncDate('data_matricula'))
+        .values('dia', 'turma_id', 'turma__treinamento_id')
+        .annotate(total=Count('pk'))
+        .order_by()
+    )
+    return Counter({
+        (linha['dia'], linha['turma__treinamento_id'], linha['turma_id']): linha['total']
+        for linha in linhas
+    })
+
+
+def aplicar_diferenca(campo, antes, depois):
+    """Aplica `depois - antes` (contagens por dia/escopo) com ajustar()."""
+    for chave in antes.keys() | depois.keys():
+        dia, *escopo = chave
+        ajustar(campo, depois.get(chave, 0) - antes.get(chave, 0), dia, escopo=tuple(escopo))
+
+
+def turmas_por_periodo(queryset):
+    """Contagem de turmas de `queryset` por (treinamento, data_inicio, data_conclusao)."""
+    linhas = (
+        queryset.values('treinamento_id', 'data_inicio', 'data_conclusao')
+        .annotate(total=Count('pk'))
+        .order_by()
+    )
+    return Counter({
+        (linha['treinamento_id'], linha['data_inicio'], linha['data_conclusao']): linha['total']
+        for linha in linhas
+    })
+
+
+def aplicar_diferenca_turmas(antes, depois):
+    """Aplica `depois - antes` (de turmas_por_periodo) em turmas_ativas."""
+    for chave in antes.keys() | depois.keys():
+        treinamento_id, inicio, fim = chave
+        ajustar(
+            'turmas_ativas', depois.get(chave, 0) - antes.get(chave, 0), inicio, fim,
+            escopo=(treinamento_id, None),
+        )
+
+
+def mover_turmas(antes, depois):
+    """
+    Passa as linhas das turmas que trocaram de treinamento para o novo
+    (`antes`/`depois`: dict turma_id -> treinamento_id).
+    """
+    from .models import DailyStats
+
+    movidas = {}
+    for turma_id, treinamento_id in depois.items():
+        if antes.get(turma_id) != treinamento_id:
+            movidas.setdefault(treinamento_id, []).append(turma_id)
+    for treinamento_id, turma_ids in movidas.items():
+        DailyStats.objects.filter(turma_id__in=turma_ids).update(treinamento_id=treinamento_id)
+
+
+def _periodo(campo, inicio, fim):
+    return Q(**{
+        f'{campo}__gte': inicio_do_dia(inicio),
+        f'{campo}__lt': inicio_do_dia(fim + timedelta(days=1)),
+    })
+
+
+def _periodo_padrao():
+    from .models import Aluno, Matricula, Recurso, Turma
+
+    hoje = timezone.localdate()
+    inicios = [
+        dia_local(Aluno.objects.aggregate(v=Min('created_at'))['v']),
+        dia_local(Matricula.objects.aggregate(v=Min('data_matricula'))['v']),
+        dia_local(Recurso.objects.aggregate(v=Min('created_at'))['v']),
+    ]
+    turmas = Turma.objects.aggregate(inicio=Min('data_inicio'), fim=Max('data_conclusao'))
+    inicios.append(turmas['inicio'])
+    inicios = [dia for dia in inicios if dia]
+    return min(inicios, default=hoje), max(hoje, turmas['fim'] or hoje)
+
+
+def recalcular_estatisticas(inicio=None, fim=None):
+    """
+    Reconstrói as linhas de DailyStats dos dias [inicio, fim] a partir das
+    tabelas de origem. Sem argumentos cobre todo o histórico (e as turmas
+    futuras). Retorna o número de linhas gravadas.
+    """
+    from .models import Aluno, DailyStats, Matricula, Recurso, Turma
+
+    if inicio is None or fim is None:
+        padrao_inicio, padrao_fim = _periodo_padrao()
+        inicio = inicio or padrao_inicio
+        fim = fim or padrao_fim
+
+    contagens = {}
+
+    def somar(dia, campo, total, escopo=GLOBAL):
+        for chave in _escopos(escopo):
+            contagens.setdefault((dia, *chave), Counter())[campo] += total
+
+    alunos = (
+        Aluno.objects.filter(_periodo('created_at', inicio, fim))
+        .annotate(dia=TruncDate('created_at')).values('dia')
+        .annotate(total=Count('pk')).order_by()
+    )
+    for linha in alunos:
+        somar(linha['dia'], 'novos_alunos', linha['total'])
+
+    matriculas = (
+        Matricula.objects.filter(_periodo('data_matricula', inicio, fim))
+        .annotate(dia=TruncDate('data_matricula')).values('dia', 'turma_id', 'turma__treinamento_id')
+        .annotate(total=Count('pk')).order_by()
+    )
+    for linha in matriculas:
+        escopo = (linha['turma__treinamento_id'], linha['turma_id'])
+        somar(linha['dia'], 'novas_matriculas', linha['total'], escopo)
+
+    publicados = recursos_publicados(Recurso.objects.filter(_periodo('created_at', inicio, fim)))
+    for (dia, treinamento_id, turma_id), total in publicados.items():
+        somar(dia, 'recursos_publicados', total, (treinamento_id, turma_id))
+
+    turmas = Turma.objects.filter(data_inicio__lte=fim, data_conclusao__gte=inicio).values_list(
+        'treinamento_id', 'data_inicio', 'data_conclusao'
+    )
+    for treinamento_id, data_inicio, data_conclusao in turmas:
+        dia, ultimo = max(data_inicio, inicio), min(data_conclusao, fim)
+        while dia <= ultimo:
+            somar(dia, 'turmas_ativas', 1, (treinamento_id, None))
+            dia += timedelta(days=1)
+
+    linhas = [
+        DailyStats(dia=dia, treinamento_id=treinamento_id, turma_id=turma_id, **valores)
+        for (dia, treinamento_id, turma_id), valores in contagens.items()
+    ]
+    with transaction.atomic():
+        DailyStats.objects.filter(dia__range=(inicio, fim)).delete()
+        DailyStats.objects.bulk_create(linhas, batch_size=1000)
+    return len(linhas)
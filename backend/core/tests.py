@@ -154,6 +154,51 @@ class AlunoModelTest(TestCase):
     def test_aluno_str(self):
         """Testa representação string do aluno"""
         self.assertEqual(str(self.aluno), "João Silva")
+    
+    def test_user_sync_only_when_changed(self):
+        """User só é gravado quando email/nome do aluno mudam"""
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+
+        aluno = Aluno.objects.get(pk=self.aluno.pk)
+        aluno.telefone = "(11) 88888-8888"
+        with CaptureQueriesContext(connection) as queries:
+            aluno.save()
+        self.assertFalse([q for q in queries if 'auth_user' in q['sql']])
+
+        aluno.email = "joao.silva@example.com"
+        with CaptureQueriesContext(connection) as queries:
+            aluno.save()
+        escritas = [q['sql'] for q in queries if q['sql'].startswith('UPDATE "auth_user"')]
+        self.assertEqual(len(escritas), 1)
+        self.assertNotIn('first_name', escritas[0])
+        self.user.refresh_from_db()
+        self.assertEqual(self.user.email, "joao.silva@example.com")
+        self.assertEqual(self.user.first_name, "João Silva")
+    
+    def test_user_sync_in_bulk_paths(self):
+        """bulk_update e update() também mantêm o User sincronizado"""
+        outro = Aluno.objects.create(
+            user=User.objects.create(username="maria.souza"), nome="Maria", email="maria@example.com"
+        )
+        alunos = list(Aluno.objects.order_by('nome'))
+        alunos[0].nome = "João Pedro Silva"
+        Aluno.objects.bulk_update(alunos, ['nome', 'telefone'])
+        self.user.refresh_from_db()
+        self.assertEqual(self.user.first_name, "João Pedro Silva")
+        self.assertEqual(User.objects.get(pk=outro.user_id).first_name, "Maria")
+
+        Aluno.objects.filter(pk=outro.pk).update(email="maria.souza@example.com", nome="Maria Souza")
+        outro.user.refresh_from_db()
+        self.assertEqual(outro.user.email, "maria.souza@example.com")
+        self.assertEqual(outro.user.first_name, "Maria Souza")
+        self.assertEqual(Aluno.objects.get(pk=outro.pk).login_normalizado, "maria souza")
+
+        # Expressões em nome também atualizam a chave de login
+        from django.db.models import Value
+        from django.db.models.functions import Concat
+        Aluno.objects.filter(pk=outro.pk).update(nome=Concat('nome', Value(" Júnior")))
+        self.assertEqual(Aluno.objects.get(pk=outro.pk).login_normalizado, "maria souza junior")
 
 
 class MatriculaModelTest(TestCase):
@@ -458,7 +503,7 @@ class BusinessRulesTest(APITestCase):
         
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         # Deve retornar apenas o recurso com acesso prévio
-        recursos_nomes = [r['nome_recurso'] for r in response.data]
+        recursos_nomes = [r['nome_recurso'] for r in response.data['results']]
         self.assertIn("Material Prévio", recursos_nomes)
         self.assertNotIn("Material Normal", recursos_nomes)
     
@@ -503,9 +548,53 @@ class BusinessRulesTest(APITestCase):
         
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         # Deve retornar apenas recursos não-draft
-        recursos_nomes = [r['nome_recurso'] for r in response.data]
+        recursos_nomes = [r['nome_recurso'] for r in response.data['results']]
         self.assertIn("Material Normal", recursos_nomes)
         self.assertNotIn("Material Draft", recursos_nomes)
+    
+    def test_treinamento_recursos_and_filters(self):
+        """Recursos do treinamento são incluídos e os filtros tipo/search se aplicam"""
+        turma_ativa = Turma.objects.create(
+            treinamento=self.treinamento,
+            nome="Turma Ativa",
+            data_inicio=date.today() - timedelta(days=5),
+            data_conclusao=date.today() + timedelta(days=25)
+        )
+        Matricula.objects.create(turma=turma_ativa, aluno=self.aluno)
+        outro_treinamento = Treinamento.objects.create(nome="Outro Treinamento", nivel="iniciante")
+
+        Recurso.objects.create(
+            treinamento=self.treinamento,
+            nome_recurso="Apostila Geral",
+            tipo_recurso="arquivo_pdf",
+            draft=False
+        )
+        Recurso.objects.create(
+            treinamento=self.treinamento,
+            nome_recurso="Vídeo Geral",
+            tipo_recurso="video",
+            draft=False
+        )
+        Recurso.objects.create(
+            treinamento=outro_treinamento,
+            nome_recurso="Apostila Alheia",
+            tipo_recurso="arquivo_pdf",
+            draft=False
+        )
+
+        self.client.force_authenticate(user=self.student_user)
+        url = reverse('aluno-recursos-disponiveis', kwargs={'pk': self.aluno.id})
+
+        response = self.client.get(url)
+        recursos_nomes = [r['nome_recurso'] for r in response.data['results']]
+        self.assertEqual(sorted(recursos_nomes), ["Apostila Geral", "Vídeo Geral"])
+        self.assertTrue(all(r['pode_acessar'] for r in response.data['results']))
+
+        response = self.client.get(url, {'tipo': 'video'})
+        self.assertEqual([r['nome_recurso'] for r in response.data['results']], ["Vídeo Geral"])
+
+        response = self.client.get(url, {'search': 'apostila'})
+        self.assertEqual([r['nome_recurso'] for r in response.data['results']], ["Apostila Geral"])
 
 
 class AuthenticationTest(APITestCase):
@@ -550,6 +639,37 @@ class AuthenticationTest(APITestCase):
         response = self.client.post(url, data)
         self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
     
+    def test_login_by_aluno_name(self):
+        """Login pelo nome do aluno ignora acentos/caixa e resolve homônimos pela senha"""
+        for i, senha in enumerate(["senha-um", "senha-dois"]):
+            user = User.objects.create_user(username=f"joao{i}", password=senha)
+            Aluno.objects.create(user=user, nome="João  da Silva", email=f"joao{i}@example.com")
+
+        url = reverse('auth-login')
+        data = {'username': 'JOAO DA SILVA', 'password': 'senha-dois', 'profile_type': 'aluno'}
+        response = self.client.post(url, data)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['user']['username'], 'joao1')
+
+    def test_login_by_ambiguous_name_fails_closed(self):
+        """Nomes com homônimos demais não disparam um hash de senha por candidato"""
+        from unittest import mock
+        from django.contrib.auth import authenticate
+
+        for i in range(4):
+            user = User.objects.create_user(username=f"ana{i}", password="senha-ana")
+            Aluno.objects.create(user=user, nome="Ana Lima", email=f"ana{i}@example.com")
+
+        data = {'username': 'ana lima', 'password': 'senha-ana', 'profile_type': 'aluno'}
+        with mock.patch('core.views.authenticate', side_effect=authenticate) as autenticar:
+            response = self.client.post(reverse('auth-login'), data)
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+        self.assertEqual(response.data, {'error': 'Credenciais inválidas'})
+        self.assertEqual(autenticar.call_count, 1)
+
+        data['username'] = 'ana2'
+        self.assertEqual(self.client.post(reverse('auth-login'), data).status_code, status.HTTP_200_OK)
+    
     def test_protected_endpoint_without_auth(self):
         """Testa acesso a endpoint protegido sem autenticação"""
         url = reverse('treinamento-list')
@@ -614,6 +734,2073 @@ class PerformanceTest(TestCase):
             self.assertLess(query_count, 5, "Muitas queries executadas")
 
 
+class ContadoresMatriculaTest(APITestCase):
+    """Testes dos contadores desnormalizados de matrículas"""
+
+    def setUp(self):
+        self.treinamento = Treinamento.objects.create(nome="Contadores", nivel="iniciante")
+        self.turma = Turma.objects.create(
+            treinamento=self.treinamento,
+            nome="Turma Contadores",
+            data_inicio=date.today(),
+            data_conclusao=date.today() + timedelta(days=30)
+        )
+        self.alunos = []
+        for i in range(3):
+            user = User.objects.create_user(username=f"contador{i}", password="senha123")
+            self.alunos.append(Aluno.objects.create(user=user, nome=f"Aluno {i}", email=f"contador{i}@example.com"))
+
+    def test_create_and_delete_update_counters(self):
+        """Criação e remoção de matrícula ajustam os contadores"""
+        matricula = Matricula.objects.create(turma=self.turma, aluno=self.alunos[0])
+        self.turma.refresh_from_db()
+        self.alunos[0].refresh_from_db()
+        self.assertEqual(self.turma.total_alunos, 1)
+        self.assertEqual(self.alunos[0].total_matriculas, 1)
+
+        matricula.delete()
+        self.turma.refresh_from_db()
+        self.alunos[0].refresh_from_db()
+        self.assertEqual(self.turma.total_alunos, 0)
+        self.assertEqual(self.alunos[0].total_matriculas, 0)
+
+    def test_bulk_create_and_cascade(self):
+        """bulk_create e exclusão em cascata mantêm os contadores"""
+        Matricula.objects.bulk_create([Matricula(turma=self.turma, aluno=aluno) for aluno in self.alunos])
+        self.turma.refresh_from_db()
+        self.assertEqual(self.turma.total_alunos, 3)
+
+        self.alunos[0].delete()
+        self.turma.refresh_from_db()
+        self.assertEqual(self.turma.total_alunos, 2)
+
+        self.turma.delete()
+        self.alunos[1].refresh_from_db()
+        self.assertEqual(self.alunos[1].total_matriculas, 0)
+
+    def test_instance_save_does_not_overwrite_counter(self):
+        """save() de instância carregada antes da matrícula preserva o contador"""
+        turma = Turma.objects.get(pk=self.turma.pk)
+        Matricula.objects.create(turma=self.turma, aluno=self.alunos[0])
+        turma.nome = "Turma Renomeada"
+        turma.save()
+        turma.refresh_from_db()
+        self.assertEqual(turma.total_alunos, 1)
+
+    def test_recalcular_contadores_command(self):
+        """O comando corrige contadores divergentes"""
+        from django.core.management import call_command
+        from io import StringIO
+
+        Matricula.objects.create(turma=self.turma, aluno=self.alunos[0])
+        Turma.objects.filter(pk=self.turma.pk).update(total_alunos=42)
+        call_command('recalcular_contadores', stdout=StringIO())
+        self.turma.refresh_from_db()
+        self.assertEqual(self.turma.total_alunos, 1)
+
+    def test_list_query_count_is_constant(self):
+        """Listagem de turmas executa o mesmo número de queries independente do tamanho"""
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+
+        admin = User.objects.create_user(username="admin_contadores", password="admin123", is_staff=True)
+        self.client.force_authenticate(user=admin)
+        for aluno in self.alunos:
+            Matricula.objects.create(turma=self.turma, aluno=aluno)
+
+        with CaptureQueriesContext(connection) as poucas:
+            self.client.get('/api/turmas/')
+        for i in range(10):
+            Turma.objects.create(
+                treinamento=self.treinamento,
+                nome=f"Turma Extra {i}",
+                data_inicio=date.today(),
+                data_conclusao=date.today() + timedelta(days=30)
+            )
+        with CaptureQueriesContext(connection) as muitas:
+            response = self.client.get('/api/turmas/')
+
+        totais = {item['id']: item['total_alunos'] for item in response.data['results']}
+        self.assertEqual(totais[str(self.turma.id)], 3)
+        self.assertEqual(len(poucas), len(muitas))
+
+
+class AccessRulesTest(APITestCase):
+    """Testes da regra única de acesso (core.access)"""
+
+    def setUp(self):
+        self.student_user = User.objects.create_user(username="regras", password="senha123")
+        self.aluno = Aluno.objects.create(user=self.student_user, nome="Aluno Regras", email="regras@example.com")
+        self.treinamento = Treinamento.objects.create(nome="Regras de Acesso", nivel="iniciante")
+        self.turma_futura = Turma.objects.create(
+            treinamento=self.treinamento,
+            nome="Turma Futura",
+            data_inicio=date.today() + timedelta(days=10),
+            data_conclusao=date.today() + timedelta(days=40)
+        )
+        self.turma_ativa = Turma.objects.create(
+            treinamento=self.treinamento,
+            nome="Turma Ativa",
+            data_inicio=date.today() - timedelta(days=5),
+            data_conclusao=date.today() + timedelta(days=25)
+        )
+        Matricula.objects.create(turma=self.turma_futura, aluno=self.aluno)
+        for vinculo in [{'turma': self.turma_futura}, {'turma': self.turma_ativa}, {'treinamento': self.treinamento}]:
+            for draft, acesso_previo in [(True, False), (False, False), (False, True)]:
+                Recurso.objects.create(
+                    nome_recurso=f"Recurso {draft}-{acesso_previo}",
+                    tipo_recurso="arquivo_pdf",
+                    draft=draft,
+                    acesso_previo=acesso_previo,
+                    **vinculo
+                )
+
+    def test_sql_and_python_predicates_agree(self):
+        """A anotação SQL e o predicado Python retornam o mesmo resultado"""
+        from .access import anotar_pode_acessar, pode_acessar
+
+        for aluno in [None, self.aluno]:
+            recursos = anotar_pode_acessar(Recurso.objects.select_related('turma'), aluno)
+            for recurso in recursos:
+                self.assertEqual(recurso.pode_acessar, pode_acessar(recurso, aluno), recurso)
+
+    def test_turma_recursos_for_student(self):
+        """Aluno vê em /turmas/{id}/recursos/ apenas recursos liberados"""
+        self.client.force_authenticate(user=self.student_user)
+        response = self.client.get(f'/api/turmas/{self.turma_futura.id}/recursos/')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([r['nome_recurso'] for r in response.data], ["Recurso False-True"])
+
+    def test_recursos_disponiveis_identify_turma_and_treinamento(self):
+        """Recursos do aluno trazem os ids de turma e treinamento, para o front agrupar por turma"""
+        self.client.force_authenticate(user=self.student_user)
+        response = self.client.get(f'/api/alunos/{self.aluno.id}/recursos_disponiveis/')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        vinculos = {(r['turma'], r['treinamento']) for r in response.json()['results']}
+        self.assertEqual(vinculos, {(str(self.turma_futura.id), None), (None, str(self.treinamento.id))})
+
+
+class IndexUsageTest(TestCase):
+    """Testes do comando verificar_indices"""
+
+    def test_canonical_queries_use_indexes(self):
+        """As consultas canônicas dos ViewSets não fazem varredura sequencial"""
+        from django.core.management import call_command
+        from django.db import connection
+        from io import StringIO
+
+        # Com tabelas vazias o planejador escolhe varreduras que não dizem
+        # nada: distribui recursos e matrículas entre várias turmas
+        treinamentos = Treinamento.objects.bulk_create(
+            [Treinamento(nome=f"Índice {n}") for n in range(50)]
+        )
+        turmas = Turma.objects.bulk_create([
+            Turma(treinamento=treinamentos[n % 50], nome=f"Turma {n}",
+                  data_inicio=date.today() - timedelta(days=n), data_conclusao=date.today() + timedelta(days=30))
+            for n in range(200)
+        ])
+        Recurso.objects.bulk_create([
+            Recurso(turma=turmas[n % 200] if n % 3 else None, treinamento=None if n % 3 else treinamentos[n % 50],
+                    nome_recurso=f"Recurso {n}", tipo_recurso="video", draft=bool(n % 5 == 0))
+            for n in range(3000)
+        ])
+        users = User.objects.bulk_create([User(username=f"indice_{n}") for n in range(300)])
+        alunos = Aluno.objects.bulk_create([
+            Aluno(user=user, nome=f"Aluno {n}", email=f"indice{n}@example.com") for n, user in enumerate(users)
+        ])
+        Matricula.objects.bulk_create([
+            Matricula(turma=turmas[(n + k) % 100], aluno=aluno) for n, aluno in enumerate(alunos) for k in range(3)
+        ])
+        with connection.cursor() as cursor:
+            cursor.execute('ANALYZE')
+
+        out = StringIO()
+        call_command('verificar_indices', '--strict', stdout=out)
+        self.assertIn('MatriculaViewSet.list ?aluno', out.getvalue())
+        self.assertIn('matricula_aluno_data_idx', out.getvalue())
+
+
+    def test_full_index_scan_is_flagged(self):
+        """Percorrer um índice inteiro (SCAN ... USING INDEX) conta como varredura"""
+        from .management.commands.verificar_indices import INDEX_SCAN, SEQ_SCAN
+
+        plano = 'SCAN core_recurso USING INDEX recurso_created_idx'
+        self.assertEqual(INDEX_SCAN['sqlite'].findall(plano), ['core_recurso'])
+        self.assertEqual(SEQ_SCAN['sqlite'].findall('SCAN core_recurso'), ['core_recurso'])
+        self.assertEqual(INDEX_SCAN['sqlite'].findall('SEARCH core_recurso USING INDEX recurso_turma_acesso_idx'), [])
+
+
+class KeysetPaginationTest(APITestCase):
+    """Testes da paginação por cursor (keyset)"""
+
+    def setUp(self):
+        self.admin_user = User.objects.create_user(username="admin_cursor", password="admin123", is_staff=True)
+        self.client.force_authenticate(user=self.admin_user)
+        for i in range(45):
+            user = User.objects.create(username=f"cursor{i}")
+            # Nomes repetidos exercitam o desempate por id
+            Aluno.objects.create(user=user, nome=f"Aluno {i % 3}", email=f"cursor{i}@example.com")
+
+    def test_page_number_remains_default(self):
+        """Sem parâmetro, a resposta continua no formato de número de página"""
+        response = self.client.get('/api/alunos/')
+        self.assertEqual(response.data['count'], 45)
+        self.assertEqual(len(response.data['results']), 20)
+
+    def test_cursor_walks_all_rows_forward_and_back(self):
+        """O cursor percorre todas as linhas sem repetir e volta à página anterior"""
+        paginas = []
+        url = '/api/alunos/?pagination=cursor'
+        while url:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            self.assertNotIn('count', response.data)
+            paginas.append(response.data)
+            url = response.data['next']
+
+        ids = [aluno['id'] for pagina in paginas for aluno in pagina['results']]
+        self.assertEqual(len(ids), 45)
+        self.assertEqual(len(set(ids)), 45)
+        self.assertEqual(ids, [str(pk) for pk in Aluno.objects.order_by('nome', 'id').values_list('id', flat=True)])
+
+        anterior = self.client.get(paginas[-1]['previous'])
+        self.assertEqual(anterior.data['results'], paginas[-2]['results'])
+
+    def test_invalid_cursor(self):
+        """Cursor malformado retorna 404"""
+        response = self.client.get('/api/alunos/', {'cursor': 'invalido'})
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+
+class FullTextSearchTest(APITestCase):
+    """Testes da busca textual (core.search)"""
+
+    def setUp(self):
+        self.admin_user = User.objects.create_user(username="admin_busca", password="admin123", is_staff=True)
+        self.client.force_authenticate(user=self.admin_user)
+        self.python = Treinamento.objects.create(nome="Introdução à Programação", descricao="Python para iniciantes")
+        self.avancado = Treinamento.objects.create(nome="Python Avançado", descricao="Python, Python e mais Python")
+        Treinamento.objects.create(nome="Java", descricao="Orientação a objetos")
+        self.turma = Turma.objects.create(
+            treinamento=self.python,
+            nome="Turma Noturna",
+            data_inicio=date.today(),
+            data_conclusao=date.today() + timedelta(days=30)
+        )
+
+    def test_search_ignores_accents_and_matches_prefix(self):
+        """A busca ignora acentos e aceita prefixos"""
+        response = self.client.get('/api/treinamentos/', {'search': 'introducao progr'})
+        self.assertEqual([t['nome'] for t in response.data['results']], ["Introdução à Programação"])
+
+    def test_search_is_ranked(self):
+        """Resultados mais relevantes vêm primeiro"""
+        response = self.client.get('/api/treinamentos/', {'search': 'python'})
+        nomes = [t['nome'] for t in response.data['results']]
+        self.assertEqual(nomes, ["Python Avançado", "Introdução à Programação"])
+
+    def test_turma_search_by_treinamento_name_follows_rename(self):
+        """Turmas são encontradas pelo nome do treinamento, inclusive após renomeá-lo"""
+        response = self.client.get('/api/turmas/', {'search': 'programacao'})
+        self.assertEqual([t['nome'] for t in response.data['results']], ["Turma Noturna"])
+
+        self.python.nome = "Lógica de Programação"
+        self.python.save()
+        response = self.client.get('/api/turmas/', {'search': 'logica'})
+        self.assertEqual([t['nome'] for t in response.data['results']], ["Turma Noturna"])
+
+    def test_aluno_search_after_table_rebuild(self):
+        """O índice de alunos continua ativo após migrações que recriam a tabela"""
+        user = User.objects.create(username="busca_aluno")
+        Aluno.objects.create(user=user, nome="Márcia Souza", email="marcia@example.com")
+        response = self.client.get('/api/alunos/', {'search': 'marcia souza'})
+        self.assertEqual([a['nome'] for a in response.data['results']], ["Márcia Souza"])
+
+    def test_search_reflects_updates_and_deletes(self):
+        """Alterações e exclusões são refletidas no índice"""
+        self.avancado.nome = "Kotlin"
+        self.avancado.descricao = ""
+        self.avancado.save()
+        response = self.client.get('/api/treinamentos/', {'search': 'avancado'})
+        self.assertEqual(response.data['results'], [])
+
+        self.python.delete()
+        response = self.client.get('/api/treinamentos/', {'search': 'python'})
+        self.assertEqual(response.data['results'], [])
+
+    def test_search_survives_rowid_renumbering(self):
+        """O índice liga pelo id do model: rowids renumerados (VACUUM) não trocam os resultados"""
+        from django.db import connection
+
+        if connection.vendor != 'sqlite':
+            self.skipTest('FTS5 apenas no SQLite')
+        with connection.cursor() as cursor:
+            # Inverte a ordem física das linhas, como um VACUUM pode fazer
+            cursor.execute('UPDATE core_treinamento SET rowid = 1000 - rowid')
+        response = self.client.get('/api/treinamentos/', {'search': 'java'})
+        self.assertEqual([t['nome'] for t in response.data['results']], ["Java"])
+        response = self.client.get('/api/treinamentos/', {'search': 'python'})
+        self.assertEqual([t['nome'] for t in response.data['results']], ["Python Avançado", "Introdução à Programação"])
+
+
+    def test_search_orders_by_rank(self):
+        """A ordem segue a relevância, inclusive além do limite de ranqueados"""
+        from unittest import mock
+
+        Treinamento.objects.create(nome="Python", descricao="Python e Python")
+        response = self.client.get('/api/treinamentos/', {'search': 'python'})
+        nomes = [t['nome'] for t in response.data['results']]
+        self.assertEqual(nomes, ["Python", "Python Avançado", "Introdução à Programação"])
+
+        # Só o primeiro recebe a relevância; os demais seguem filtrados, no fim
+        with mock.patch('core.search.MAX_RANQUEADOS', 1):
+            response = self.client.get('/api/treinamentos/', {'search': 'pyth'})
+        nomes = [t['nome'] for t in response.json()['results']]
+        self.assertEqual(nomes[0], "Python")
+        self.assertCountEqual(nomes[1:], ["Python Avançado", "Introdução à Programação"])
+
+
+class MatriculaBulkTest(APITestCase):
+    """Testes da matrícula em lote"""
+
+    def setUp(self):
+        self.admin_user = User.objects.create_user(username="admin_bulk", password="admin123", is_staff=True)
+        self.client.force_authenticate(user=self.admin_user)
+        treinamento = Treinamento.objects.create(nome="Lote", nivel="iniciante")
+        self.turma = Turma.objects.create(
+            treinamento=treinamento,
+            nome="Turma Lote",
+            data_inicio=date.today(),
+            data_conclusao=date.today() + timedelta(days=30)
+        )
+        self.alunos = [
+            Aluno.objects.create(user=User.objects.create(username=f"lote{i}"), nome=f"Lote {i}", email=f"lote{i}@example.com")
+            for i in range(50)
+        ]
+        Matricula.objects.create(turma=self.turma, aluno=self.alunos[0])
+
+    def test_bulk_enrollment_report(self):
+        """Cria as matrículas novas e reporta duplicadas e alunos inexistentes"""
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+        import uuid
+
+        inexistente = uuid.uuid4()
+        ids = [str(aluno.id) for aluno in self.alunos] + [str(inexistente), str(self.alunos[1].id)]
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.post(
+                '/api/matriculas/bulk/', {'turma': str(self.turma.id), 'alunos': ids}, format='json'
+            )
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.data['criadas'], 49)
+        self.assertEqual(response.data['ja_matriculados'], 1)
+        self.assertEqual(response.data['alunos_inexistentes'], 1)
+        self.assertEqual(len(response.data['resultados']), 51)
+        self.assertEqual(response.data['resultados'][0]['status'], 'ja_matriculado')
+        self.assertEqual(response.data['resultados'][-1]['status'], 'aluno_inexistente')
+        # Constante: não cresce com o número de alunos do lote
+        self.assertLess(len(queries), 25)
+
+        self.turma.refresh_from_db()
+        self.assertEqual(self.turma.total_alunos, 50)
+        self.assertEqual(Matricula.objects.filter(turma=self.turma).count(), 50)
+
+    def test_bulk_reports_rows_lost_to_concurrent_insert(self):
+        """Matrícula inserida por outra requisição entre a leitura e o INSERT vira ja_matriculado"""
+        from unittest import mock
+        from .models import MatriculaQuerySet
+
+        original = MatriculaQuerySet.bulk_create
+        concorrente = {}
+
+        def bulk_create(queryset, objs, *args, **kwargs):
+            # Outra requisição matricula o aluno 2 antes do INSERT do lote
+            concorrente['pk'] = Matricula.objects.create(turma=self.turma, aluno=self.alunos[2]).pk
+            return original(queryset, objs, *args, **kwargs)
+
+        ids = [str(self.alunos[1].id), str(self.alunos[2].id)]
+        with mock.patch.object(MatriculaQuerySet, 'bulk_create', bulk_create):
+            response = self.client.post(
+                '/api/matriculas/bulk/', {'turma': str(self.turma.id), 'alunos': ids}, format='json'
+            )
+
+        self.assertEqual(response.data['criadas'], 1)
+        self.assertEqual(response.data['ja_matriculados'], 1)
+        criada, perdida = response.data['resultados']
+        self.assertEqual(perdida['status'], 'ja_matriculado')
+        self.assertEqual(perdida['matricula'], concorrente['pk'])
+        self.assertEqual(criada['status'], 'criada')
+        self.assertTrue(Matricula.objects.filter(pk=criada['matricula'], aluno=self.alunos[1]).exists())
+
+    def test_bulk_requires_admin(self):
+        """Apenas administradores podem matricular em lote"""
+        self.client.force_authenticate(user=self.alunos[0].user)
+        response = self.client.post(
+            '/api/matriculas/bulk/', {'turma': str(self.turma.id), 'alunos': [str(self.alunos[1].id)]}, format='json'
+        )
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+
+class ImportacaoAlunosTest(APITestCase):
+    """Testes da importação de alunos por arquivo"""
+
+    def setUp(self):
+        self.admin_user = User.objects.create_user(username="admin_import", password="admin123", is_staff=True)
+        self.client.force_authenticate(user=self.admin_user)
+        existente = User.objects.create(username="maria")
+        Aluno.objects.create(user=existente, nome="Maria", email="maria@example.com")
+        User.objects.create(username="joao")
+
+    def _csv(self, conteudo, nome="alunos.csv"):
+        from django.core.files.uploadedfile import SimpleUploadedFile
+        return SimpleUploadedFile(nome, conteudo.encode('utf-8'), content_type="text/csv")
+
+    def test_import_csv_report(self):
+        """Cria alunos válidos em lote e reporta as linhas com erro"""
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+
+        linhas = ["nome;email;telefone"]
+        linhas += [f"Aluno {i};aluno{i}@example.com;1199999{i:04d}" for i in range(100)]
+        linhas += [
+            "João Silva;joao@example.com;",          # username "joao" já existe
+            "João Souza;joao@outro.com;",            # mesma base no arquivo
+            ";semnome@example.com;",                 # nome ausente
+            "Inválido;nao-e-email;",                 # email inválido
+            "Repetido;aluno1@example.com;",          # repetido no arquivo
+            "Maria Outra;maria@example.com;",        # email já cadastrado
+        ]
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.post(
+                '/api/alunos/importar/', {'arquivo': self._csv("\n".join(linhas))}, format='multipart'
+            )
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.data['total'], 106)
+        self.assertEqual(response.data['criados'], 102)
+        self.assertEqual([erro['linha'] for erro in response.data['erros']], [104, 105, 106, 107])
+        self.assertIn('nome', response.data['erros'][0]['erros'])
+        self.assertIn('email', response.data['erros'][1]['erros'])
+        # Consultas por lote, não por linha
+        self.assertLess(len(queries), 20)
+
+        self.assertEqual(
+            set(User.objects.filter(username__startswith='joao').values_list('username', flat=True)),
+            {'joao', 'joao2', 'joao3'}
+        )
+        aluno = Aluno.objects.get(email='aluno7@example.com')
+        self.assertEqual(aluno.telefone, '11999990007')
+        self.assertFalse(aluno.user.has_usable_password())
+
+    def test_import_xlsx(self):
+        """Planilhas XLSX usam o mesmo fluxo do CSV"""
+        try:
+            from openpyxl import Workbook
+        except ImportError:
+            self.skipTest('openpyxl não instalado')
+        from io import BytesIO
+        from django.core.files.uploadedfile import SimpleUploadedFile
+
+        planilha = Workbook()
+        planilha.active.append(["Nome", "Email", "Telefone"])
+        planilha.active.append(["Planilha", "planilha@example.com", 11988887777])
+        conteudo = BytesIO()
+        planilha.save(conteudo)
+
+        response = self.client.post(
+            '/api/alunos/importar/',
+            {'arquivo': SimpleUploadedFile("alunos.xlsx", conteudo.getvalue())},
+            format='multipart'
+        )
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(Aluno.objects.get(email='planilha@example.com').telefone, '11988887777')
+
+    def test_import_csv_cp1252(self):
+        """CSV exportado pelo Excel em cp1252 é lido; linhas ilegíveis entram no relatório"""
+        from unittest import mock
+        from django.core.files.uploadedfile import SimpleUploadedFile
+
+        conteudo = "nome;email\nJoão Conceição;conceicao@example.com\n".encode('cp1252')
+        response = self.client.post(
+            '/api/alunos/importar/', {'arquivo': SimpleUploadedFile("alunos.csv", conteudo)}, format='multipart'
+        )
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(Aluno.objects.get(email='conceicao@example.com').nome, 'João Conceição')
+
+        # UTF-8 no início e um byte inválido depois da amostra
+        conteudo = "nome;email\nAna;ana@example.com\n".encode('utf-8') + b"Jo\xe3o;joao2@example.com\n"
+        with mock.patch('core.importacao.AMOSTRA_CODIFICACAO', 8):
+            response = self.client.post(
+                '/api/alunos/importar/', {'arquivo': SimpleUploadedFile("alunos.csv", conteudo)}, format='multipart'
+            )
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.data['criados'], 1)
+        self.assertEqual([erro['linha'] for erro in response.data['erros']], [3])
+        self.assertIn('arquivo', response.data['erros'][0]['erros'])
+        self.assertTrue(Aluno.objects.filter(email='ana@example.com').exists())
+        self.assertFalse(Aluno.objects.filter(email='joao2@example.com').exists())
+
+    def test_import_corrupt_xlsx(self):
+        """XLSX corrompido responde 400"""
+        try:
+            import openpyxl  # noqa: F401
+        except ImportError:
+            self.skipTest('openpyxl não instalado')
+        from django.core.files.uploadedfile import SimpleUploadedFile
+
+        response = self.client.post(
+            '/api/alunos/importar/',
+            {'arquivo': SimpleUploadedFile("alunos.xlsx", b"isto nao e um zip")},
+            format='multipart'
+        )
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_import_rejects_unknown_format(self):
+        """Arquivos que não são CSV/XLSX são rejeitados"""
+        response = self.client.post(
+            '/api/alunos/importar/', {'arquivo': self._csv("nome,email", nome="alunos.txt")}, format='multipart'
+        )
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_import_requires_admin(self):
+        """Apenas administradores podem importar alunos"""
+        self.client.force_authenticate(user=User.objects.get(username="maria"))
+        response = self.client.post(
+            '/api/alunos/importar/', {'arquivo': self._csv("nome,email\nA,a@example.com")}, format='multipart'
+        )
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_import_command(self):
+        """Comando de importação processa o arquivo em lotes"""
+        from django.core.management import call_command
+        from io import StringIO
+
+        with tempfile.NamedTemporaryFile('w', suffix='.csv', delete=False, encoding='utf-8') as arquivo:
+            arquivo.write("nome,email\n")
+            arquivo.writelines(f"Cmd {i},cmd{i}@example.com\n" for i in range(25))
+        self.addCleanup(os.remove, arquivo.name)
+
+        saida = StringIO()
+        call_command('importar_alunos', arquivo.name, '--batch-size', '10', stdout=saida)
+        self.assertIn('25 de 25', saida.getvalue())
+        self.assertEqual(Aluno.objects.filter(email__startswith='cmd').count(), 25)
+
+
+class UsernameAllocationTest(APITestCase):
+    """Testes da geração de usernames dos alunos"""
+
+    def setUp(self):
+        self.admin_user = User.objects.create_user(username="admin_usernames", password="admin123", is_staff=True)
+        self.client.force_authenticate(user=self.admin_user)
+
+    def test_homonyms_use_constant_queries(self):
+        """O número de homônimos não altera as consultas da criação"""
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+
+        User.objects.bulk_create(
+            [User(username="joao")] + [User(username=f"joao{i}") for i in range(2, 60)]
+            + [User(username="joaozinho"), User(username="joao007")]
+        )
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.post(
+                '/api/alunos/', {'nome': 'João', 'email': 'joao@example.com'}, format='json'
+            )
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(Aluno.objects.get(email='joao@example.com').user.username, 'joao60')
+        self.assertLessEqual(
+            len([q for q in queries if 'FROM "auth_user"' in q['sql'] and 'SELECT' in q['sql']]), 2
+        )
+
+    def test_concurrent_collision_retries(self):
+        """Username tomado por outra criação entre a alocação e o INSERT é realocado"""
+        from unittest import mock
+        from . import serializers as aluno_serializers
+
+        original = aluno_serializers.alocar_usernames
+        chamadas = []
+
+        def alocar_com_corrida(bases):
+            usernames = original(bases)
+            if not chamadas:
+                # Simula outro processo criando o mesmo username
+                User.objects.create(username=usernames[0])
+            chamadas.append(usernames)
+            return usernames
+
+        with mock.patch.object(aluno_serializers, 'alocar_usernames', side_effect=alocar_com_corrida):
+            response = self.client.post(
+                '/api/alunos/', {'nome': 'Ana', 'email': 'ana@example.com'}, format='json'
+            )
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(chamadas, [['ana'], ['ana2']])
+        self.assertEqual(Aluno.objects.get(email='ana@example.com').user.username, 'ana2')
+
+    def test_update_writes_user_once(self):
+        """Editar o telefone não grava o User; editar o email grava uma vez"""
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+
+        aluno = Aluno.objects.create(
+            user=User.objects.create(username="carla", email="carla@example.com", first_name="Carla"),
+            nome="Carla", email="carla@example.com"
+        )
+        url = f'/api/alunos/{aluno.id}/'
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.patch(url, {'telefone': '11977776666'}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertFalse([q for q in queries if q['sql'].startswith('UPDATE "auth_user"')])
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.patch(url, {'email': 'carla.nova@example.com'}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len([q for q in queries if q['sql'].startswith('UPDATE "auth_user"')]), 1)
+        self.assertEqual(User.objects.get(username="carla").email, 'carla.nova@example.com')
+
+    def test_explicit_username_conflict(self):
+        """Username informado e já existente retorna erro de validação"""
+        User.objects.create(username="ocupado")
+        response = self.client.post(
+            '/api/alunos/',
+            {'nome': 'Bia', 'email': 'bia@example.com', 'username': 'ocupado'},
+            format='json'
+        )
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('username', response.data)
+
+
+class RecursoBulkTest(APITestCase):
+    """Testes da alteração de estado em lote dos recursos"""
+
+    def setUp(self):
+        self.admin_user = User.objects.create_user(username="admin_recursos", password="admin123", is_staff=True)
+        self.client.force_authenticate(user=self.admin_user)
+        self.treinamento = Treinamento.objects.create(nome="Publicação", nivel="iniciante")
+        self.turma = Turma.objects.create(
+            treinamento=self.treinamento,
+            nome="Turma Publicação",
+            data_inicio=date.today() + timedelta(days=1),
+            data_conclusao=date.today() + timedelta(days=30)
+        )
+        Recurso.objects.bulk_create([
+            Recurso(turma=self.turma, nome_recurso=f"Aula {i}", tipo_recurso="video", draft=True)
+            for i in range(300)
+        ])
+        self.previo = Recurso.objects.create(
+            turma=self.turma, nome_recurso="Boas-vindas", tipo_recurso="arquivo_pdf",
+            draft=False, acesso_previo=True
+        )
+
+    def test_publish_turma_with_one_update(self):
+        """Publicar todos os recursos de uma turma é uma requisição com um UPDATE"""
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.post(
+                '/api/recursos/bulk/', {'turma': str(self.turma.id), 'draft': False}, format='json'
+            )
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['atualizados'], 301)
+        self.assertEqual(response.data['rejeitados'], [])
+        self.assertEqual(len([q for q in queries if q['sql'].startswith('UPDATE "core_recurso"')]), 1)
+        self.assertFalse(Recurso.objects.filter(turma=self.turma, draft=True).exists())
+
+    def test_invariant_rejects_per_resource(self):
+        """Voltar para rascunho rejeita os recursos com acesso prévio"""
+        ids = [str(pk) for pk in Recurso.objects.filter(acesso_previo=False).values_list('pk', flat=True)[:5]]
+        ids += [str(self.previo.id), '00000000-0000-0000-0000-000000000000']
+        Recurso.objects.filter(pk__in=ids).update(draft=False)
+
+        response = self.client.post('/api/recursos/bulk/', {'ids': ids, 'draft': True}, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['atualizados'], 5)
+        self.assertEqual(response.data['rejeitados'], [self.previo.id])
+        self.assertEqual([str(pk) for pk in response.data['nao_encontrados']], [ids[-1]])
+        self.previo.refresh_from_db()
+        self.assertFalse(self.previo.draft)
+
+    def test_invalid_combination_and_permissions(self):
+        """Rascunho com acesso prévio é inválido; apenas admin altera em lote"""
+        response = self.client.post(
+            '/api/recursos/bulk/',
+            {'treinamento': str(self.treinamento.id), 'draft': True, 'acesso_previo': True},
+            format='json'
+        )
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+        self.client.force_authenticate(user=User.objects.create(username="aluno_recursos"))
+        response = self.client.post(
+            '/api/recursos/bulk/', {'turma': str(self.turma.id), 'draft': False}, format='json'
+        )
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+
+class DashboardMetricsTest(APITestCase):
+    """Testes das métricas agregadas do dashboard"""
+
+    def setUp(self):
+        from django.core.cache import cache
+        from .stats import recalcular_estatisticas
+        cache.clear()
+        self.admin_user = User.objects.create_user(username="admin_dashboard", password="admin123", is_staff=True)
+        self.client.force_authenticate(user=self.admin_user)
+        treinamento = Treinamento.objects.create(nome="Métricas", nivel="iniciante")
+        self.turmas = [
+            Turma.objects.create(
+                treinamento=treinamento,
+                nome=f"Turma {dias}",
+                data_inicio=date.today() - timedelta(days=dias),
+                data_conclusao=date.today() + timedelta(days=30)
+            )
+            for dias in (10, 200)
+        ]
+        alunos = [
+            Aluno.objects.create(user=User.objects.create(username=f"metrica{i}"), nome=f"Métrica {i}", email=f"metrica{i}@example.com")
+            for i in range(6)
+        ]
+        # Dois alunos cadastrados no mês anterior
+        mes_anterior = timezone.localtime().replace(day=1) - timedelta(days=1)
+        Aluno.objects.filter(pk__in=[alunos[0].pk, alunos[1].pk]).update(created_at=mes_anterior)
+        # UPDATE direto não passa pelos signals: reconstrói as estatísticas diárias
+        recalcular_estatisticas()
+        for aluno in alunos[:4]:
+            Matricula.objects.create(turma=self.turmas[0], aluno=aluno)
+
+    def test_metrics(self):
+        """Totais, métricas do mês e série mensal calculados no banco"""
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get('/api/dashboard/metrics/')
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertLessEqual(len(queries), 10)
+        self.assertEqual(response.data['totais']['alunos'], 6)
+        self.assertEqual(response.data['totais']['matriculas'], 4)
+        self.assertEqual(response.data['alunos_este_mes'], 4)
+        self.assertEqual(response.data['alunos_mes_anterior'], 2)
+        self.assertEqual(response.data['crescimento_alunos'], 100.0)
+        self.assertEqual(response.data['turmas_ativas'], 1)
+        self.assertEqual(response.data['media_alunos_por_turma'], 2.0)
+
+        serie = response.data['serie_mensal']
+        self.assertEqual(len(serie), 12)
+        self.assertEqual(serie[-1]['mes'], timezone.localdate().strftime('%Y-%m'))
+        self.assertEqual([serie[-2]['novos_alunos'], serie[-1]['novos_alunos']], [2, 4])
+        self.assertEqual(serie[-1]['novas_matriculas'], 4)
+
+    def test_metrics_cached(self):
+        """Requisições seguintes dentro do TTL não consultam o banco"""
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+
+        self.client.get('/api/dashboard/metrics/')
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get('/api/dashboard/metrics/')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertFalse([q for q in queries if 'core_' in q['sql']])
+
+    def test_metrics_requires_admin(self):
+        """Apenas administradores veem as métricas"""
+        self.client.force_authenticate(user=User.objects.get(username="metrica0"))
+        response = self.client.get('/api/dashboard/metrics/')
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+
+class DailyStatsTest(APITestCase):
+    """Testes das estatísticas diárias mantidas por signals"""
+
+    def setUp(self):
+        self.treinamento = Treinamento.objects.create(nome="Estatísticas", nivel="iniciante")
+        self.turma = Turma.objects.create(
+            treinamento=self.treinamento,
+            nome="Turma Estatísticas",
+            data_inicio=date.today() - timedelta(days=3),
+            data_conclusao=date.today() + timedelta(days=3)
+        )
+        self.alunos = Aluno.objects.bulk_create([
+            Aluno(user=User.objects.create(username=f"stats{i}"), nome=f"Stats {i}", email=f"stats{i}@example.com")
+            for i in range(3)
+        ])
+        Matricula.objects.create(turma=self.turma, aluno=self.alunos[0])
+        Matricula.objects.bulk_create([Matricula(turma=self.turma, aluno=aluno) for aluno in self.alunos[1:]])
+        self.recurso = Recurso.objects.create(
+            turma=self.turma, nome_recurso="Apostila", tipo_recurso="arquivo_pdf", draft=False
+        )
+        Recurso.objects.create(treinamento=self.treinamento, nome_recurso="Rascunho", tipo_recurso="arquivo_pdf")
+
+    def _linhas(self):
+        from .models import DailyStats
+        return sorted(
+            DailyStats.objects.exclude(
+                novos_alunos=0, novas_matriculas=0, recursos_publicados=0, turmas_ativas=0
+            ).values_list(
+                'dia', 'treinamento_id', 'turma_id',
+                'novos_alunos', 'novas_matriculas', 'recursos_publicados', 'turmas_ativas'
+            ),
+            key=str
+        )
+
+    def test_incremental_matches_rebuild(self):
+        """Os deltas dos signals coincidem com a reconstrução a partir das tabelas"""
+        from django.db.models import Sum
+        from .models import DailyStats
+        from .stats import recalcular_estatisticas
+
+        hoje = DailyStats.objects.get(dia=timezone.localdate(), treinamento_id=None, turma_id=None)
+        self.assertEqual(
+            (hoje.novos_alunos, hoje.novas_matriculas, hoje.recursos_publicados, hoje.turmas_ativas),
+            (3, 3, 1, 1)
+        )
+        self.assertEqual(
+            DailyStats.objects.filter(treinamento_id=self.treinamento.id, turma_id=None)
+            .aggregate(total=Sum('turmas_ativas'))['total'],
+            7
+        )
+
+        # Publicação em lote, alteração de período e remoções
+        Recurso.objects.filter(treinamento=self.treinamento).update(draft=False)
+        self.turma.data_conclusao = date.today() + timedelta(days=10)
+        self.turma.save()
+        Matricula.objects.filter(aluno=self.alunos[2]).delete()
+        self.recurso.delete()
+
+        incremental = self._linhas()
+        recalcular_estatisticas()
+        self.assertEqual(incremental, self._linhas())
+
+    def test_bulk_matriculas_apply_deltas(self):
+        """bulk_create/update de matrículas aplicam deltas sem reconstruir os dias"""
+        from unittest import mock
+        from .stats import recalcular_estatisticas
+
+        outra = Turma.objects.create(
+            treinamento=self.treinamento,
+            nome="Outra Turma",
+            data_inicio=date.today(),
+            data_conclusao=date.today() + timedelta(days=5)
+        )
+        with mock.patch('core.stats.recalcular_estatisticas') as reconstruir:
+            # Uma recusada por ignore_conflicts, uma nova
+            Matricula.objects.bulk_create(
+                [Matricula(turma=self.turma, aluno=self.alunos[0]), Matricula(turma=outra, aluno=self.alunos[1])],
+                ignore_conflicts=True,
+            )
+            Matricula.objects.filter(turma=self.turma, aluno=self.alunos[2]).update(turma=outra)
+            Matricula.objects.filter(turma=self.turma).update(data_matricula=timezone.now() - timedelta(days=2))
+        reconstruir.assert_not_called()
+
+        incremental = self._linhas()
+        recalcular_estatisticas()
+        self.assertEqual(incremental, self._linhas())
+
+    def test_bulk_recursos_and_turmas_apply_deltas(self):
+        """Operações em lote de recursos e turmas mantêm publicados e turmas ativas"""
+        from unittest import mock
+        from .stats import recalcular_estatisticas
+
+        outro = Treinamento.objects.create(nome="Outro Treinamento", nivel="iniciante")
+        with mock.patch('core.stats.recalcular_estatisticas') as reconstruir:
+            recursos = Recurso.objects.bulk_create([
+                Recurso(turma=self.turma, nome_recurso="Lote 1", tipo_recurso="video", draft=False),
+                Recurso(treinamento=self.treinamento, nome_recurso="Lote 2", tipo_recurso="video", draft=True),
+            ])
+            recursos[0].draft, recursos[1].draft = True, False
+            Recurso.objects.bulk_update(recursos, ['draft'])
+
+            turmas = Turma.objects.bulk_create([
+                Turma(treinamento=self.treinamento, nome="Lote A",
+                      data_inicio=date.today(), data_conclusao=date.today() + timedelta(days=3)),
+                Turma(treinamento=self.treinamento, nome="Lote B",
+                      data_inicio=date.today() + timedelta(days=1), data_conclusao=date.today() + timedelta(days=2)),
+            ])
+            Turma.objects.filter(pk=turmas[0].pk).update(data_conclusao=date.today() + timedelta(days=8))
+            Turma.objects.filter(pk=self.turma.pk).update(treinamento=outro)
+            turmas[1].data_inicio = date.today()
+            Turma.objects.bulk_update([turmas[1]], ['data_inicio'])
+        reconstruir.assert_not_called()
+
+        incremental = self._linhas()
+        recalcular_estatisticas()
+        self.assertEqual(incremental, self._linhas())
+
+    def test_rebuild_command(self):
+        """O comando reconstrói linhas apagadas ou corrompidas"""
+        from django.core.management import call_command
+        from io import StringIO
+        from .models import DailyStats
+
+        esperado = self._linhas()
+        DailyStats.objects.update(novos_alunos=0)
+        DailyStats.objects.filter(turma_id__isnull=False).delete()
+
+        saida = StringIO()
+        call_command('recalcular_estatisticas', stdout=saida)
+        self.assertIn('estatísticas diárias', saida.getvalue())
+        self.assertEqual(self._linhas(), esperado)
+
+
+class ResponseCacheTest(APITestCase):
+    """Testes do cache de respostas versionado por model"""
+
+    def setUp(self):
+        from django.core.cache import cache
+        cache.clear()
+        self.admin_user = User.objects.create_user(username="admin_cache", password="admin123", is_staff=True)
+        self.student_user = User.objects.create(username="aluno_cache")
+        self.aluno = Aluno.objects.create(user=self.student_user, nome="Aluno Cache", email="cache@example.com")
+        self.treinamento = Treinamento.objects.create(nome="Cache", nivel="iniciante")
+        self.turma = Turma.objects.create(
+            treinamento=self.treinamento,
+            nome="Turma Cache",
+            data_inicio=date.today() - timedelta(days=1),
+            data_conclusao=date.today() + timedelta(days=30)
+        )
+        self.recurso = Recurso.objects.create(
+            turma=self.turma, nome_recurso="Material", tipo_recurso="arquivo_pdf", draft=True
+        )
+
+    def test_cached_reads_skip_database(self):
+        """A segunda leitura só faz a consulta agregada do ETag"""
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+
+        self.client.force_authenticate(user=self.student_user)
+        primeira = self.client.get('/api/treinamentos/')
+        with CaptureQueriesContext(connection) as queries:
+            segunda = self.client.get('/api/treinamentos/')
+
+        self.assertEqual(segunda.status_code, status.HTTP_200_OK)
+        self.assertEqual(segunda.content, primeira.content)
+        self.assertEqual(len([q for q in queries if 'core_' in q['sql']]), 1)
+
+    def test_writes_invalidate(self):
+        """Edições, matrículas e publicação em lote nunca servem dados antigos"""
+        import json
+
+        self.client.force_authenticate(user=self.admin_user)
+        self.client.get('/api/treinamentos/')
+        self.client.patch(f'/api/treinamentos/{self.treinamento.id}/', {'nome': 'Cache Renomeado'}, format='json')
+        response = self.client.get('/api/treinamentos/')
+        self.assertEqual(json.loads(response.content)['results'][0]['nome'], 'Cache Renomeado')
+
+        # total_alunos da turma muda com a matrícula (UPDATE via F())
+        self.client.get(f'/api/turmas/{self.turma.id}/')
+        Matricula.objects.create(turma=self.turma, aluno=self.aluno)
+        response = self.client.get(f'/api/turmas/{self.turma.id}/')
+        self.assertEqual(json.loads(response.content)['total_alunos'], 1)
+
+        # QuerySet.update não dispara signals
+        self.client.force_authenticate(user=self.student_user)
+        url = f'/api/turmas/{self.turma.id}/recursos/'
+        self.assertEqual(json.loads(self.client.get(url).content), [])
+        Recurso.objects.filter(pk=self.recurso.pk).update(draft=False)
+        self.assertEqual(len(json.loads(self.client.get(url).content)), 1)
+
+    def test_roles_do_not_share_entries(self):
+        """Admin e aluno têm entradas separadas para a mesma URL"""
+        import json
+
+        url = f'/api/turmas/{self.turma.id}/recursos/'
+        self.client.force_authenticate(user=self.admin_user)
+        self.assertEqual(len(json.loads(self.client.get(url).content)), 1)
+        self.client.force_authenticate(user=self.student_user)
+        self.assertEqual(json.loads(self.client.get(url).content), [])
+
+
+class ConditionalGetTest(APITestCase):
+    """Testes de ETag e respostas 304"""
+
+    def setUp(self):
+        from django.core.cache import cache
+        cache.clear()
+        self.admin_user = User.objects.create(username="admin_etag", is_staff=True)
+        self.treinamento = Treinamento.objects.create(nome="ETag", nivel="iniciante")
+        self.turma = Turma.objects.create(
+            treinamento=self.treinamento,
+            nome="Turma ETag",
+            data_inicio=date.today(),
+            data_conclusao=date.today() + timedelta(days=30)
+        )
+        self.client.force_authenticate(user=self.admin_user)
+
+    def test_list_not_modified(self):
+        """Listagem inalterada responde 304 sem corpo, com uma consulta"""
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+
+        primeira = self.client.get('/api/turmas/')
+        self.assertIn('ETag', primeira)
+        self.assertNotIn('Last-Modified', primeira)
+        self.assertIn('no-cache', primeira['Cache-Control'])
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get('/api/turmas/', HTTP_IF_NONE_MATCH=primeira['ETag'])
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(response.content, b'')
+        self.assertEqual(response['ETag'], primeira['ETag'])
+        self.assertEqual(len(queries), 1)
+
+        # If-Modified-Since é ignorado na listagem: exclusões não mudam Max(updated_at)
+        from django.utils.http import http_date
+        futuro = http_date((timezone.now() + timedelta(days=1)).timestamp())
+        Turma.objects.create(
+            treinamento=self.treinamento, nome="Apagada",
+            data_inicio=date.today(), data_conclusao=date.today()
+        ).delete()
+        response = self.client.get('/api/turmas/', HTTP_IF_MODIFIED_SINCE=futuro)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        # Outros query params (página, filtros) têm outro ETag
+        response = self.client.get('/api/turmas/?page=1', HTTP_IF_NONE_MATCH=primeira['ETag'])
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_changes_produce_new_etag(self):
+        """Edições, exclusões e contadores mudam o ETag"""
+        etag = self.client.get('/api/turmas/')['ETag']
+        Turma.objects.create(
+            treinamento=self.treinamento, nome="Outra",
+            data_inicio=date.today(), data_conclusao=date.today()
+        )
+        response = self.client.get('/api/turmas/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        # total_alunos muda via F() sem alterar o updated_at da turma
+        url = f'/api/turmas/{self.turma.id}/'
+        etag = self.client.get(url)['ETag']
+        aluno = Aluno.objects.create(
+            user=User.objects.create(username="aluno_etag_1"), nome="Aluno ETag", email="etag@example.com"
+        )
+        Matricula.objects.create(turma=self.turma, aluno=aluno)
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['total_alunos'], 1)
+
+    def test_detail_not_modified(self):
+        """Detalhe inalterado responde 304; outro usuário não reaproveita o ETag"""
+        url = f'/api/treinamentos/{self.treinamento.id}/'
+        primeira = self.client.get(url)
+        etag = primeira['ETag']
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=f'W/{etag}').status_code, 304)
+        self.assertNotIn('Last-Modified', primeira)
+
+        outro = User.objects.create(username="aluno_etag")
+        self.client.force_authenticate(user=outro)
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+
+    def test_detail_ignores_if_modified_since_after_related_change(self):
+        """Renomear o treinamento muda o detalhe da turma sem mudar seu updated_at"""
+        from django.utils.http import http_date
+
+        url = f'/api/turmas/{self.turma.id}/'
+        self.assertNotIn('Last-Modified', self.client.get(url))
+        futuro = http_date((timezone.now() + timedelta(days=1)).timestamp())
+        self.treinamento.nome = "ETag Renomeado"
+        self.treinamento.save()
+
+        response = self.client.get(url, HTTP_IF_MODIFIED_SINCE=futuro)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['treinamento_nome'], "ETag Renomeado")
+
+
+class AccessCacheTest(TestCase):
+    """Testes do cache de IDs de recursos acessíveis por aluno"""
+
+    def setUp(self):
+        from django.core.cache import cache
+        cache.clear()
+        self.aluno = Aluno.objects.create(
+            user=User.objects.create(username="aluno_acesso"), nome="Aluno Acesso", email="acesso@example.com"
+        )
+        self.treinamento = Treinamento.objects.create(nome="Acesso", nivel="iniciante")
+        self.turma = Turma.objects.create(
+            treinamento=self.treinamento,
+            nome="Turma Acesso",
+            data_inicio=date.today() - timedelta(days=1),
+            data_conclusao=date.today() + timedelta(days=30)
+        )
+        self.futura = Turma.objects.create(
+            treinamento=self.treinamento,
+            nome="Turma Futura",
+            data_inicio=date.today() + timedelta(days=2),
+            data_conclusao=date.today() + timedelta(days=30)
+        )
+        self.recurso = Recurso.objects.create(
+            turma=self.turma, nome_recurso="Aula", tipo_recurso="video", draft=False
+        )
+        self.recurso_futuro = Recurso.objects.create(
+            turma=self.futura, nome_recurso="Aula Futura", tipo_recurso="video", draft=False
+        )
+
+    def test_hits_database_only_on_miss(self):
+        """A segunda leitura vem do cache e bate com a regra"""
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+        from .access import ids_acessiveis, recursos_disponiveis
+
+        Matricula.objects.create(turma=self.turma, aluno=self.aluno)
+        ids = ids_acessiveis(self.aluno)
+        self.assertEqual(set(ids), set(recursos_disponiveis(self.aluno).values_list('pk', flat=True)))
+        with CaptureQueriesContext(connection) as queries:
+            self.assertEqual(ids_acessiveis(self.aluno), ids)
+        self.assertEqual(len(queries), 0)
+
+    def test_today_follows_local_time_zone(self):
+        """Às 22h em São Paulo (já amanhã em UTC) a turma de amanhã ainda não começou"""
+        from datetime import datetime
+        from unittest import mock
+        from zoneinfo import ZoneInfo
+        from django.test.utils import override_settings
+        from .access import recursos_disponiveis
+
+        amanha = Turma.objects.create(
+            treinamento=self.treinamento, nome="Turma Amanhã",
+            data_inicio=date(2026, 3, 11), data_conclusao=date(2026, 4, 11)
+        )
+        Recurso.objects.create(turma=amanha, nome_recurso="Aula Amanhã", tipo_recurso="video", draft=False)
+        Matricula.objects.create(turma=amanha, aluno=self.aluno)
+
+        # timezone.now() devolve UTC: 01h do dia 11
+        agora = datetime(2026, 3, 10, 22, 0, tzinfo=ZoneInfo('America/Sao_Paulo')).astimezone(ZoneInfo('UTC'))
+        with override_settings(TIME_ZONE='America/Sao_Paulo'), \
+                mock.patch('django.utils.timezone.now', return_value=agora):
+            nomes = list(recursos_disponiveis(self.aluno).values_list('nome_recurso', flat=True))
+        self.assertNotIn("Aula Amanhã", nomes)
+
+    def test_invalidated_by_writes(self):
+        """Matrículas, recursos e turmas alterados invalidam o cache"""
+        from .access import ids_acessiveis
+
+        self.assertEqual(ids_acessiveis(self.aluno), [])
+        Matricula.objects.create(turma=self.turma, aluno=self.aluno)
+        self.assertEqual(ids_acessiveis(self.aluno), [self.recurso.pk])
+
+        Recurso.objects.filter(pk=self.recurso.pk).update(draft=True)
+        self.assertEqual(ids_acessiveis(self.aluno), [])
+        Recurso.objects.filter(pk=self.recurso.pk).update(draft=False)
+
+        Turma.objects.filter(pk=self.turma.pk).update(data_inicio=date.today() + timedelta(days=5))
+        self.assertEqual(ids_acessiveis(self.aluno), [])
+
+    def test_invalidation_is_per_student(self):
+        """Escritas em outra turma não descartam o cache deste aluno"""
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+        from .access import ids_acessiveis
+
+        Matricula.objects.create(turma=self.turma, aluno=self.aluno)
+        ids = ids_acessiveis(self.aluno)
+
+        outra = Turma.objects.create(
+            treinamento=Treinamento.objects.create(nome="Outro", nivel="iniciante"),
+            nome="Outra Turma",
+            data_inicio=date.today(),
+            data_conclusao=date.today() + timedelta(days=30)
+        )
+        outro_aluno = Aluno.objects.create(
+            user=User.objects.create(username="outro_acesso"), nome="Outro Acesso", email="outro@example.com"
+        )
+        Matricula.objects.create(turma=outra, aluno=outro_aluno)
+        Recurso.objects.create(turma=outra, nome_recurso="Outra Aula", tipo_recurso="video", draft=False)
+        Turma.objects.filter(pk=outra.pk).update(data_inicio=date.today() - timedelta(days=1))
+        with CaptureQueriesContext(connection) as queries:
+            self.assertEqual(ids_acessiveis(self.aluno), ids)
+        self.assertEqual(len(queries), 0)
+
+        # Recurso do treinamento invalida os alunos de qualquer turma dele
+        novo = Recurso.objects.create(
+            treinamento=self.treinamento, nome_recurso="Geral", tipo_recurso="video", draft=False
+        )
+        self.assertIn(novo.pk, ids_acessiveis(self.aluno))
+
+    def test_large_id_lists_fall_back_to_sql(self):
+        """Acima de ACESSO_CACHE_MAX_IDS a regra volta a ser avaliada no banco"""
+        from .access import anotar_pode_acessar_em_cache, recursos_disponiveis_em_cache
+
+        Matricula.objects.create(turma=self.turma, aluno=self.aluno)
+        for limite in (500, 0):
+            with self.settings(ACESSO_CACHE_MAX_IDS=limite):
+                queryset = anotar_pode_acessar_em_cache(Recurso.objects.all(), self.aluno)
+                self.assertEqual(
+                    dict(queryset.values_list('pk', 'pode_acessar')),
+                    {self.recurso.pk: True, self.recurso_futuro.pk: False}
+                )
+                self.assertEqual(
+                    list(recursos_disponiveis_em_cache(self.aluno).values_list('pk', flat=True)),
+                    [self.recurso.pk]
+                )
+                sql = str(queryset.query)
+                self.assertEqual(str(self.recurso.pk).replace('-', '') in sql, bool(limite))
+
+    def test_expires_when_next_turma_starts(self):
+        """A entrada expira no início da próxima turma do aluno"""
+        from .access import _ttl_acesso
+        from .stats import inicio_do_dia
+
+        Matricula.objects.create(turma=self.futura, aluno=self.aluno)
+        with self.settings(ACESSO_CACHE_TTL=30 * 86400):
+            ttl = _ttl_acesso(self.aluno, date.today())
+        restante = (inicio_do_dia(self.futura.data_inicio) - timezone.now()).total_seconds()
+        self.assertLessEqual(abs(ttl - restante), 1)
+
+
+class WarmupTest(TestCase):
+    """Testes do aquecimento de cache antes do início das turmas"""
+
+    def setUp(self):
+        from django.core.cache import cache
+        cache.clear()
+        self.amanha = date.today() + timedelta(days=1)
+        treinamento = Treinamento.objects.create(nome="Aquecimento", nivel="iniciante")
+        self.turma = Turma.objects.create(
+            treinamento=treinamento,
+            nome="Turma Amanhã",
+            data_inicio=self.amanha,
+            data_conclusao=self.amanha + timedelta(days=30)
+        )
+        self.recurso = Recurso.objects.create(
+            turma=self.turma, nome_recurso="Aula 1", tipo_recurso="video", draft=False
+        )
+        self.alunos = []
+        for n in range(2):
+            aluno = Aluno.objects.create(
+                user=User.objects.create(username=f"aluno_warmup_{n}"),
+                nome=f"Aluno Warmup {n}",
+                email=f"warmup{n}@example.com"
+            )
+            Matricula.objects.create(turma=self.turma, aluno=aluno)
+            self.alunos.append(aluno)
+
+    def test_warms_students_of_starting_turmas(self):
+        """Perfil, turmas e recursos do dia de início já estão no cache"""
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+        from .access import ids_acessiveis
+        from .stats import inicio_do_dia
+        from .warmup import aquecer, dados_aluno, turmas_do_aluno
+
+        agora = inicio_do_dia(self.amanha) - timedelta(minutes=10)
+        self.assertEqual(aquecer(5, agora)['alunos'], 0)
+
+        relatorio = aquecer(30, agora)
+        self.assertEqual(relatorio['alunos'], 2)
+        self.assertEqual(relatorio['turmas'][0]['turma'], str(self.turma.pk))
+
+        aluno = self.alunos[0]
+        with CaptureQueriesContext(connection) as queries:
+            self.assertEqual(dados_aluno(aluno)['nome'], "Aluno Warmup 0")
+            self.assertEqual(turmas_do_aluno(aluno)[0]['nome'], "Turma Amanhã")
+            self.assertEqual(ids_acessiveis(aluno, self.amanha), [self.recurso.pk])
+        self.assertEqual(len(queries), 0)
+
+    def test_warm_entries_survive_unrelated_writes(self):
+        """Escritas de outros alunos mantêm o cache; as da turma do aluno o invalidam"""
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+        from .stats import inicio_do_dia
+        from .warmup import aquecer, dados_aluno, turmas_do_aluno
+
+        aquecer(30, inicio_do_dia(self.amanha) - timedelta(minutes=10))
+        aluno = self.alunos[0]
+
+        outro = Aluno.objects.create(
+            user=User.objects.create(username="aluno_warmup_outro"), nome="Outro", email="outro@example.com"
+        )
+        outra = Turma.objects.create(
+            treinamento=Treinamento.objects.create(nome="Outro", nivel="iniciante"),
+            nome="Outra Turma", data_inicio=self.amanha, data_conclusao=self.amanha + timedelta(days=5)
+        )
+        Matricula.objects.create(turma=outra, aluno=outro)
+        outra.nome = "Outra Turma Renomeada"
+        outra.save()
+        with CaptureQueriesContext(connection) as queries:
+            dados_aluno(aluno)
+            turmas_do_aluno(aluno)
+        self.assertEqual(len(queries), 0)
+
+        self.turma.nome = "Turma Renomeada"
+        self.turma.save()
+        self.assertEqual(turmas_do_aluno(aluno)[0]['nome'], "Turma Renomeada")
+        Aluno.objects.filter(pk=aluno.pk).update(telefone="11999990000")
+        aluno.refresh_from_db()
+        self.assertEqual(dados_aluno(aluno)['telefone'], "11999990000")
+
+    def test_command_reports_timing(self):
+        """O comando mostra o tempo por turma e o total"""
+        from io import StringIO
+        from django.core.management import call_command
+
+        saida = StringIO()
+        call_command('aquecer_cache', minutos=48 * 60, stdout=saida)
+        self.assertIn("Turma Amanhã", saida.getvalue())
+        self.assertIn("2 aluno(s) aquecido(s)", saida.getvalue())
+
+
+class DuasCamadasCacheTest(TestCase):
+    """Testes do cache em duas camadas (LRU local na frente do compartilhado)"""
+
+    def setUp(self):
+        from django.core.cache import caches
+        from django.test.utils import override_settings
+        from .cache_backends import DuasCamadasCache
+
+        self.override = override_settings(CACHES={
+            'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'l1-teste-default'},
+            'compartilhado': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'l1-teste'},
+        })
+        self.override.enable()
+        self.addCleanup(self.override.disable)
+        caches['compartilhado'].clear()
+        opcoes = {'OPTIONS': {'L2': 'compartilhado', 'L1_MAX_ENTRIES': 2, 'L1_TTL': 60, 'SYNC_INTERVAL': 0}}
+        # Dois "workers" com L1 própria e a mesma L2
+        self.worker_a = DuasCamadasCache(None, opcoes)
+        self.worker_b = DuasCamadasCache(None, opcoes)
+
+    def test_hits_and_misses_per_tier(self):
+        """A segunda leitura vem da L1; os contadores separam as camadas"""
+        self.assertIsNone(self.worker_a.get('nome'))
+        self.worker_b.set('nome', 'Python')
+        self.assertEqual(self.worker_a.get('nome'), 'Python')
+        self.assertEqual(self.worker_a.get('nome'), 'Python')
+        self.assertEqual(self.worker_a.estatisticas(), {
+            'l1': {'acertos': 1, 'falhas': 2, 'entradas': 1},
+            'l2': {'acertos': 1, 'falhas': 1},
+        })
+
+    def test_lru_bound(self):
+        """A L1 guarda no máximo L1_MAX_ENTRIES, descartando a menos usada"""
+        for chave in ('a', 'b', 'c'):
+            self.worker_a.set(chave, chave)
+        self.assertEqual(self.worker_a.estatisticas()['l1']['entradas'], 2)
+        self.assertEqual(self.worker_a.get('a'), 'a')
+
+    def test_cross_worker_invalidation(self):
+        """Escritas de um worker descartam a L1 dos outros"""
+        self.worker_a.set('perfil', 'admin')
+        self.assertEqual(self.worker_b.get('perfil'), 'admin')
+
+        self.worker_a.set('perfil', 'aluno')
+        self.assertEqual(self.worker_b.get('perfil'), 'aluno')
+
+        self.worker_b.get_many(['versao'])
+        self.worker_a.set('versao', 1)
+        self.worker_a.incr('versao')
+        self.assertEqual(self.worker_b.get_many(['versao']), {'versao': 2})
+
+        self.worker_a.delete('perfil')
+        self.assertIsNone(self.worker_b.get('perfil'))
+
+        self.worker_b.set('x', 1)
+        self.worker_a.clear()
+        self.assertIsNone(self.worker_b.get('x'))
+
+
+    def test_only_overwrites_are_published(self):
+        """Chaves novas não entram no log de invalidação; sobrescritas entram"""
+        from django.core.cache import caches
+        from .cache_backends import CHAVE_SEQUENCIA
+
+        l2 = caches['compartilhado']
+        self.worker_a.set('novo', 1)
+        self.worker_a.add('outro', 1)
+        self.assertIsNone(l2.get(CHAVE_SEQUENCIA))
+
+        self.assertEqual(self.worker_b.get('novo'), 1)
+        self.worker_a.set('novo', 2)
+        self.assertEqual(l2.get(CHAVE_SEQUENCIA), 1)
+        self.assertEqual(self.worker_b.get('novo'), 2)
+
+    def test_l1_returns_copies(self):
+        """Alterar o valor lido não altera o que a L1 entrega aos próximos leitores"""
+        self.worker_a.set('lista', [1, 2])
+        lida = self.worker_a.get('lista')
+        lida.append(3)
+        self.assertEqual(self.worker_a.get('lista'), [1, 2])
+
+    def test_generation_keys_bypass_l1(self):
+        """Gerações (versao:*) são lidas sempre da L2 e não publicam invalidações"""
+        from django.core.cache import caches
+        from .cache_backends import CHAVE_SEQUENCIA
+
+        self.worker_a.set('versao:core.turma', 1)
+        self.assertEqual(self.worker_b.get('versao:core.turma'), 1)
+        self.worker_a.incr('versao:core.turma')
+        self.assertEqual(self.worker_b.get_many(['versao:core.turma']), {'versao:core.turma': 2})
+        self.assertEqual(self.worker_b.estatisticas()['l1']['entradas'], 0)
+        self.assertIsNone(caches['compartilhado'].get(CHAVE_SEQUENCIA))
+
+class FastReadTest(APITestCase):
+    """Testes da leitura rápida das listagens (core.fast_read)"""
+
+    def setUp(self):
+        self.admin_user = User.objects.create(username="admin_fast", is_staff=True)
+        self.aluno = Aluno.objects.create(
+            user=User.objects.create(username="aluno_fast"), nome="Aluno Fast", email="fast@example.com"
+        )
+        self.treinamento = Treinamento.objects.create(nome="Python Rápido", nivel="avancado")
+        Treinamento.objects.create(nome="Sem descrição", descricao=None)
+        self.turma = Turma.objects.create(
+            treinamento=self.treinamento,
+            nome="Turma Rápida",
+            data_inicio=date.today() - timedelta(days=1),
+            data_conclusao=date.today() + timedelta(days=30),
+            link_acesso="https://example.com/aula"
+        )
+        Matricula.objects.create(turma=self.turma, aluno=self.aluno)
+        Recurso.objects.create(
+            turma=self.turma, nome_recurso="Aula 1", tipo_recurso="arquivo_pdf",
+            arquivo="recursos/aula ção 1.pdf", draft=False
+        )
+        Recurso.objects.create(
+            treinamento=self.treinamento, nome_recurso="Apostila", tipo_recurso="arquivo_pdf",
+            arquivo="recursos/apostila.pdf", draft=False, acesso_previo=True
+        )
+        Recurso.objects.create(
+            turma=self.turma, nome_recurso="Rascunho", tipo_recurso="video", arquivo="", draft=True
+        )
+
+    def _comparar(self, user, url):
+        from django.core.cache import cache
+
+        self.client.force_authenticate(user=user)
+        respostas = []
+        for rapida in (False, True):
+            cache.clear()
+            with self.settings(API_LEITURA_RAPIDA=rapida, API_CACHE_TTL=0):
+                response = self.client.get(url)
+            self.assertEqual(response.status_code, status.HTTP_200_OK, url)
+            respostas.append(response.content)
+        self.assertEqual(respostas[0], respostas[1], url)
+
+    def test_byte_identical_output(self):
+        """A saída é idêntica à dos serializers em todas as listagens"""
+        urls = [
+            '/api/treinamentos/', '/api/treinamentos/?search=python', '/api/turmas/',
+            f'/api/turmas/?treinamento={self.treinamento.id}', '/api/recursos/',
+            '/api/recursos/?pagination=cursor&page_size=1', '/api/matriculas/',
+        ]
+        for url in urls:
+            self._comparar(self.admin_user, url)
+        self._comparar(self.aluno.user, '/api/recursos/')
+
+    def test_serializar_matches_serializer(self):
+        """serializar() gera a mesma lista que o serializer com many=True"""
+        from rest_framework.request import Request
+        from rest_framework.test import APIRequestFactory
+        from .fast_read import serializar
+        from .serializers import RecursoSerializer
+
+        request = Request(APIRequestFactory().get('/api/recursos/'))
+        recursos = Recurso.objects.order_by('nome_recurso')
+        esperado = RecursoSerializer(recursos, many=True, context={'request': request}).data
+        self.assertEqual(serializar(RecursoSerializer, recursos, request), esperado)
+        self.assertEqual(
+            serializar(RecursoSerializer, recursos),
+            RecursoSerializer(recursos, many=True).data
+        )
+
+    def test_readers_match_serializers_on_every_viewset(self):
+        """Em cada ViewSet com leitor, montar() cobre e reproduz todos os campos do serializer"""
+        from rest_framework.test import APIRequestFactory, force_authenticate
+        from .fast_read import LEITORES, LeituraRapidaMixin
+        from . import views
+
+        viewsets = [
+            classe for classe in vars(views).values()
+            if isinstance(classe, type) and issubclass(classe, LeituraRapidaMixin) and classe is not LeituraRapidaMixin
+        ]
+        self.assertEqual(len(viewsets), 4)
+        Matricula.objects.create(turma=self.turma, aluno=Aluno.objects.create(
+            user=User.objects.create(username="aluno_fast_2"), nome="Outro Fast", email="fast2@example.com"
+        ))
+
+        for viewset in viewsets:
+            for user in (self.admin_user, self.aluno.user):
+                requisicao = APIRequestFactory().get('/api/')
+                force_authenticate(requisicao, user=user)
+                view = viewset(action_map={'get': 'list'}, format_kwarg=None, kwargs={}, args=())
+                view.request = view.initialize_request(requisicao)
+                serializer_class = view.get_serializer_class()
+                queryset = view.filter_queryset(view.get_queryset())
+
+                leitor = LEITORES[serializer_class](view.request)
+                legiveis = [nome for nome, campo in serializer_class().fields.items() if not campo.write_only]
+                self.assertEqual([nome for nome, _ in leitor.extratores], legiveis, serializer_class)
+
+                esperado = serializer_class(queryset, many=True, context=view.get_serializer_context()).data
+                self.assertTrue(esperado, serializer_class)
+                self.assertEqual(
+                    [list(item.items()) for item in leitor.montar(queryset.values(*leitor.colunas))],
+                    [list(item.items()) for item in esperado],
+                    serializer_class
+                )
+
+    def test_benchmark_command(self):
+        """O benchmark compara os dois caminhos e confere a saída"""
+        from io import StringIO
+        from django.core.management import call_command
+
+        saida = StringIO()
+        call_command('benchmark_serializacao', linhas=20, repeticoes=1, stdout=saida)
+        self.assertEqual(saida.getvalue().count('saída idêntica'), 4)
+        self.assertEqual(Treinamento.objects.count(), 2)
+
+
+class RenderersTest(APITestCase):
+    """Testes do renderer/parser JSON (orjson) e do MessagePack"""
+
+    def test_same_output_as_drf(self):
+        """O JSON é idêntico ao do renderer do DRF, inclusive para tipos não nativos"""
+        import uuid
+        from datetime import datetime, time as hora
+        from decimal import Decimal
+        from django.utils.translation import gettext_lazy
+        from rest_framework.renderers import JSONRenderer as DRFJSONRenderer
+        from .renderers import JSONRenderer
+
+        dados = {
+            'id': uuid.uuid4(),
+            'criado': timezone.now(),
+            'ingenuo': datetime(2024, 1, 2, 3, 4, 5, 678901),
+            'dia': date(2024, 1, 2),
+            'hora': hora(10, 30, 15, 123456),
+            'valor': Decimal('10.50'),
+            'texto': 'Introdução\u2028linha',
+            'lazy': gettext_lazy('Nome'),
+            1: [None, True, 2**70],
+        }
+        for payload in (dados, {k: v for k, v in dados.items() if k != 1}, None):
+            self.assertEqual(JSONRenderer().render(payload), DRFJSONRenderer().render(payload))
+        self.assertEqual(
+            JSONRenderer().render({'a': 1}, 'application/json; indent=2'),
+            DRFJSONRenderer().render({'a': 1}, 'application/json; indent=2'),
+        )
+
+    def test_parser(self):
+        """O parser aceita JSON UTF-8 e rejeita corpo inválido com 400"""
+        user = User.objects.create(username="admin_parser", is_staff=True)
+        self.client.force_authenticate(user=user)
+        response = self.client.post(
+            '/api/treinamentos/', '{"nome": "Introdução", "nivel": "iniciante"}'.encode(),
+            content_type='application/json'
+        )
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.data['nome'], 'Introdução')
+
+        response = self.client.post('/api/treinamentos/', b'{"nome": NaN}', content_type='application/json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_msgpack_negotiation(self):
+        """Accept: application/msgpack devolve o mesmo conteúdo do JSON"""
+        try:
+            import msgpack
+        except ImportError:
+            self.skipTest('msgpack não instalado')
+        import json
+
+        user = User.objects.create(username="admin_msgpack", is_staff=True)
+        Treinamento.objects.create(nome="MessagePack", nivel="iniciante")
+        self.client.force_authenticate(user=user)
+        em_json = self.client.get('/api/treinamentos/')
+        em_msgpack = self.client.get('/api/treinamentos/', HTTP_ACCEPT='application/msgpack')
+        self.assertEqual(em_msgpack['Content-Type'], 'application/msgpack')
+        self.assertEqual(msgpack.unpackb(em_msgpack.content), json.loads(em_json.content))
+
+    def test_benchmark_command(self):
+        """O benchmark mede os formatos disponíveis e desfaz os dados"""
+        from io import StringIO
+        from django.core.management import call_command
+
+        saida = StringIO()
+        call_command('benchmark_renderers', linhas=10, repeticoes=1, stdout=saida)
+        self.assertIn('JSON (DRF)', saida.getvalue())
+        self.assertFalse(Recurso.objects.exists())
+
+
+class SparseFieldsetsTest(APITestCase):
+    """Testes de ?fields=/?omit= (core.fieldsets)"""
+
+    def setUp(self):
+        from django.core.cache import cache
+
+        cache.clear()
+        self.admin_user = User.objects.create(username="admin_campos", is_staff=True)
+        self.client.force_authenticate(user=self.admin_user)
+        self.treinamento = Treinamento.objects.create(nome="Django", descricao="Descrição longa")
+        self.turma = Turma.objects.create(
+            treinamento=self.treinamento,
+            nome="Turma Campos",
+            data_inicio=date.today() - timedelta(days=1),
+            data_conclusao=date.today() + timedelta(days=30)
+        )
+        for n in range(3):
+            Recurso.objects.create(
+                turma=self.turma, nome_recurso=f"Recurso {n}", descricao_recurso="Texto",
+                tipo_recurso="arquivo_pdf", arquivo=f"recursos/r{n}.pdf", draft=False
+            )
+
+    def _get(self, url, rapida=True):
+        from django.core.cache import cache
+
+        cache.clear()
+        with self.settings(API_LEITURA_RAPIDA=rapida, API_CACHE_TTL=0):
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK, url)
+        return response
+
+    def test_fields_and_omit_on_list(self):
+        """fields e omit reduzem as chaves nos dois caminhos de listagem"""
+        for rapida in (False, True):
+            dados = self._get('/api/recursos/?fields=id,nome_recurso,turma_nome', rapida).data['results']
+            self.assertEqual(len(dados), 3)
+            self.assertEqual(set(dados[0]), {'id', 'nome_recurso', 'turma_nome'})
+            self.assertEqual(dados[0]['turma_nome'], "Turma Campos")
+
+            dados = self._get('/api/treinamentos/?omit=descricao,created_at', rapida).data['results']
+            self.assertNotIn('descricao', dados[0])
+            self.assertNotIn('created_at', dados[0])
+            self.assertIn('nome', dados[0])
+
+        # Mesma saída nos dois caminhos
+        url = '/api/turmas/?fields=nome,treinamento_nome,updated_at'
+        self.assertEqual(self._get(url, False).content, self._get(url, True).content)
+
+    def test_fields_on_retrieve(self):
+        """retrieve respeita fields; escritas continuam com todos os campos"""
+        response = self._get(f'/api/treinamentos/{self.treinamento.id}/?fields=nome')
+        self.assertEqual(response.data, {'nome': "Django"})
+
+        response = self.client.patch(
+            f'/api/treinamentos/{self.treinamento.id}/?fields=nome', {'nivel': 'avancado'}, format='json'
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertIn('nivel', response.data)
+
+    def test_queryset_pushdown(self):
+        """Colunas e JOINs não pedidos ficam fora do SQL"""
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+
+        for rapida in (False, True):
+            with CaptureQueriesContext(connection) as consultas:
+                self._get('/api/recursos/?fields=id,nome_recurso', rapida)
+            sql = next(q['sql'] for q in consultas.captured_queries if 'nome_recurso' in q['sql'])
+            self.assertNotIn('descricao_recurso', sql)
+            self.assertNotIn('JOIN', sql)
+
+        # Relações pedidas continuam no JOIN, sem consultas por linha
+        with CaptureQueriesContext(connection) as consultas:
+            dados = self._get('/api/recursos/?fields=nome_recurso,turma_nome', False).data['results']
+        self.assertEqual({item['turma_nome'] for item in dados}, {"Turma Campos"})
+        self.assertEqual(len([q for q in consultas.captured_queries if 'core_turma' in q['sql']]), 1)
+
+    def test_keyset_pagination_with_fields(self):
+        """A paginação por cursor funciona com colunas reduzidas"""
+        vistos = []
+        url = '/api/recursos/?pagination=cursor&page_size=2&fields=nome_recurso'
+        while url:
+            dados = self._get(url).data
+            vistos.extend(item['nome_recurso'] for item in dados['results'])
+            url = dados['next']
+        self.assertEqual(sorted(vistos), ["Recurso 0", "Recurso 1", "Recurso 2"])
+
+
+class RecursoDownloadTest(APITestCase):
+    """Testes do download protegido de recursos (core.downloads)"""
+
+    def setUp(self):
+        from django.core.cache import cache
+        from django.test.utils import override_settings
+
+        cache.clear()
+        media = tempfile.TemporaryDirectory()
+        self.addCleanup(media.cleanup)
+        override = override_settings(MEDIA_ROOT=media.name, API_CACHE_TTL=0)
+        override.enable()
+        self.addCleanup(override.disable)
+        self.admin_user = User.objects.create(username="admin_download", is_staff=True)
+        self.aluno = Aluno.objects.create(
+            user=User.objects.create(username="aluno_download"), nome="Aluno Download", email="dl@example.com"
+        )
+        treinamento = Treinamento.objects.create(nome="Treinamento Download")
+        self.turma = Turma.objects.create(
+            treinamento=treinamento,
+            nome="Turma Iniciada",
+            data_inicio=date.today() - timedelta(days=1),
+            data_conclusao=date.today() + timedelta(days=30)
+        )
+        futura = Turma.objects.create(
+            treinamento=treinamento,
+            nome="Turma Futura",
+            data_inicio=date.today() + timedelta(days=10),
+            data_conclusao=date.today() + timedelta(days=40)
+        )
+        Matricula.objects.create(turma=self.turma, aluno=self.aluno)
+        Matricula.objects.create(turma=futura, aluno=self.aluno)
+        self.liberado = self._recurso("Apostila", self.turma)
+        self.bloqueado = self._recurso("Prova", futura)
+        self.draft = self._recurso("Rascunho", self.turma, draft=True)
+
+    def _recurso(self, nome, turma, draft=False):
+        from django.core.files.base import ContentFile
+
+        recurso = Recurso(turma=turma, nome_recurso=nome, tipo_recurso="arquivo_pdf", draft=draft)
+        recurso.arquivo.save("material.pdf", ContentFile(b"%PDF-1.4 conteudo"), save=False)
+        recurso.save()
+        return recurso
+
+    def _url(self, recurso):
+        return f'/api/recursos/{recurso.id}/download/'
+
+    def test_fallback_streams_file(self):
+        """Sem MEDIA_ACCEL_REDIRECT o Django entrega o arquivo"""
+        self.client.force_authenticate(user=self.aluno.user)
+        with self.settings(MEDIA_ACCEL_REDIRECT=''):
+            response = self.client.get(self._url(self.liberado))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(b''.join(response.streaming_content), b"%PDF-1.4 conteudo")
+        self.assertEqual(response['Content-Type'], 'application/pdf')
+        self.assertIn('inline; filename="Apostila.pdf"', response['Content-Disposition'])
+        self.assertIn('private', response['Cache-Control'])
+
+    def test_accel_redirect(self):
+        """Com MEDIA_ACCEL_REDIRECT a resposta só aponta o arquivo para o nginx"""
+        self.client.force_authenticate(user=self.aluno.user)
+        with self.settings(MEDIA_ACCEL_REDIRECT='/media-protegida/'):
+            response = self.client.get(self._url(self.liberado) + '?anexo=1')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response['X-Accel-Redirect'], f'/media-protegida/{self.liberado.arquivo.name}')
+        self.assertEqual(response.content, b'')
+        self.assertEqual(response['Content-Type'], 'application/pdf')
+        self.assertTrue(response['Content-Disposition'].startswith('attachment'))
+
+    def test_access_rules(self):
+        """Turma não iniciada, draft e anônimos não baixam; admin baixa tudo"""
+        self.client.force_authenticate(user=self.aluno.user)
+        self.assertEqual(self.client.get(self._url(self.bloqueado)).status_code, status.HTTP_403_FORBIDDEN)
+        self.assertEqual(self.client.get(self._url(self.draft)).status_code, status.HTTP_404_NOT_FOUND)
+
+        self.client.force_authenticate(user=self.admin_user)
+        with self.settings(MEDIA_ACCEL_REDIRECT='/media-protegida/'):
+            for recurso in (self.bloqueado, self.draft):
+                self.assertEqual(self.client.get(self._url(recurso)).status_code, status.HTTP_200_OK)
+
+        self.client.force_authenticate(user=None)
+        self.assertIn(
+            self.client.get(self._url(self.liberado)).status_code,
+            (status.HTTP_401_UNAUTHORIZED, status.HTTP_403_FORBIDDEN)
+        )
+
+        # Usuário autenticado sem perfil de aluno não tem matrícula
+        self.client.force_authenticate(user=User.objects.create(username="sem_perfil"))
+        with self.settings(MEDIA_ACCEL_REDIRECT='/media-protegida/'):
+            self.assertEqual(self.client.get(self._url(self.liberado)).status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_arquivo_url_points_to_download(self):
+        """arquivo_url das listagens aponta para o endpoint de download"""
+        self.client.force_authenticate(user=self.aluno.user)
+        dados = {item['nome_recurso']: item for item in self.client.get('/api/recursos/').data['results']}
+        self.assertTrue(dados["Apostila"]['arquivo_url'].endswith(self._url(self.liberado)))
+        self.assertIsNone(dados["Prova"]['arquivo_url'])
+
+        # Para o admin, o caminho em /media/ (não servido) não é exposto
+        self.client.force_authenticate(user=self.admin_user)
+        for item in self.client.get('/api/recursos/').data['results']:
+            self.assertNotIn('arquivo', item)
+            self.assertTrue(item['arquivo_url'].endswith(self._url(Recurso(pk=item['id']))))
+
+
+class RecursoRangeTest(RecursoDownloadTest):
+    """Testes de Range/If-Range no download servido pelo Django (core.downloads)"""
+
+    def setUp(self):
+        super().setUp()
+        from django.core.files.base import ContentFile
+
+        self.conteudo = bytes(range(256)) * 40
+        self.video = Recurso(turma=self.turma, nome_recurso="Aula", tipo_recurso="video", draft=False)
+        self.video.arquivo.save("aula.mp4", ContentFile(self.conteudo), save=False)
+        self.video.save()
+        self.client.force_authenticate(user=self.aluno.user)
+        override = self.settings(MEDIA_ACCEL_REDIRECT='')
+        override.enable()
+        self.addCleanup(override.disable)
+
+    def _get(self, **headers):
+        response = self.client.get(self._url(self.video), **headers)
+        corpo = b''.join(response.streaming_content) if response.streaming else response.content
+        response.close()
+        return response, corpo
+
+    def test_full_response_advertises_ranges(self):
+        """Sem Range: 200 completo com Accept-Ranges e validadores"""
+        response, corpo = self._get()
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(corpo, self.conteudo)
+        self.assertEqual(response['Accept-Ranges'], 'bytes')
+        self.assertIn('ETag', response)
+        self.assertIn('Last-Modified', response)
+
+    def test_single_ranges(self):
+        """Intervalo fechado, aberto e sufixo geram 206 com Content-Range"""
+        tamanho = len(self.conteudo)
+        casos = {
+            'bytes=100-199': (100, 199),
+            'bytes=10000-': (10000, tamanho - 1),
+            'bytes=-50': (tamanho - 50, tamanho - 1),
+            'bytes=5000-999999': (5000, tamanho - 1),
+        }
+        for cabecalho, (inicio, fim) in casos.items():
+            response, corpo = self._get(HTTP_RANGE=cabecalho)
+            self.assertEqual(response.status_code, status.HTTP_206_PARTIAL_CONTENT, cabecalho)
+            self.assertEqual(corpo, self.conteudo[inicio:fim + 1], cabecalho)
+            self.assertEqual(response['Content-Range'], f'bytes {inicio}-{fim}/{tamanho}')
+            self.assertEqual(int(response['Content-Length']), fim + 1 - inicio)
+
+    def test_single_range_is_sendfile_ready(self):
+        """O trecho expõe o descritor já posicionado no início do intervalo"""
+        from django.test import RequestFactory
+        from .downloads import resposta_de_arquivo
+
+        request = RequestFactory().get('/', HTTP_RANGE='bytes=3000-3999')
+        response = resposta_de_arquivo(request, self.video.arquivo, "aula.mp4")
+        trecho = response.file_to_stream
+        self.assertEqual(os.lseek(trecho.fileno(), 0, os.SEEK_CUR), 3000)
+        self.assertEqual(trecho.read(), self.conteudo[3000:4000])
+        response.close()
+
+    def test_multiple_ranges(self):
+        """Vários intervalos: multipart/byteranges, com sobreposições unidas"""
+        tamanho = len(self.conteudo)
+        response, corpo = self._get(HTTP_RANGE='bytes=0-9, 5-19, 200-209')
+        self.assertEqual(response.status_code, status.HTTP_206_PARTIAL_CONTENT)
+        fronteira = response['Content-Type'].split('boundary=')[1]
+        self.assertEqual(len(corpo), int(response['Content-Length']))
+        esperado = b''
+        for inicio, fim in ((0, 19), (200, 209)):
+            esperado += (
+                f'--{fronteira}\r\nContent-Type: video/mp4\r\n'
+                f'Content-Range: bytes {inicio}-{fim}/{tamanho}\r\n\r\n'
+            ).encode() + self.conteudo[inicio:fim + 1] + b'\r\n'
+        self.assertEqual(corpo, esperado + f'--{fronteira}--\r\n'.encode())
+
+    def test_invalid_and_unsatisfiable(self):
+        """Range inválido é ignorado; fora do arquivo responde 416"""
+        response, corpo = self._get(HTTP_RANGE='bytes=20-10')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(corpo, self.conteudo)
+
+        response, _ = self._get(HTTP_RANGE=f'bytes={len(self.conteudo)}-')
+        self.assertEqual(response.status_code, status.HTTP_416_REQUESTED_RANGE_NOT_SATISFIABLE)
+        self.assertEqual(response['Content-Range'], f'bytes */{len(self.conteudo)}')
+
+    def test_if_range_and_conditional(self):
+        """If-Range desatualizado devolve o arquivo inteiro; If-None-Match, 304"""
+        etag = self._get()[0]['ETag']
+        response, _ = self._get(HTTP_RANGE='bytes=0-9', HTTP_IF_RANGE=etag)
+        self.assertEqual(response.status_code, status.HTTP_206_PARTIAL_CONTENT)
+
+        response, corpo = self._get(HTTP_RANGE='bytes=0-9', HTTP_IF_RANGE='"desatualizada"')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(corpo, self.conteudo)
+
+        response, _ = self._get(HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+
+class UploadRetomavelTest(APITestCase):
+    """Testes dos uploads retomáveis em partes (core.uploads)"""
+
+    def setUp(self):
+        from django.test.utils import override_settings
+
+        media = tempfile.TemporaryDirectory()
+        self.addCleanup(media.cleanup)
+        override = override_settings(MEDIA_ROOT=media.name, API_CACHE_TTL=0)
+        override.enable()
+        self.addCleanup(override.disable)
+        self.admin_user = User.objects.create(username="admin_upload", is_staff=True)
+        self.client.force_authenticate(user=self.admin_user)
+        self.turma = Turma.objects.create(
+            treinamento=Treinamento.objects.create(nome="Treinamento Upload"),
+            nome="Turma Upload",
+            data_inicio=date.today() + timedelta(days=5),
+            data_conclusao=date.today() + timedelta(days=30)
+        )
+        self.conteudo = os.urandom(300 * 1024)
+
+    def _criar(self, **dados):
+        import hashlib
+
+        dados = {'nome_arquivo': "aula.mp4", 'tamanho': len(self.conteudo),
+                 'sha256': hashlib.sha256(self.conteudo).hexdigest(), **dados}
+        response = self.client.post('/api/uploads/', dados, format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED, response.data)
+        return response.data['id']
+
+    def _enviar(self, sessao, offset, dados, **headers):
+        return self.client.generic(
+            'PATCH', f'/api/uploads/{sessao}/', dados,
+            content_type='application/offset+octet-stream', HTTP_UPLOAD_OFFSET=str(offset), **headers
+        )
+
+    def _finalizar(self, sessao, **dados):
+        dados = {'turma': str(self.turma.id), 'nome_recurso': "Aula gravada", 'tipo_recurso': 'video', **dados}
+        return self.client.post(f'/api/uploads/{sessao}/finalizar/', dados, format='json')
+
+    def test_chunked_upload_creates_recurso_without_copy(self):
+        """Partes em sequência montam o arquivo, movido (não copiado) para o recurso"""
+        from .models import UploadRetomavel
+        from .uploads import caminho_parcial
+
+        sessao = self._criar()
+        for offset in range(0, len(self.conteudo), 100 * 1024):
+            response = self._enviar(sessao, offset, self.conteudo[offset:offset + 100 * 1024])
+            self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
+            self.assertEqual(int(response['Upload-Offset']), min(offset + 100 * 1024, len(self.conteudo)))
+
+        response = self.client.head(f'/api/uploads/{sessao}/')
+        self.assertEqual(int(response['Upload-Offset']), len(self.conteudo))
+
+        inode = os.stat(caminho_parcial(UploadRetomavel.objects.get(pk=sessao))).st_ino
+        response = self._finalizar(sessao)
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED, response.data)
+
+        recurso = Recurso.objects.get(pk=response.data['id'])
+        self.assertEqual(os.stat(recurso.arquivo.path).st_ino, inode)
+        with recurso.arquivo.open('rb') as arquivo:
+            self.assertEqual(arquivo.read(), self.conteudo)
+        self.assertTrue(recurso.arquivo.name.startswith('recursos/'))
+        self.assertFalse(UploadRetomavel.objects.filter(pk=sessao).exists())
+
+    def test_resume_after_interruption(self):
+        """Parte interrompida mantém o que chegou; o envio retoma do offset informado"""
+        import hashlib
+        from django.http import UnreadablePostError
+        from . import uploads
+        from .models import UploadRetomavel
+
+        class Interrompido:
+            def __init__(self, dados):
+                self.dados, self.lido = dados, False
+
+            def read(self, tamanho):
+                if self.lido:
+                    raise UnreadablePostError('conexão perdida')
+                self.lido = True
+                return self.dados
+
+        sessao_id = self._criar()
+        sessao = UploadRetomavel.objects.get(pk=sessao_id)
+        recebido = uploads.receber_parte(
+            sessao, 0, Interrompido(self.conteudo[:70000]), len(self.conteudo)
+        )
+        self.assertEqual(recebido, 70000)
+
+        response = self.client.get(f'/api/uploads/{sessao_id}/')
+        self.assertEqual(response.data['recebido'], 70000)
+        response = self._enviar(sessao_id, 0, self.conteudo)
+        self.assertEqual(response.status_code, status.HTTP_409_CONFLICT)
+        self.assertEqual(int(response['Upload-Offset']), 70000)
+        response = self._enviar(sessao_id, 70000, self.conteudo[70000:])
+        self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
+
+        response = self._finalizar(sessao_id)
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED, response.data)
+        self.assertEqual(response.data['sha256'], hashlib.sha256(self.conteudo).hexdigest())
+        with Recurso.objects.get(pk=response.data['id']).arquivo.open('rb') as arquivo:
+            self.assertEqual(arquivo.read(), self.conteudo)
+
+    def test_checksums_and_validation(self):
+        """Checksum por parte, SHA-256 final, tamanho e extensão são conferidos"""
+        import base64
+        import hashlib
+
+        response = self.client.post('/api/uploads/', {'nome_arquivo': "aula.exe", 'tamanho': 10}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+        sessao = self._criar(sha256=hashlib.sha256(b'outro conteudo').hexdigest())
+        parte = self.conteudo[:1000]
+        errado = 'sha256 ' + base64.b64encode(hashlib.sha256(b'x').digest()).decode()
+        response = self._enviar(sessao, 0, parte, HTTP_UPLOAD_CHECKSUM=errado)
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(self.client.get(f'/api/uploads/{sessao}/').data['recebido'], 0)
+
+        certo = 'sha256 ' + base64.b64encode(hashlib.sha256(parte).digest()).decode()
+        self.assertEqual(
+            self._enviar(sessao, 0, parte, HTTP_UPLOAD_CHECKSUM=certo).status_code, status.HTTP_204_NO_CONTENT
+        )
+        # Incompleto e, depois de completo, com SHA-256 divergente do informado
+        self.assertEqual(self._finalizar(sessao).status_code, status.HTTP_400_BAD_REQUEST)
+        self._enviar(sessao, 1000, self.conteudo[1000:])
+        self.assertEqual(self._finalizar(sessao).status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(self._enviar(sessao, len(self.conteudo), b'a').status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_failed_finalize_removes_moved_file(self):
+        """Falha depois de mover o arquivo: o movido é removido e novas tentativas dão 400"""
+        from unittest import mock
+        from django.conf import settings
+        from django.db import DatabaseError
+
+        sessao = self._criar()
+        self._enviar(sessao, 0, self.conteudo)
+        destino = os.path.join(settings.MEDIA_ROOT, 'recursos')
+        with mock.patch('core.uploads.descartar', side_effect=DatabaseError('falha')):
+            with self.assertRaises(DatabaseError):
+                self._finalizar(sessao)
+        self.assertEqual(os.listdir(destino), [])
+        self.assertFalse(Recurso.objects.filter(nome_recurso="Aula gravada").exists())
+
+        response = self._finalizar(sessao)
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('parcial', response.data['error'])
+
+    def test_replace_file_cancel_and_cleanup(self):
+        """Finalizar com recurso substitui o arquivo; cancelar e expirar removem o parcial"""
+        from io import StringIO
+        from django.core.files.base import ContentFile
+        from django.core.management import call_command
+        from .models import UploadRetomavel
+        from .uploads import caminho_parcial
+
+        recurso = Recurso(turma=self.turma, nome_recurso="Antiga", tipo_recurso="video")
+        recurso.arquivo.save("antiga.mp4", ContentFile(b"antigo"), save=False)
+        recurso.save()
+        sessao = self._criar()
+        self._enviar(sessao, 0, self.conteudo)
+        response = self._finalizar(sessao, recurso=str(recurso.id))
+        self.assertEqual(response.status_code, status.HTTP_200_OK, response.data)
+        recurso.refresh_from_db()
+        self.assertEqual(recurso.arquivo.size, len(self.conteudo))
+        self.assertEqual(recurso.nome_recurso, "Aula gravada")
+
+        sessao = UploadRetomavel.objects.get(pk=self._criar())
+        self.assertEqual(self.client.delete(f'/api/uploads/{sessao.pk}/').status_code, status.HTTP_204_NO_CONTENT)
+        self.assertFalse(os.path.exists(caminho_parcial(sessao)))
+
+        sessao = UploadRetomavel.objects.get(pk=self._criar())
+        UploadRetomavel.objects.filter(pk=sessao.pk).update(updated_at=timezone.now() - timedelta(hours=48))
+        call_command('limpar_uploads', '--horas', '24', stdout=StringIO())
+        self.assertFalse(UploadRetomavel.objects.filter(pk=sessao.pk).exists())
+        self.assertFalse(os.path.exists(caminho_parcial(sessao)))
+
+        self.client.force_authenticate(user=User.objects.create(username="nao_admin_upload"))
+        response = self.client.post('/api/uploads/', {'nome_arquivo': "a.mp4", 'tamanho': 1}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+
 if __name__ == '__main__':
     import django
     from django.conf import settings
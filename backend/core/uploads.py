@@ -0,0 +1,210 @@
+"""
+Uploads retomáveis de arquivos grandes de `Recurso` (protocolo inspirado no tus).
+
+1. `POST /api/uploads/` cria a sessão (`nome_arquivo`, `tamanho` e,
+   opcionalmente, o `sha256` esperado);
+2. `PATCH /api/uploads/<id>/` com `Upload-Offset` e o corpo
+   `application/offset+octet-stream` grava a parte no arquivo parcial.
+   Em `HEAD`/`GET` a sessão informa o offset atual: após uma queda, o
+   cliente retoma de onde o servidor parou. O cabeçalho opcional
+   `Upload-Checksum: sha256 <base64>` confere a parte antes de aceitá-la;
+3. `POST /api/uploads/<id>/finalizar/` cria (ou atualiza, com `recurso`)
+   o `Recurso` com o arquivo montado.
+
+As partes vão direto do corpo da requisição para o disco, em blocos; a
+memória não cresce com o tamanho do arquivo. Durante o envio, a
+integridade é conferida por parte (`Upload-Checksum`), sem reler o que já
+foi gravado; o SHA-256 do arquivo inteiro é calculado uma única vez, numa
+leitura sequencial, ao finalizar. Ao finalizar, o storage move o arquivo
+parcial para o destino (`temporary_file_path`, como nos uploads
+temporários do Django) em vez de copiá-lo: mantenha `UPLOAD_RETOMAVEL_DIR`
+no mesmo sistema de arquivos de MEDIA_ROOT. `python manage.py
+limpar_uploads` remove sessões abandonadas.
+"""
+import base64
+import binascii
+import hashlib
+import os
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.files import File
+from django.db import transaction
+from django.http import UnreadablePostError
+from django.utils import timezone
+
+from .models import Recurso, UploadRetomavel
+
+BLOCO = 1024 * 1024
+TTL_TRAVA = 600
+
+
+class UploadInvalido(Exception):
+    pass
+
+
+class OffsetDivergente(UploadInvalido):
+    """A parte não começa no offset já recebido pelo servidor."""
+
+    def __init__(self, recebido):
+        super().__init__(f'Offset esperado: {recebido}.')
+        self.recebido = recebido
+
+
+class UploadEmAndamento(UploadInvalido):
+    pass
+
+
+def diretorio_parciais():
+    return getattr(settings, 'UPLOAD_RETOMAVEL_DIR', '') or os.path.join(settings.MEDIA_ROOT, 'parciais')
+
+
+def caminho_parcial(sessao):
+    return os.path.join(diretorio_parciais(), f'{sessao.pk}.parte')
+
+
+def criar_sessao(usuario, nome_arquivo, tamanho, sha256=''):
+    """Cria a sessão e o arquivo parcial vazio."""
+    sessao = UploadRetomavel.objects.create(
+        usuario=usuario, nome_arquivo=nome_arquivo, tamanho=tamanho, sha256=sha256.lower()
+    )
+    os.makedirs(diretorio_parciais(), exist_ok=True)
+    open(caminho_parcial(sessao), 'wb').close()
+    return sessao
+
+
+def _checksum_da_parte(cabecalho):
+    """Digest esperado de `Upload-Checksum: sha256 <base64>`."""
+    algoritmo, _, valor = cabecalho.strip().partition(' ')
+    if algoritmo.lower() != 'sha256':
+        raise UploadInvalido('Upload-Checksum aceita apenas sha256.')
+    try:
+        return base64.b64decode(valor.strip(), validate=True)
+    except (binascii.Error, ValueError):
+        raise UploadInvalido('Upload-Checksum inválido.')
+
+
+def receber_parte(sessao, offset, corpo, comprimento, checksum=None):
+    """
+    Grava até `comprimento` bytes de `corpo` a partir de `offset` e retorna o
+    novo offset. Sem checksum, o que chegou antes de uma queda de conexão é
+    mantido; com checksum, a parte só é aceita inteira.
+    """
+    esperado = _checksum_da_parte(checksum) if checksum else None
+    trava = f'upload:{sessao.pk}:trava'
+    if not cache.add(trava, 1, TTL_TRAVA):
+        raise UploadEmAndamento('Outra parte deste upload está sendo recebida.')
+    try:
+        sessao.refresh_from_db(fields=['recebido'])
+        if offset != sessao.recebido:
+            raise OffsetDivergente(sessao.recebido)
+        if offset + comprimento > sessao.tamanho:
+            raise UploadInvalido('A parte ultrapassa o tamanho declarado do arquivo.')
+
+        with open(caminho_parcial(sessao), 'r+b') as arquivo:
+            digest_parte = hashlib.sha256() if esperado is not None else None
+            # Descarta o que uma parte interrompida tenha deixado além do offset
+            arquivo.truncate(offset)
+            arquivo.seek(offset)
+            restante = comprimento
+            try:
+                while restante:
+                    dados = corpo.read(min(BLOCO, restante))
+                    if not dados:
+                        break
+                    arquivo.write(dados)
+                    if digest_parte is not None:
+                        digest_parte.update(dados)
+                    restante -= len(dados)
+            except UnreadablePostError:
+                pass
+
+            if esperado is not None and (restante or digest_parte.digest() != esperado):
+                arquivo.truncate(offset)
+                if restante:
+                    raise UploadInvalido('Parte incompleta.')
+                raise UploadInvalido('Upload-Checksum não confere com a parte recebida.')
+            novo = offset + comprimento - restante
+
+        UploadRetomavel.objects.filter(pk=sessao.pk).update(recebido=novo, updated_at=timezone.now())
+        sessao.recebido = novo
+        return novo
+    finally:
+        cache.delete(trava)
+
+
+class ArquivoMontado(File):
+    """Arquivo parcial concluído; o FileSystemStorage o move em vez de copiar."""
+
+    def __init__(self, caminho, nome, tamanho):
+        super().__init__(None, nome)
+        self.caminho = caminho
+        self.size = tamanho
+
+    def temporary_file_path(self):
+        return self.caminho
+
+    def open(self, mode='rb'):
+        self.file = open(self.caminho, mode)
+        return self
+
+    def close(self):
+        if self.file is not None:
+            self.file.close()
+
+
+def arquivo_montado(sessao):
+    """Confere tamanho e SHA-256 da sessão e retorna (arquivo, sha256)."""
+    if sessao.recebido != sessao.tamanho:
+        raise UploadInvalido(f'Upload incompleto: {sessao.recebido} de {sessao.tamanho} bytes.')
+    caminho = caminho_parcial(sessao)
+    digest = hashlib.sha256()
+    try:
+        with open(caminho, 'rb') as arquivo:
+            # Uma leitura sequencial do arquivo inteiro
+            for dados in iter(lambda: arquivo.read(BLOCO), b''):
+                digest.update(dados)
+    except FileNotFoundError:
+        raise UploadInvalido('O arquivo parcial não existe mais; reinicie o upload.')
+    sha256 = digest.hexdigest()
+    if sessao.sha256 and sessao.sha256 != sha256:
+        raise UploadInvalido('O SHA-256 do arquivo montado não confere com o informado.')
+    return ArquivoMontado(caminho, sessao.nome_arquivo, sessao.tamanho), sha256
+
+
+def gravar_recurso(serializer, sessao, arquivo):
+    """
+    Move o arquivo montado para o storage de `Recurso.arquivo`, salva o
+    serializer (já validado) e descarta a sessão. Se a gravação falhar, o
+    arquivo movido é removido; a sessão fica sem o parcial e
+    `arquivo_montado` passa a recusá-la.
+    """
+    campo = Recurso._meta.get_field('arquivo')
+    nome = campo.storage.save(campo.generate_filename(None, arquivo.name), arquivo, max_length=campo.max_length)
+    try:
+        with transaction.atomic():
+            recurso = serializer.save(arquivo=nome)
+            descartar(sessao)
+    except Exception:
+        campo.storage.delete(nome)
+        raise
+    return recurso
+
+
+def descartar(sessao):
+    """Remove a sessão e o arquivo parcial (se ainda existir)."""
+    try:
+        os.remove(caminho_parcial(sessao))
+    except FileNotFoundError:
+        pass
+    sessao.delete()
+
+
+def limpar_expiradas(horas):
+    """Descarta sessões sem partes novas há mais de `horas` horas; retorna quantas."""
+    limite = timezone.now() - timedelta(hours=horas)
+    expiradas = list(UploadRetomavel.objects.filter(updated_at__lt=limite))
+    for sessao in expiradas:
+        descartar(sessao)
+    return len(expiradas)
@@ -2,7 +2,8 @@ from django.urls import path, include
 from rest_framework.routers import DefaultRouter
 from .views import (
     TreinamentoViewSet, TurmaViewSet, RecursoViewSet,
-    AlunoViewSet, MatriculaViewSet, AuthViewSet, AdminViewSet, get_csrf
+    AlunoViewSet, MatriculaViewSet, AuthViewSet, AdminViewSet, DashboardViewSet, UploadRetomavelViewSet,
+    get_csrf
 )
 
 router = DefaultRouter()
@@ -13,6 +14,8 @@ router.register(r'alunos', AlunoViewSet)
 router.register(r'matriculas', MatriculaViewSet)
 router.register(r'administradores', AdminViewSet, basename='administradores')
 router.register(r'auth', AuthViewSet, basename='auth')
+router.register(r'dashboard', DashboardViewSet, basename='dashboard')
+router.register(r'uploads', UploadRetomavelViewSet, basename='upload')
 
 urlpatterns = [
     path('api/', include(router.urls)),
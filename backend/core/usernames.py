@@ -0,0 +1,69 @@
+"""
+Geração de usernames únicos para alunos.
+
+O username segue o esquema já usado pelo AlunoSerializer: a base vem do
+prefixo do email (ou do nome), e colisões recebem sufixo numérico
+(joao, joao2, joao3...). Os usernames ocupados que começam com cada base
+são buscados em uma única consulta, seja para um aluno ou para um lote.
+"""
+from functools import reduce
+from operator import or_
+
+from django.contrib.auth.models import User
+from django.db.models import Q
+from django.utils.text import slugify
+
+# Deixa espaço para o sufixo numérico dentro dos 150 caracteres do User
+TAMANHO_MAXIMO_BASE = 140
+
+
+def base_username(email=None, nome=None):
+    base = (email.split('@')[0] if email else None) or (nome or 'aluno')
+    return (slugify(base).replace('-', '') or 'aluno')[:TAMANHO_MAXIMO_BASE]
+
+
+def _bases_de(username, distintas):
+    """Bases (do conjunto `distintas`) das quais `username` é prefixado."""
+    return [username[:i] for i in range(1, len(username) + 1) if username[:i] in distintas]
+
+
+def _sufixo(base, username):
+    """Sufixo numérico de `username` em relação à base (1 para a própria base)."""
+    if username == base:
+        return 1
+    resto = username[len(base):]
+    return int(resto) if resto.isdigit() and not resto.startswith('0') else None
+
+
+def alocar_usernames(bases):
+    """
+    Retorna um username livre para cada base (na mesma ordem), únicos entre
+    si e em relação aos existentes, usando uma consulta ao banco.
+    """
+    distintas = set(bases)
+    if not distintas:
+        return []
+
+    # Maior sufixo ocupado por base (0 = nem a própria base está em uso)
+    maior = dict.fromkeys(distintas, 0)
+    existentes = User.objects.filter(
+        reduce(or_, (Q(username__startswith=base) for base in distintas))
+    ).values_list('username', flat=True)
+    for username in existentes:
+        for base in _bases_de(username, distintas):
+            sufixo = _sufixo(base, username)
+            if sufixo is not None:
+                maior[base] = max(maior[base], sufixo)
+
+    usernames = []
+    for base in bases:
+        proximo = maior[base] + 1
+        username = base if proximo == 1 else f'{base}{proximo}'
+        usernames.append(username)
+        # Reserva para as próximas linhas do lote; bases que são prefixo
+        # umas das outras (ex.: "ana" e "ana2") também enxergam a reserva
+        for outra in _bases_de(username, distintas):
+            sufixo = _sufixo(outra, username)
+            if sufixo is not None:
+                maior[outra] = max(maior[outra], sufixo)
+    return usernames
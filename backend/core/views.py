@@ -1,18 +1,40 @@
 from rest_framework import viewsets, permissions, status
 from rest_framework.decorators import action
+from rest_framework.parsers import MultiPartParser
 from rest_framework.response import Response
 from django.contrib.auth.models import User
 from django.contrib.auth import authenticate, login, logout
-from django.utils import timezone
+from django.core.cache import cache
+from django.core.exceptions import ValidationError
+from django.db import transaction
 from django.db.models import Q
 from django.views.decorators.csrf import csrf_exempt, ensure_csrf_cookie
+from django.utils import timezone
 from django.utils.decorators import method_decorator
+from django.urls import reverse
 from django.http import JsonResponse
-from .models import Treinamento, Turma, Recurso, Aluno, Matricula
+from .models import Treinamento, Turma, Recurso, Aluno, Matricula, UploadRetomavel, normalizar_login
+from .access import (
+    anotar_pode_acessar, anotar_pode_acessar_em_cache, pode_acessar_q, recursos_disponiveis_em_cache,
+)
+from .search import buscar, ordenar
+from .uploads import (
+    OffsetDivergente, UploadEmAndamento, UploadInvalido, arquivo_montado, criar_sessao, descartar,
+    gravar_recurso, receber_parte,
+)
+from .importacao import FormatoInvalido, importar_alunos, ler_linhas
+from .conditional import RequisicaoCondicionalMixin
+from .downloads import nome_do_arquivo, resposta_de_arquivo
+from .fast_read import LeituraRapidaMixin
+from .fieldsets import CamposEsparsosMixin
+from .metrics import metricas_dashboard
+from .response_cache import RespostaEmCacheMixin, em_cache
+from .warmup import dados_aluno, turmas_do_aluno
 from .serializers import (
     UserSerializer, TreinamentoSerializer, TurmaSerializer, 
     RecursoSerializer, AlunoSerializer, MatriculaSerializer,
-    RecursoAlunoSerializer, AdminSerializer, AdminPasswordUpdateSerializer
+    RecursoAlunoSerializer, AdminSerializer, AdminPasswordUpdateSerializer,
+    MatriculaBulkSerializer, RecursoBulkSerializer, UploadRetomavelSerializer
 )
 
 
@@ -58,7 +80,7 @@ class IsAlunoOwner(permissions.BasePermission):
         return False
 
 
-class AdminViewSet(viewsets.ModelViewSet):
+class AdminViewSet(CamposEsparsosMixin, viewsets.ModelViewSet):
     """
     ViewSet para gerenciar administradores.
     Apenas super-administradores podem acessar.
@@ -201,21 +223,21 @@ class AdminViewSet(viewsets.ModelViewSet):
         })
 
 
-class TreinamentoViewSet(viewsets.ModelViewSet):
+class TreinamentoViewSet(RequisicaoCondicionalMixin, RespostaEmCacheMixin, LeituraRapidaMixin, CamposEsparsosMixin, viewsets.ModelViewSet):
     queryset = Treinamento.objects.all()
     serializer_class = TreinamentoSerializer
     permission_classes = [IsAdminOrReadOnly]
+    cache_dependencias = (Treinamento, Turma, Recurso)
 
     def get_queryset(self):
         queryset = super().get_queryset()
         search = self.request.query_params.get('search', None)
         if search:
-            queryset = queryset.filter(
-                Q(nome__icontains=search) | Q(descricao__icontains=search)
-            )
-        return queryset.order_by('-created_at')
+            queryset = buscar(queryset, search)
+        return ordenar(queryset, '-created_at')
 
     @action(detail=True, methods=['get'])
+    @em_cache
     def recursos(self, request, pk=None):
         """Retorna recursos do treinamento (diretos e das turmas)"""
         treinamento = self.get_object()
@@ -233,10 +255,12 @@ class TreinamentoViewSet(viewsets.ModelViewSet):
         return Response(serializer.data)
 
 
-class TurmaViewSet(viewsets.ModelViewSet):
+class TurmaViewSet(RequisicaoCondicionalMixin, RespostaEmCacheMixin, LeituraRapidaMixin, CamposEsparsosMixin, viewsets.ModelViewSet):
     queryset = Turma.objects.select_related('treinamento').all()
     serializer_class = TurmaSerializer
     permission_classes = [IsAdminOrReadOnly]
+    # Matricula: total_alunos é atualizado a cada matrícula
+    cache_dependencias = (Turma, Treinamento, Matricula, Recurso)
 
     def get_queryset(self):
         queryset = super().get_queryset()
@@ -247,25 +271,20 @@ class TurmaViewSet(viewsets.ModelViewSet):
             queryset = queryset.filter(treinamento_id=treinamento_id)
         
         if search:
-            queryset = queryset.filter(
-                Q(nome__icontains=search) | Q(treinamento__nome__icontains=search)
-            )
+            queryset = buscar(queryset, search)
         
-        return queryset.order_by('-data_inicio')
+        return ordenar(queryset, '-data_inicio')
 
     @action(detail=True, methods=['get'])
+    @em_cache
     def recursos(self, request, pk=None):
         """Retorna recursos da turma"""
         turma = self.get_object()
-        recursos = turma.recurso_set.all()
+        recursos = turma.recursos.all()
         
         # Se não é admin, aplica filtros de acesso
         if not request.user.is_staff:
-            recursos = recursos.filter(draft=False)
-            hoje = timezone.now().date()
-            recursos = recursos.filter(
-                Q(acesso_previo=True) | Q(turma__data_inicio__lte=hoje)
-            )
+            recursos = recursos.filter(pode_acessar_q())
         
         serializer = RecursoSerializer(recursos, many=True, context={'request': request})
         return Response(serializer.data)
@@ -274,16 +293,17 @@ class TurmaViewSet(viewsets.ModelViewSet):
     def alunos(self, request, pk=None):
         """Retorna alunos matriculados na turma"""
         turma = self.get_object()
-        matriculas = turma.matricula_set.select_related('aluno').all()
-        alunos = [matricula.aluno for matricula in matriculas]
+        alunos = Aluno.objects.filter(matriculas__turma=turma)
         serializer = AlunoSerializer(alunos, many=True)
         return Response(serializer.data)
 
 
-class RecursoViewSet(viewsets.ModelViewSet):
+class RecursoViewSet(RequisicaoCondicionalMixin, LeituraRapidaMixin, CamposEsparsosMixin, viewsets.ModelViewSet):
     queryset = Recurso.objects.select_related('turma', 'turma__treinamento', 'treinamento').all()
     serializer_class = RecursoSerializer
     permission_classes = [IsAdminOrReadOnly]
+    # Turma/Matricula: pode_acessar depende das datas e das matrículas do aluno
+    cache_dependencias = (Recurso, Turma, Treinamento, Matricula)
 
     def get_queryset(self):
         queryset = super().get_queryset()
@@ -292,30 +312,35 @@ class RecursoViewSet(viewsets.ModelViewSet):
         tipo = self.request.query_params.get('tipo', None)
         search = self.request.query_params.get('search', None)
         
-        # Se não é admin, filtra recursos não-draft
+        # Se não é admin, filtra recursos não-draft e calcula o acesso no banco
         if not self.request.user.is_staff:
-            queryset = queryset.filter(draft=False)
+            aluno = getattr(self.request.user, 'aluno_profile', None)
+            if aluno is not None:
+                # IDs acessíveis do aluno vêm do cache (core.access.ids_acessiveis)
+                queryset = anotar_pode_acessar_em_cache(queryset.filter(draft=False), aluno)
+            else:
+                queryset = anotar_pode_acessar(queryset.filter(draft=False))
         
         if turma_id:
             queryset = queryset.filter(turma_id=turma_id)
         
         if treinamento_id:
             # Filtra recursos que pertencem diretamente ao treinamento
-            # ou que pertencem a turmas deste treinamento
+            # ou que pertencem a turmas deste treinamento (IN em vez do
+            # JOIN: os dois lados do OR usam os índices de Recurso)
+            turmas = Turma.objects.filter(treinamento_id=treinamento_id).values('pk')
             queryset = queryset.filter(
-                Q(treinamento_id=treinamento_id) | 
-                Q(turma__treinamento_id=treinamento_id)
+                Q(treinamento_id=treinamento_id) |
+                Q(turma_id__in=turmas)
             )
         
         if tipo:
             queryset = queryset.filter(tipo_recurso=tipo)
         
         if search:
-            queryset = queryset.filter(
-                Q(nome_recurso__icontains=search) | Q(descricao_recurso__icontains=search)
-            )
+            queryset = buscar(queryset, search)
         
-        return queryset.order_by('-created_at')
+        return ordenar(queryset, '-created_at')
 
     def get_serializer_class(self):
         # Se não é admin, usa serializer específico para alunos
@@ -323,11 +348,78 @@ class RecursoViewSet(viewsets.ModelViewSet):
             return RecursoAlunoSerializer
         return RecursoSerializer
 
+    @action(detail=True, methods=['get'])
+    def download(self, request, pk=None):
+        """Arquivo do recurso, entregue pelo nginx (X-Accel-Redirect) após a checagem de acesso"""
+        # Sem perfil de aluno não há matrícula a conferir: só admins baixam
+        if not request.user.is_staff and getattr(request.user, 'aluno_profile', None) is None:
+            return Response(
+                {'error': 'Acesso restrito a alunos matriculados'},
+                status=status.HTTP_403_FORBIDDEN
+            )
+        # get_queryset já exclui drafts e anota pode_acessar para quem não é admin
+        recurso = self.get_object()
+        if not request.user.is_staff and not recurso.pode_acessar:
+            return Response(
+                {'error': 'Recurso ainda não disponível'},
+                status=status.HTTP_403_FORBIDDEN
+            )
+        if not recurso.arquivo:
+            return Response({'error': 'Recurso sem arquivo'}, status=status.HTTP_404_NOT_FOUND)
+        anexo = request.query_params.get('anexo') in ('1', 'true')
+        return resposta_de_arquivo(request, recurso.arquivo, nome_do_arquivo(recurso), anexo=anexo)
+
+    @action(detail=False, methods=['post'])
+    def bulk(self, request):
+        """Publica/despublica ou altera o acesso prévio de vários recursos com um UPDATE"""
+        serializer = RecursoBulkSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        dados = serializer.validated_data
+
+        alvo = Recurso.objects.all()
+        if 'ids' in dados:
+            alvo = alvo.filter(pk__in=dados['ids'])
+        if 'turma' in dados:
+            alvo = alvo.filter(turma=dados['turma'])
+        if 'treinamento' in dados:
+            alvo = alvo.filter(
+                Q(treinamento=dados['treinamento']) | Q(turma__treinamento=dados['treinamento'])
+            )
 
-class AlunoViewSet(viewsets.ModelViewSet):
+        alteracoes = {campo: dados[campo] for campo in ('draft', 'acesso_previo') if campo in dados}
+        # Recursos que ficariam com acesso prévio em rascunho após a alteração
+        invalidos = None
+        if alteracoes == {'draft': True}:
+            invalidos = Q(acesso_previo=True)
+        elif alteracoes == {'acesso_previo': True}:
+            invalidos = Q(draft=True)
+
+        selecionados = alvo
+        rejeitados = []
+        with transaction.atomic():
+            if invalidos is not None:
+                rejeitados = list(alvo.filter(invalidos).values_list('pk', flat=True))
+                # O invariante também vai no WHERE do UPDATE
+                alvo = alvo.exclude(invalidos)
+            atualizados = alvo.update(**alteracoes, updated_at=timezone.now())
+
+        resposta = {'atualizados': atualizados, 'rejeitados': rejeitados}
+        if 'ids' in dados:
+            # Ids inexistentes ou fora do filtro de turma/treinamento
+            nao_encontrados = []
+            if atualizados + len(rejeitados) < len(dados['ids']):
+                encontrados = set(selecionados.values_list('pk', flat=True))
+                nao_encontrados = [pk for pk in dados['ids'] if pk not in encontrados]
+            resposta['nao_encontrados'] = nao_encontrados
+        return Response(resposta)
+
+
+class AlunoViewSet(RequisicaoCondicionalMixin, CamposEsparsosMixin, viewsets.ModelViewSet):
     queryset = Aluno.objects.all()
     serializer_class = AlunoSerializer
     permission_classes = [IsAlunoOwner]
+    # Matricula: total_matriculas é atualizado a cada matrícula
+    cache_dependencias = (Aluno, Matricula)
 
     def get_queryset(self):
         queryset = super().get_queryset()
@@ -342,11 +434,34 @@ class AlunoViewSet(viewsets.ModelViewSet):
             # Admin pode buscar por nome ou email
             search = self.request.query_params.get('search', None)
             if search:
-                queryset = queryset.filter(
-                    Q(nome__icontains=search) | Q(email__icontains=search)
-                )
-        
-        return queryset.order_by('nome')
+                queryset = buscar(queryset, search)
+        
+        return ordenar(queryset, 'nome')
+
+    @action(
+        detail=False,
+        methods=['post'],
+        permission_classes=[permissions.IsAdminUser],
+        parser_classes=[MultiPartParser],
+    )
+    def importar(self, request):
+        """Importa alunos de um arquivo CSV/XLSX enviado no campo 'arquivo'"""
+        arquivo = request.FILES.get('arquivo')
+        if not arquivo:
+            return Response(
+                {'error': 'Envie o arquivo no campo "arquivo".'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        try:
+            relatorio = importar_alunos(ler_linhas(arquivo, arquivo.name))
+        except FormatoInvalido as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+        return Response(
+            relatorio,
+            status=status.HTTP_201_CREATED if relatorio['criados'] else status.HTTP_200_OK
+        )
 
     @action(detail=True, methods=['get'])
     def turmas(self, request, pk=None):
@@ -363,27 +478,8 @@ class AlunoViewSet(viewsets.ModelViewSet):
                 status=status.HTTP_403_FORBIDDEN
             )
         
-        matriculas = Matricula.objects.filter(aluno=aluno).select_related('turma__treinamento')
-        turmas_data = []
-        
-        for matricula in matriculas:
-            turma = matricula.turma
-            turma_data = {
-                'id': turma.id,
-                'nome': turma.nome,
-                'data_inicio': turma.data_inicio,
-                'data_conclusao': turma.data_conclusao,
-                'link_acesso': turma.link_acesso,
-                'treinamento_nome': turma.treinamento.nome,
-                'treinamento': {
-                    'id': turma.treinamento.id,
-                    'nome': turma.treinamento.nome,
-                    'descricao': turma.treinamento.descricao
-                }
-            }
-            turmas_data.append(turma_data)
-        
-        return Response(turmas_data)
+        # Lista em cache, pré-calculada por core.warmup antes do início das turmas
+        return Response(turmas_do_aluno(aluno))
 
     @action(detail=True, methods=['get'])
     def recursos_disponiveis(self, request, pk=None):
@@ -400,46 +496,29 @@ class AlunoViewSet(viewsets.ModelViewSet):
                 status=status.HTTP_403_FORBIDDEN
             )
         
-        # Buscar turmas do aluno
-        matriculas = Matricula.objects.filter(aluno=aluno).select_related('turma__treinamento')
-        turmas_ids = [matricula.turma.id for matricula in matriculas]
-        
-        # Data atual
-        hoje = timezone.now().date()
-        
-        # Buscar recursos das turmas matriculadas
-        recursos = Recurso.objects.filter(
-            turma_id__in=turmas_ids
-        ).select_related('turma', 'turma__treinamento')
-        
-        recursos_disponiveis = []
-        
-        for recurso in recursos:
-            turma = recurso.turma
-            
-            # Regra 1: Recursos em draft nunca são acessíveis para alunos
-            if recurso.draft:
-                continue
-            
-            # Regra 2: Antes da data de início da turma
-            if turma.data_inicio > hoje:
-                # Só pode acessar recursos marcados como "Acesso Prévio"
-                if recurso.acesso_previo:
-                    recursos_disponiveis.append(recurso)
-            else:
-                # Regra 3: Após a data de início da turma
-                # Pode acessar todos os recursos que não estão em draft
-                recursos_disponiveis.append(recurso)
-        
-        # Usar o serializer específico para alunos
-        serializer = RecursoAlunoSerializer(recursos_disponiveis, many=True, context={'request': request})
-        return Response(serializer.data)
+        recursos = recursos_disponiveis_em_cache(aluno).select_related('turma', 'treinamento')
+
+        tipo = request.query_params.get('tipo', None)
+        search = request.query_params.get('search', None)
+
+        if tipo:
+            recursos = recursos.filter(tipo_recurso=tipo)
+
+        if search:
+            recursos = buscar(recursos, search)
+
+        recursos = ordenar(recursos, '-created_at')
+
+        page = self.paginate_queryset(recursos)
+        serializer = RecursoAlunoSerializer(page, many=True, context={'request': request})
+        return self.get_paginated_response(serializer.data)
 
 
-class MatriculaViewSet(viewsets.ModelViewSet):
+class MatriculaViewSet(RequisicaoCondicionalMixin, LeituraRapidaMixin, CamposEsparsosMixin, viewsets.ModelViewSet):
     queryset = Matricula.objects.select_related('aluno', 'turma', 'turma__treinamento').all()
     serializer_class = MatriculaSerializer
     permission_classes = [IsAdminOrReadOnly]
+    cache_dependencias = (Matricula, Aluno, Turma, Treinamento)
 
     def get_queryset(self):
         queryset = super().get_queryset()
@@ -454,6 +533,162 @@ class MatriculaViewSet(viewsets.ModelViewSet):
         
         return queryset.order_by('-data_matricula')
 
+    @action(detail=False, methods=['post'])
+    def bulk(self, request):
+        """Matricula vários alunos em uma turma com um relatório por aluno"""
+        serializer = MatriculaBulkSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        turma = serializer.validated_data['turma']
+        alunos_ids = serializer.validated_data['alunos']
+
+        # Conjuntos resolvidos com uma consulta cada, independente do tamanho do lote
+        existentes = set(Aluno.objects.filter(pk__in=alunos_ids).values_list('pk', flat=True))
+        ja_matriculados = dict(
+            Matricula.objects.filter(turma=turma, aluno_id__in=existentes).values_list('aluno_id', 'pk')
+        )
+
+        novas = {
+            aluno_id: Matricula(turma=turma, aluno_id=aluno_id)
+            for aluno_id in alunos_ids
+            if aluno_id in existentes and aluno_id not in ja_matriculados
+        }
+        with transaction.atomic():
+            # ignore_conflicts cobre uma matrícula concorrente do mesmo par
+            Matricula.objects.bulk_create(novas.values(), batch_size=500, ignore_conflicts=True)
+            # Linhas descartadas pelo conflito não têm o pk gerado em memória:
+            # o relatório usa o que de fato está no banco
+            gravadas = dict(
+                Matricula.objects.filter(turma=turma, aluno_id__in=novas).values_list('aluno_id', 'pk')
+            )
+        for aluno_id, matricula in list(novas.items()):
+            if gravadas.get(aluno_id) != matricula.pk:
+                ja_matriculados[aluno_id] = gravadas.get(aluno_id)
+                del novas[aluno_id]
+
+        resultados = []
+        for aluno_id in alunos_ids:
+            if aluno_id not in existentes:
+                resultados.append({'aluno': aluno_id, 'status': 'aluno_inexistente', 'matricula': None})
+            elif aluno_id in ja_matriculados:
+                resultados.append({'aluno': aluno_id, 'status': 'ja_matriculado', 'matricula': ja_matriculados[aluno_id]})
+            else:
+                resultados.append({'aluno': aluno_id, 'status': 'criada', 'matricula': novas[aluno_id].pk})
+
+        return Response({
+            'turma': turma.pk,
+            'criadas': len(novas),
+            'ja_matriculados': len(ja_matriculados),
+            'alunos_inexistentes': len(alunos_ids) - len(existentes),
+            'resultados': resultados,
+        }, status=status.HTTP_201_CREATED if novas else status.HTTP_200_OK)
+
+
+class UploadRetomavelViewSet(viewsets.GenericViewSet):
+    """Uploads retomáveis em partes para arquivos grandes de recursos (core.uploads)"""
+    serializer_class = UploadRetomavelSerializer
+    permission_classes = [permissions.IsAdminUser]
+
+    def get_queryset(self):
+        return UploadRetomavel.objects.filter(usuario=self.request.user)
+
+    def _com_offset(self, response, sessao):
+        response['Upload-Offset'] = sessao.recebido
+        response['Upload-Length'] = sessao.tamanho
+        response['Cache-Control'] = 'no-store'
+        return response
+
+    def create(self, request):
+        """Abre a sessão: nome_arquivo, tamanho e, opcionalmente, o sha256 esperado"""
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        sessao = criar_sessao(request.user, **serializer.validated_data)
+        response = Response(self.get_serializer(sessao).data, status=status.HTTP_201_CREATED)
+        response['Location'] = request.build_absolute_uri(reverse('upload-detail', args=[sessao.pk]))
+        return self._com_offset(response, sessao)
+
+    def retrieve(self, request, pk=None):
+        """Offset atual, para retomar o envio (também via HEAD)"""
+        sessao = self.get_object()
+        return self._com_offset(Response(self.get_serializer(sessao).data), sessao)
+
+    def partial_update(self, request, pk=None):
+        """Grava a parte do corpo a partir do offset do cabeçalho Upload-Offset"""
+        sessao = self.get_object()
+        if request.content_type.split(';')[0].strip() != 'application/offset+octet-stream':
+            return Response(
+                {'error': 'Envie a parte como application/offset+octet-stream.'},
+                status=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE
+            )
+        try:
+            offset = int(request.headers['Upload-Offset'])
+            comprimento = int(request.META.get('CONTENT_LENGTH') or 0)
+        except (KeyError, ValueError):
+            return Response(
+                {'error': 'Informe o cabeçalho Upload-Offset.'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        # O corpo é lido em blocos direto da requisição; request.data não é usado
+        try:
+            receber_parte(sessao, offset, request.stream, comprimento, request.headers.get('Upload-Checksum'))
+        except OffsetDivergente as exc:
+            response = Response({'error': str(exc), 'recebido': exc.recebido}, status=status.HTTP_409_CONFLICT)
+            sessao.recebido = exc.recebido
+            return self._com_offset(response, sessao)
+        except UploadEmAndamento as exc:
+            return Response({'error': str(exc)}, status=status.HTTP_423_LOCKED)
+        except UploadInvalido as exc:
+            return Response({'error': str(exc)}, status=status.HTTP_400_BAD_REQUEST)
+        return self._com_offset(Response(status=status.HTTP_204_NO_CONTENT), sessao)
+
+    def destroy(self, request, pk=None):
+        """Cancela o upload e remove o arquivo parcial"""
+        descartar(self.get_object())
+        return Response(status=status.HTTP_204_NO_CONTENT)
+
+    @action(detail=True, methods=['post'])
+    def finalizar(self, request, pk=None):
+        """Cria o recurso com o arquivo montado (ou o substitui no recurso informado)"""
+        sessao = self.get_object()
+        try:
+            arquivo, sha256 = arquivo_montado(sessao)
+        except UploadInvalido as exc:
+            return Response({'error': str(exc)}, status=status.HTTP_400_BAD_REQUEST)
+
+        dados = {campo: valor for campo, valor in request.data.items() if campo != 'recurso'}
+        dados['arquivo'] = arquivo
+        recurso_id = request.data.get('recurso')
+        if recurso_id:
+            try:
+                recurso = Recurso.objects.get(pk=recurso_id)
+            except (Recurso.DoesNotExist, ValidationError):
+                return Response({'error': 'Recurso não encontrado'}, status=status.HTTP_404_NOT_FOUND)
+            serializer = RecursoSerializer(recurso, data=dados, partial=True, context={'request': request})
+        else:
+            serializer = RecursoSerializer(data=dados, context={'request': request})
+        serializer.is_valid(raise_exception=True)
+
+        # O storage move o arquivo parcial para o destino (sem cópia)
+        gravar_recurso(serializer, sessao, arquivo)
+        return Response(
+            {**serializer.data, 'sha256': sha256},
+            status=status.HTTP_200_OK if recurso_id else status.HTTP_201_CREATED
+        )
+
+
+class DashboardViewSet(viewsets.ViewSet):
+    """Métricas agregadas do dashboard administrativo"""
+    permission_classes = [permissions.IsAdminUser]
+
+    @action(detail=False, methods=['get'])
+    def metrics(self, request):
+        return Response(metricas_dashboard())
+
+    @action(detail=False, methods=['get'])
+    def cache(self, request):
+        """Acertos e falhas por camada do cache (do worker que atendeu)"""
+        estatisticas = getattr(cache, 'estatisticas', None)
+        return Response(estatisticas() if estatisticas else {})
 
 # Simple view to ensure CSRF cookie is set for SPA clients
 @ensure_csrf_cookie
@@ -464,6 +699,9 @@ def get_csrf(request):
 @method_decorator(csrf_exempt, name='dispatch')
 class AuthViewSet(viewsets.ViewSet):
     """ViewSet para autenticação"""
+    # Cada candidato custa um hash de senha completo: nomes mais repetidos
+    # que isso exigem o nome de usuário exato
+    max_homonimos = 3
     
     @action(detail=False, methods=['post'], permission_classes=[permissions.AllowAny])
     def login(self, request):
@@ -487,12 +725,20 @@ class AuthViewSet(viewsets.ViewSet):
         user = authenticate(username=username, password=password)
         
         # Se não conseguir, tenta buscar por nome do aluno
+        # Consulta pelo índice de login_normalizado; em caso de homônimos,
+        # vale o aluno cuja senha confere
         if not user:
-            try:
-                aluno = Aluno.objects.get(nome__iexact=username)
-                user = authenticate(username=aluno.user.username, password=password)
-            except Aluno.DoesNotExist:
-                pass
+            usernames = list(Aluno.objects.filter(
+                login_normalizado=normalizar_login(username)
+            ).values_list('user__username', flat=True)[:self.max_homonimos + 1])
+            if len(usernames) > self.max_homonimos:
+                # Mesma resposta das credenciais inválidas: uma mensagem
+                # própria revelaria quais nomes estão cadastrados
+                usernames = []
+            for aluno_username in usernames:
+                user = authenticate(username=aluno_username, password=password)
+                if user:
+                    break
         
         if user:
             # Verificar se é aluno ou admin
@@ -519,7 +765,7 @@ class AuthViewSet(viewsets.ViewSet):
             # Se for aluno, buscar dados do perfil
             aluno_data = None
             if not is_admin and has_aluno_profile:
-                aluno_data = AlunoSerializer(user.aluno_profile).data
+                aluno_data = dados_aluno(user.aluno_profile)
             
             return Response({
                 'user': user_data,
@@ -548,7 +794,7 @@ class AuthViewSet(viewsets.ViewSet):
             # Se for aluno, buscar dados do perfil
             aluno_data = None
             if not is_admin and hasattr(request.user, 'aluno_profile'):
-                aluno_data = AlunoSerializer(request.user.aluno_profile).data
+                aluno_data = dados_aluno(request.user.aluno_profile)
             
             return Response({
                 'user': user_data,
@@ -0,0 +1,150 @@
+"""
+Leituras por aluno em cache e aquecimento antes do início das turmas.
+
+No `data_inicio` de uma turma grande todos os alunos entram ao mesmo tempo
+e encontram o cache frio em login, `auth/me`, `alunos/{id}/turmas` e
+`recursos_disponiveis`. As leituras abaixo são versionadas pela geração do
+aluno (core.access.geracao_aluno, invalidada só pelas escritas que afetam
+aquele aluno) e `aquecer` as calcula de antemão para os alunos das turmas
+que começam nos próximos minutos:
+
+* `dados_aluno`: perfil serializado (login e `auth/me`);
+* `turmas_do_aluno`: lista de `alunos/{id}/turmas`;
+* `core.access.ids_acessiveis` do dia de início da turma.
+
+O aquecimento roda pelo comando `aquecer_cache`, uma vez (cron) ou em laço
+como um processo dedicado (`--intervalo` ou `WARMUP_INTERVALO`).
+"""
+import logging
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import close_old_connections
+from django.utils import timezone
+
+from .access import geracao_aluno, ids_acessiveis
+from .models import Aluno, Matricula, Turma
+from .stats import dia_local, inicio_do_dia
+
+logger = logging.getLogger(__name__)
+
+CHAVE_TRAVA = 'warmup:trava'
+# Depois do início a entrada ainda precisa cobrir a onda de acessos
+MARGEM_APOS_INICIO = timedelta(minutes=30)
+
+
+def _ttl_padrao():
+    return getattr(settings, 'API_CACHE_TTL', 300)
+
+
+def _em_cache(prefixo, aluno, calcular, ttl=None, recalcular=False):
+    chave = f'{prefixo}:{aluno.pk}:{geracao_aluno(aluno.pk)}'
+    valor = None if recalcular else cache.get(chave)
+    if valor is None:
+        valor = calcular(aluno)
+        ttl = ttl or _ttl_padrao()
+        if ttl:
+            cache.set(chave, valor, ttl)
+    return valor
+
+
+def _serializar_aluno(aluno):
+    from .serializers import AlunoSerializer
+
+    return AlunoSerializer(aluno).data
+
+
+def _listar_turmas(aluno):
+    matriculas = Matricula.objects.filter(aluno=aluno).select_related('turma__treinamento')
+    return [
+        {
+            'id': turma.id,
+            'nome': turma.nome,
+            'data_inicio': turma.data_inicio,
+            'data_conclusao': turma.data_conclusao,
+            'link_acesso': turma.link_acesso,
+            'treinamento_nome': turma.treinamento.nome,
+            'treinamento': {
+                'id': turma.treinamento.id,
+                'nome': turma.treinamento.nome,
+                'descricao': turma.treinamento.descricao
+            }
+        }
+        for turma in (matricula.turma for matricula in matriculas)
+    ]
+
+
+def dados_aluno(aluno, **kwargs):
+    """Perfil serializado do aluno (total_matriculas muda com as matrículas)."""
+    return _em_cache('perfil', aluno, _serializar_aluno, **kwargs)
+
+
+def turmas_do_aluno(aluno, **kwargs):
+    """Turmas do aluno com o treinamento de cada uma."""
+    return _em_cache('turmas', aluno, _listar_turmas, **kwargs)
+
+
+def turmas_iniciando(minutos, agora=None):
+    """Turmas cujo `data_inicio` (meia-noite local) cai nos próximos `minutos`."""
+    agora = agora or timezone.now()
+    limite = agora + timedelta(minutes=minutos)
+    dias = [
+        dia for dia in (dia_local(agora) + timedelta(days=n) for n in range((limite - agora).days + 2))
+        if agora <= inicio_do_dia(dia) <= limite
+    ]
+    return Turma.objects.filter(data_inicio__in=dias).order_by('data_inicio')
+
+
+def aquecer(minutos=None, agora=None):
+    """
+    Calcula e grava no cache as leituras dos alunos das turmas que começam
+    nos próximos `minutos`. Retorna o relatório de tempos.
+    """
+    minutos = minutos or getattr(settings, 'WARMUP_MINUTOS', 30)
+    agora = agora or timezone.now()
+    inicio_total = time.perf_counter()
+    relatorio = {'turmas': [], 'alunos': 0}
+    aquecidos = set()
+
+    for turma in turmas_iniciando(minutos, agora):
+        inicio = time.perf_counter()
+        # Entradas valem até passar a onda de acessos do início da turma
+        ttl = int((inicio_do_dia(turma.data_inicio) + MARGEM_APOS_INICIO - agora).total_seconds())
+        alunos = Aluno.objects.filter(matriculas__turma=turma).exclude(pk__in=aquecidos)
+        total = 0
+        for aluno in alunos.iterator(chunk_size=500):
+            dados_aluno(aluno, ttl=max(ttl, _ttl_padrao()), recalcular=True)
+            turmas_do_aluno(aluno, ttl=max(ttl, _ttl_padrao()), recalcular=True)
+            ids_acessiveis(aluno, turma.data_inicio)
+            aquecidos.add(aluno.pk)
+            total += 1
+        relatorio['turmas'].append({
+            'turma': str(turma.pk),
+            'nome': turma.nome,
+            'data_inicio': turma.data_inicio.isoformat(),
+            'alunos': total,
+            'segundos': round(time.perf_counter() - inicio, 3),
+        })
+        relatorio['alunos'] += total
+
+    relatorio['segundos'] = round(time.perf_counter() - inicio_total, 3)
+    logger.info(
+        "Aquecimento de cache: %d turma(s), %d aluno(s) em %.3fs",
+        len(relatorio['turmas']), relatorio['alunos'], relatorio['segundos'],
+    )
+    return relatorio
+
+
+def executar_agendado(intervalo, minutos=None):
+    """
+    Uma rodada do laço de `aquecer_cache --intervalo`. A trava no cache
+    compartilhado evita que várias instâncias aqueçam a mesma janela.
+    """
+    if not cache.add(CHAVE_TRAVA, True, intervalo):
+        return None
+    try:
+        return aquecer(minutos)
+    finally:
+        close_old_connections()
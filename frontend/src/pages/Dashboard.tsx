@@ -5,39 +5,23 @@ import {
   UserCheck, ArrowUpRight
 } from 'lucide-react';
 import { useAuthStore } from '../store/authStore';
-import { treinamentosAPI, turmasAPI, alunosAPI, recursosAPI, matriculasAPI } from '../services/api';
+import { treinamentosAPI, turmasAPI, recursosAPI } from '../services/api';
 import { CardTurma, CardTreinamento } from '../components/cards';
 import { RecursoModal } from '../components/modals';
 import { AlunosTurmasModal } from '../components/modals/AlunosTurmasModal';
 import MetricCard from '../components/MetricCard';
 import { useDashboardMetrics } from '../hooks/useDashboardMetrics';
-import type { Turma, Treinamento, Recurso, Aluno } from '../types';
+import type { Turma, Treinamento, Recurso } from '../types';
 import { useNotificationStore } from '../store/notificationStore';
 import { useConfirm } from '../hooks/useConfirm';
 
-interface DashboardStats {
-  treinamentos: number;
-  turmas: number;
-  alunos: number;
-  recursos: number;
-  matriculas: number;
-}
-
 export const Dashboard: React.FC = () => {
   const { user } = useAuthStore();
   const navigate = useNavigate();
   const { notifySuccess, notifyError } = useNotificationStore();
   const { confirm, ConfirmComponent } = useConfirm();
 
-  const [stats, setStats] = useState<DashboardStats>({
-    treinamentos: 0,
-    turmas: 0,
-    alunos: 0,
-    recursos: 0,
-    matriculas: 0,
-  });
   const [isLoading, setIsLoading] = useState(true);
-  const [alunosLista, setAlunosLista] = useState<Aluno[]>([]);
   const [turmasLista, setTurmasLista] = useState<Turma[]>([]);
   const [treinamentosLista, setTreinamentosLista] = useState<Treinamento[]>([]);
 
@@ -60,22 +44,12 @@ export const Dashboard: React.FC = () => {
       }
 
       try {
-        const [treinamentos, turmas, alunos, recursos, matriculas] = await Promise.all([
+        // Contagens e métricas vêm agregadas de /dashboard/metrics/
+        const [treinamentos, turmas] = await Promise.all([
           treinamentosAPI.list(),
           turmasAPI.list(),
-          alunosAPI.list(),
-          recursosAPI.list(),
-          matriculasAPI.list(),
         ]);
 
-        setStats({
-          treinamentos: treinamentos.length,
-          turmas: turmas.length,
-          alunos: alunos.length,
-          recursos: recursos.length,
-          matriculas: matriculas.length,
-        });
-        setAlunosLista(alunos || []);
         setTurmasLista(turmas || []);
         setTreinamentosLista(treinamentos || []);
       } catch (error) {
@@ -144,10 +118,12 @@ export const Dashboard: React.FC = () => {
     setSelectedTreinamento(null);
   };
 
-  // Métricas calculadas usando hook customizado
-  const metrics = useDashboardMetrics(alunosLista, turmasLista, stats);
+  // Métricas agregadas no backend
+  const { metrics, isLoading: isLoadingMetrics } = useDashboardMetrics(!!user?.is_staff);
+  const stats = metrics?.totais ?? { treinamentos: 0, turmas: 0, alunos: 0, recursos: 0, matriculas: 0 };
+  const crescimentoAlunos = metrics?.crescimento_alunos ?? 0;
 
-  if (isLoading) {
+  if (isLoading || isLoadingMetrics) {
     return (
       <div className="h-full flex items-center justify-center">
         <div className="animate-spin rounded-full h-12 w-12 border-b-2 border-blue-600"></div>
@@ -198,16 +174,16 @@ export const Dashboard: React.FC = () => {
               <MetricCard
                 title="Total de Alunos"
                 value={stats.alunos}
-                subtitle={`${metrics.alunosEsteMes} novos este mês`}
+                subtitle={`${metrics?.alunos_este_mes ?? 0} novos este mês`}
                 icon={<Users size={24} className="text-white" />}
-                trend={metrics.crescimentoAlunos > 0 ? 'up' : metrics.crescimentoAlunos < 0 ? 'down' : 'neutral'}
-                trendValue={metrics.crescimentoAlunos}
+                trend={crescimentoAlunos > 0 ? 'up' : crescimentoAlunos < 0 ? 'down' : 'neutral'}
+                trendValue={crescimentoAlunos}
                 color="bg-blue-600"
                 onClick={() => navigate('/alunos')}
               />
               <MetricCard
                 title="Turmas Ativas"
-                value={metrics.turmasAtivas}
+                value={metrics?.turmas_ativas ?? 0}
                 subtitle={`${stats.turmas} turmas no total`}
                 icon={<GraduationCap size={24} className="text-white" />}
                 color="bg-green-600"
@@ -232,7 +208,7 @@ export const Dashboard: React.FC = () => {
               <MetricCard
                 title="Recursos"
                 value={stats.recursos}
-                subtitle={`${metrics.utilizacaoRecursos}% de utilização`}
+                subtitle={`${metrics?.utilizacao_recursos ?? 0}% de utilização`}
                 icon={<FileText size={24} className="text-white" />}
                 color="bg-orange-600"
                 onClick={() => navigate('/recursos')}
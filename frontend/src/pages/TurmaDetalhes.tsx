@@ -51,14 +51,16 @@ export const TurmaDetalhes: React.FC = () => {
         }
         setTurma(turmaEncontrada);
 
-        // Filtrar recursos apenas desta turma
+        // Recursos desta turma e os do treinamento (sem turma)
         const recursosConvertidos: RecursoAluno[] = recursosResponse
-          .filter(recurso => recurso.turma_nome === turmaEncontrada.nome)
+          .filter(recurso => recurso.turma
+            ? recurso.turma === turmaEncontrada.id
+            : recurso.treinamento === turmaEncontrada.treinamento)
           .map(recurso => ({
             id: recurso.id,
             nome_recurso: recurso.nome_recurso,
             descricao_recurso: recurso.descricao_recurso || undefined,
-            turma_nome: recurso.turma_nome,
+            turma_nome: recurso.turma_nome || turmaEncontrada.nome,
             tipo_recurso: recurso.tipo_recurso,
             arquivo_url: recurso.arquivo_url || '',
             pode_acessar: recurso.pode_acessar,
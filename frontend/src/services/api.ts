@@ -1,7 +1,7 @@
 import axios from 'axios';
 import type { 
   Treinamento, Turma, Recurso, Aluno, Matricula, User,
-  LoginRequest, LoginResponse 
+  LoginRequest, LoginResponse, DashboardMetrics
 } from '../types';
 
 // Prefer relative API URL during development so Vite proxy can handle requests
@@ -61,6 +61,19 @@ function unwrapArray<T>(data: unknown): T[] {
   return [] as T[];
 }
 
+// Follows DRF `next` links and concatenates every page of a list endpoint
+async function fetchAllPages<T>(url: string): Promise<T[]> {
+  const items: T[] = [];
+  let next: string | null = url;
+  while (next) {
+    const res: { data: unknown } = await api.get(next);
+    items.push(...unwrapArray<T>(res.data));
+    const page = res.data as { next?: string | null };
+    next = Array.isArray(res.data) ? null : page?.next ?? null;
+  }
+  return items;
+}
+
 // Auth API
 export const authAPI = {
   login: (data: LoginRequest): Promise<LoginResponse> =>
@@ -158,7 +171,7 @@ export const alunosAPI = {
     api.get(`/alunos/${id}/turmas/`).then(res => res.data),
   
   recursosDisponiveis: (id: string): Promise<Recurso[]> =>
-    api.get(`/alunos/${id}/recursos_disponiveis/`).then(res => res.data),
+    fetchAllPages<Recurso>(`/alunos/${id}/recursos_disponiveis/`),
 };
 
 // Matrículas API
@@ -179,4 +192,10 @@ export const matriculasAPI = {
     api.delete(`/matriculas/${id}/`).then(res => res.data),
 };
 
+// Dashboard API
+export const dashboardAPI = {
+  metrics: (): Promise<DashboardMetrics> =>
+    api.get('/dashboard/metrics/').then(res => res.data),
+};
+
 export default api;
\ No newline at end of file
@@ -45,7 +45,6 @@ export interface Recurso {
   // Tipos de recurso suportados pelo backend
   tipo_recurso: 'video' | 'arquivo_pdf' | 'arquivo_zip';
   tipo?: 'video' | 'arquivo_pdf' | 'arquivo_zip';
-  arquivo?: string;        // caminho do arquivo armazenado
   arquivo_url?: string;    // URL absoluta para download/visualização
   url?: string;           // Alias para arquivo_url
   acesso_previo: boolean;
@@ -88,6 +87,28 @@ export interface Matricula {
   updated_at: string;
 }
 
+export interface DashboardMetrics {
+  totais: {
+    treinamentos: number;
+    turmas: number;
+    alunos: number;
+    recursos: number;
+    matriculas: number;
+  };
+  alunos_este_mes: number;
+  alunos_mes_anterior: number;
+  crescimento_alunos: number;
+  turmas_ativas: number;
+  media_alunos_por_turma: number;
+  utilizacao_recursos: number;
+  serie_mensal: {
+    mes: string;
+    novos_alunos: number;
+    novas_matriculas: number;
+  }[];
+  gerado_em: string;
+}
+
 export interface LoginRequest {
   username: string;
   password: string;